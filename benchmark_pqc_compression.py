@@ -8,8 +8,27 @@ Abdessamad JAOUAD - M2 Big Data & IoT - ENSAM Casablanca
 import time
 import zlib
 import json
+import math
+import os
+import platform
+import random
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+from compression_demo import rle_decode, rle_encode
+from energy_model import (
+    DEVICE_PROFILES, RADIO_PROFILES, estimate_energy, print_energy_results,
+    recommend_configuration
+)
+from link_simulator import link_report, print_link_results
+from lz_codecs import CODECS as LZ_CODECS
+from result_log import LOG_FILE, ResultLog
+from results_store import DB_FILE, store_results
+from stage_profiler import PROFILE_DIR, PROFILER, TOP_N, print_hotspots
+from sweep_spec import cell_key, expand_cells, load_spec, parse_selection, parse_shard, select_cells
 
 # Check dependencies
 HAS_OQS = False
@@ -20,6 +39,20 @@ except (ImportError, RuntimeError, Exception) as e:
     # liboqs-python not installed or C library not found
     pass
 
+# Pure-Python/NumPy ML-KEM fallback when liboqs is missing
+try:
+    import mlkem_numpy
+    HAS_MLKEM = True
+except ImportError:
+    HAS_MLKEM = False
+
+# tANS entropy coder (needs NumPy for the histogram and table building)
+try:
+    import tans_codec
+    HAS_TANS = True
+except ImportError:
+    HAS_TANS = False
+
 try:
     import lz4.frame as lz4
     HAS_LZ4 = True
@@ -58,6 +91,26 @@ def generate_iot_data(size_kb=1):
     
     return (data * repetitions)[:target_size]
 
+def generate_iot_readings(count=100, sensor_id="temp_sensor_001"):
+    """Generate a sequence of individual IoT readings (~200 bytes each)"""
+    readings = []
+    for seq in range(count):
+        reading = {
+            "sensor_id": sensor_id,
+            "seq": seq,
+            "timestamp": 1767522600 + seq * 60,
+            "location": {"lat": 33.5731, "lon": -7.5898},
+            "readings": {
+                "temperature": round(25.5 + (seq % 17) * 0.1, 1),
+                "humidity": round(60.2 - (seq % 11) * 0.3, 1),
+                "pressure": round(1013.25 + (seq % 7) * 0.05, 2),
+                "battery": round(87.5 - seq * 0.01, 2),
+                "signal_strength": -65 - seq % 5
+            }
+        }
+        readings.append(json.dumps(reading, separators=(",", ":")).encode())
+    return readings
+
 def generate_test_datasets():
     """Generate various test datasets"""
     return {
@@ -72,8 +125,44 @@ def generate_test_datasets():
 # COMPRESSION BENCHMARK
 # ============================================
 
-def benchmark_compression(data, algorithm='zlib'):
-    """Benchmark compression algorithm"""
+def compress_payload(data, algorithm='zlib', level=None):
+    """Compress with one of the benchmarked codecs (level: zlib / lz4 / zstd level, None for the defaults)"""
+    if algorithm == 'zlib':
+        return zlib.compress(data, level=9 if level is None else level)
+    elif algorithm == 'lz4' and HAS_LZ4:
+        return lz4.compress(data, compression_level=level or 0)
+    elif algorithm == 'zstd' and HAS_ZSTD:
+        cctx = zstd.ZstdCompressor(level=3 if level is None else level)
+        return cctx.compress(data)
+    elif algorithm == 'tans' and HAS_TANS:
+        return tans_codec.tans_encode(data)
+    elif algorithm == 'rle':
+        return rle_encode(data)
+    elif algorithm in LZ_CODECS:
+        return LZ_CODECS[algorithm][0](data)
+    else:
+        return data
+
+def decompress_payload(compressed, algorithm='zlib'):
+    """Inverse of compress_payload"""
+    if algorithm == 'zlib':
+        return zlib.decompress(compressed)
+    elif algorithm == 'lz4' and HAS_LZ4:
+        return lz4.decompress(compressed)
+    elif algorithm == 'zstd' and HAS_ZSTD:
+        dctx = zstd.ZstdDecompressor()
+        return dctx.decompress(compressed)
+    elif algorithm == 'tans' and HAS_TANS:
+        return tans_codec.tans_decode(compressed)
+    elif algorithm == 'rle':
+        return rle_decode(compressed)
+    elif algorithm in LZ_CODECS:
+        return LZ_CODECS[algorithm][1](compressed)
+    else:
+        return compressed
+
+def benchmark_compression(data, algorithm='zlib', level=None):
+    """Benchmark compression algorithm (level: zlib / lz4 / zstd level, None for the defaults)"""
     results = {
         'algorithm': algorithm,
         'original_size': len(data),
@@ -83,37 +172,25 @@ def benchmark_compression(data, algorithm='zlib'):
         'compression_ratio': 0,
         'throughput_mbps': 0
     }
+    if level is not None:
+        results['level'] = level
     
     try:
         # Compression
         start = time.perf_counter()
-        if algorithm == 'zlib':
-            compressed = zlib.compress(data, level=9)
-        elif algorithm == 'lz4' and HAS_LZ4:
-            compressed = lz4.compress(data)
-        elif algorithm == 'zstd' and HAS_ZSTD:
-            cctx = zstd.ZstdCompressor(level=3)
-            compressed = cctx.compress(data)
-        else:
-            compressed = data
-        
+        compressed = compress_payload(data, algorithm, level)
         results['compression_time'] = time.perf_counter() - start
         results['compressed_size'] = len(compressed)
         
         # Decompression
         start = time.perf_counter()
-        if algorithm == 'zlib':
-            decompressed = zlib.decompress(compressed)
-        elif algorithm == 'lz4' and HAS_LZ4:
-            decompressed = lz4.decompress(compressed)
-        elif algorithm == 'zstd' and HAS_ZSTD:
-            dctx = zstd.ZstdDecompressor()
-            decompressed = dctx.decompress(compressed)
-        else:
-            decompressed = data
-        
+        decompressed = decompress_payload(compressed, algorithm)
         results['decompression_time'] = time.perf_counter() - start
         
+        # With --profile the stages run again under the profiler, outside the timers
+        PROFILER.profile('compress', compress_payload, data, algorithm, level)
+        PROFILER.profile('decompress', decompress_payload, compressed, algorithm)
+        
         # Calculate metrics
         if results['compressed_size'] > 0:
             results['compression_ratio'] = len(data) / results['compressed_size']
@@ -134,6 +211,23 @@ def benchmark_compression(data, algorithm='zlib'):
 # PQC BENCHMARK
 # ============================================
 
+def create_kem(algorithm, secret_key=None):
+    """KEM object from the best available backend (None if only simulation is possible)
+    
+    secret_key: load an existing key (e.g. one KEM object per thread for the same gateway key)
+    """
+    if HAS_OQS:
+        return oqs.KeyEncapsulation(algorithm, secret_key=secret_key)
+    if HAS_MLKEM:
+        return mlkem_numpy.KeyEncapsulation(algorithm, secret_key=secret_key)
+    return None
+
+def kem_backend():
+    """Name of the backend create_kem() uses"""
+    if HAS_OQS:
+        return 'liboqs'
+    return 'numpy' if HAS_MLKEM else 'simulated'
+
 def benchmark_pqc(algorithm='Kyber768'):
     """Benchmark PQC algorithm"""
     results = {
@@ -147,8 +241,9 @@ def benchmark_pqc(algorithm='Kyber768'):
     }
     
     try:
-        if HAS_OQS:
-            kem = oqs.KeyEncapsulation(algorithm)
+        kem = create_kem(algorithm)
+        if kem is not None:
+            results['backend'] = kem_backend()
             
             # Key generation
             start = time.perf_counter()
@@ -169,6 +264,24 @@ def benchmark_pqc(algorithm='Kyber768'):
             results['decap_time'] = time.perf_counter() - start
             
             results['success'] = (recovered_secret == shared_secret)
+            
+            # --profile: the same stages on a fresh KEM object, outside the timers
+            if PROFILER.mode:
+                profiled = create_kem(algorithm)
+                public_key = PROFILER.profile('keygen', profiled.generate_keypair)
+                ciphertext, _ = PROFILER.profile('encap', profiled.encap_secret, public_key)
+                PROFILER.profile('decap', profiled.decap_secret, ciphertext)
+        elif profile_entry('kem', algorithm):
+            # Simulated from a calibration profile (sizes + sampled timings)
+            entry = profile_entry('kem', algorithm)
+            results['pk_size'] = entry['pk']
+            results['sk_size'] = entry['sk']
+            results['ct_size'] = entry['ct']
+            for op in ('keygen', 'encap', 'decap'):
+                results[f'{op}_time'] = sample_profile_time(entry, op)
+            results['success'] = True
+            results['simulated'] = True
+            results['profile'] = PROFILE_FILE
         else:
             # Simulated results for demonstration
             sizes = {
@@ -193,22 +306,278 @@ def benchmark_pqc(algorithm='Kyber768'):
     
     return results
 
+# ============================================
+# SIGNATURE BENCHMARK
+# ============================================
+
+# Sizes from the NIST submissions, times (keygen, sign, verify) in seconds
+SIMULATED_SIG_SIZES = {
+    'Dilithium2': {'pk': 1312, 'sk': 2528, 'sig': 2420},
+    'Dilithium3': {'pk': 1952, 'sk': 4000, 'sig': 3293},
+    'Dilithium5': {'pk': 2592, 'sk': 4864, 'sig': 4595},
+    'Falcon-512': {'pk': 897, 'sk': 1281, 'sig': 666},
+    'Falcon-1024': {'pk': 1793, 'sk': 2305, 'sig': 1280},
+    'SPHINCS+-SHA2-128f-simple': {'pk': 32, 'sk': 64, 'sig': 17088},
+}
+
+SIMULATED_SIG_TIMES = {
+    'Dilithium2': (0.0001, 0.0003, 0.0001),
+    'Dilithium3': (0.0002, 0.0005, 0.0002),
+    'Dilithium5': (0.0003, 0.0006, 0.0003),
+    'Falcon-512': (0.008, 0.0003, 0.00005),
+    'Falcon-1024': (0.025, 0.0006, 0.0001),
+    'SPHINCS+-SHA2-128f-simple': (0.0006, 0.015, 0.001),
+}
+
+def latency_stats(samples):
+    """Summarise latency samples (seconds): mean, percentiles and ops/s"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    
+    def percentile(p):
+        # Nearest-rank percentile, good enough for benchmark reporting
+        rank = math.ceil(p / 100 * n)
+        return ordered[min(n, max(rank, 1)) - 1]
+    
+    mean = sum(ordered) / n
+    return {
+        'mean': mean,
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+        'ops_per_sec': 1 / mean if mean > 0 else 0
+    }
+
+def benchmark_signature(algorithm='Dilithium2', message=None, iterations=20):
+    """Benchmark PQC signature scheme (keygen, sign, verify)"""
+    if message is None:
+        message = generate_iot_data(1)
+    
+    results = {
+        'algorithm': algorithm,
+        'iterations': iterations,
+        'message_size': len(message),
+        'pk_size': 0,
+        'sk_size': 0,
+        'sig_size': 0,
+        'keygen_time': 0,
+        'sign_time': 0,
+        'verify_time': 0
+    }
+    
+    try:
+        if HAS_OQS:
+            timings = {'keygen': [], 'sign': [], 'verify': []}
+            verified = True
+            
+            for _ in range(iterations):
+                signer = oqs.Signature(algorithm)
+                
+                start = time.perf_counter()
+                public_key = signer.generate_keypair()
+                timings['keygen'].append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                signature = signer.sign(message)
+                timings['sign'].append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                verified &= signer.verify(message, signature, public_key)
+                timings['verify'].append(time.perf_counter() - start)
+            
+            # --profile: one more keygen / sign / verify, outside the timers
+            if PROFILER.mode:
+                profiled = oqs.Signature(algorithm)
+                profiled_key = PROFILER.profile('keygen', profiled.generate_keypair)
+                profiled_signature = PROFILER.profile('sign', profiled.sign, message)
+                PROFILER.profile('verify', profiled.verify, message, profiled_signature, profiled_key)
+            
+            results['pk_size'] = len(public_key)
+            results['sk_size'] = len(signer.export_secret_key())
+            results['sig_size'] = len(signature)
+            
+            for op, samples in timings.items():
+                stats = latency_stats(samples)
+                results[f'{op}_time'] = stats['mean']
+                for key in ('p50', 'p95', 'p99', 'ops_per_sec'):
+                    results[f'{op}_{key}'] = stats[key]
+            
+            results['success'] = verified
+        elif profile_entry('sig', algorithm):
+            # Simulated from a calibration profile: sampled timings keep the tail
+            entry = profile_entry('sig', algorithm)
+            results['pk_size'] = entry['pk']
+            results['sk_size'] = entry['sk']
+            results['sig_size'] = entry['sig']
+            
+            for op in ('keygen', 'sign', 'verify'):
+                stats = latency_stats([sample_profile_time(entry, op) for _ in range(iterations)])
+                results[f'{op}_time'] = stats['mean']
+                for key in ('p50', 'p95', 'p99', 'ops_per_sec'):
+                    results[f'{op}_{key}'] = stats[key]
+            
+            results['success'] = True
+            results['simulated'] = True
+            results['profile'] = PROFILE_FILE
+        else:
+            # Simulated results for demonstration
+            s = SIMULATED_SIG_SIZES.get(algorithm, SIMULATED_SIG_SIZES['Dilithium2'])
+            t = SIMULATED_SIG_TIMES.get(algorithm, SIMULATED_SIG_TIMES['Dilithium2'])
+            results['pk_size'] = s['pk']
+            results['sk_size'] = s['sk']
+            results['sig_size'] = s['sig']
+            
+            for op, value in zip(('keygen', 'sign', 'verify'), t):
+                results[f'{op}_time'] = value
+                for key in ('p50', 'p95', 'p99'):
+                    results[f'{op}_{key}'] = value
+                results[f'{op}_ops_per_sec'] = 1 / value
+            
+            results['success'] = True
+            results['simulated'] = True
+    
+    except Exception as e:
+        results['error'] = str(e)
+        results['success'] = False
+    
+    return results
+
+# ============================================
+# SIMULATION PROFILE (CALIBRATION)
+# ============================================
+
+PROFILE_FILE = 'pqc_profile.json'
+_profiles = {}
+
+def calibrate_pqc(kem_algorithms=('Kyber512', 'Kyber768', 'Kyber1024'),
+                  sig_algorithms=('Dilithium2', 'Dilithium3', 'Falcon-512', 'SPHINCS+-SHA2-128f-simple'),
+                  iterations=200, filename=PROFILE_FILE):
+    """Record real per-operation timing distributions into a simulation profile
+    
+    The profile keeps every sample (seconds) so the simulator can replay the
+    full distribution, tail latency included, on machines without liboqs.
+    """
+    if create_kem(kem_algorithms[0]) is None:
+        raise RuntimeError("Calibration needs liboqs-python (or NumPy for the ML-KEM fallback)")
+    
+    profile = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'machine': platform.machine(),
+        'backend': kem_backend(),
+        'iterations': iterations,
+        'kem': {},
+        'sig': {}
+    }
+    
+    for algorithm in kem_algorithms:
+        samples = {'keygen': [], 'encap': [], 'decap': []}
+        for _ in range(iterations):
+            kem = create_kem(algorithm)
+            
+            start = time.perf_counter()
+            public_key = kem.generate_keypair()
+            samples['keygen'].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            ciphertext, shared_secret = kem.encap_secret(public_key)
+            samples['encap'].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            kem.decap_secret(ciphertext)
+            samples['decap'].append(time.perf_counter() - start)
+        
+        profile['kem'][algorithm] = {
+            'pk': len(public_key),
+            'sk': len(kem.export_secret_key()),
+            'ct': len(ciphertext),
+            'ss': len(shared_secret),
+            **{op: sorted(values) for op, values in samples.items()}
+        }
+        print(f"  ✓ {algorithm}: encap p50 {latency_stats(samples['encap'])['p50']*1000:.3f} ms")
+    
+    if HAS_OQS:
+        message = generate_iot_data(1)
+        for algorithm in sig_algorithms:
+            samples = {'keygen': [], 'sign': [], 'verify': []}
+            for _ in range(iterations):
+                signer = oqs.Signature(algorithm)
+                
+                start = time.perf_counter()
+                public_key = signer.generate_keypair()
+                samples['keygen'].append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                signature = signer.sign(message)
+                samples['sign'].append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                signer.verify(message, signature, public_key)
+                samples['verify'].append(time.perf_counter() - start)
+            
+            profile['sig'][algorithm] = {
+                'pk': len(public_key),
+                'sk': len(signer.export_secret_key()),
+                'sig': len(signature),
+                **{op: sorted(values) for op, values in samples.items()}
+            }
+            print(f"  ✓ {algorithm}: sign p50 {latency_stats(samples['sign'])['p50']*1000:.3f} ms")
+    
+    with open(filename, 'w') as f:
+        json.dump(profile, f)
+    _profiles[filename] = profile
+    print(f"\n✓ Calibration profile ({profile['backend']}) written to {filename}")
+    
+    return profile
+
+def load_profile(filename=PROFILE_FILE):
+    """Load a calibration profile (None if the file does not exist)"""
+    if filename not in _profiles:
+        try:
+            with open(filename, 'r') as f:
+                _profiles[filename] = json.load(f)
+        except FileNotFoundError:
+            _profiles[filename] = None
+    return _profiles[filename]
+
+def profile_entry(kind, algorithm, filename=PROFILE_FILE):
+    """Calibrated sizes and timing samples for one 'kem' or 'sig' algorithm"""
+    profile = load_profile(filename)
+    if profile is None:
+        return None
+    return profile.get(kind, {}).get(algorithm)
+
+def sample_profile_time(entry, op, rng=random):
+    """Draw one duration (seconds) from the recorded distribution of `op`"""
+    return rng.choice(entry[op])
+
 # ============================================
 # COMBINED BENCHMARK
 # ============================================
 
-def benchmark_combined(data, pqc_alg='Kyber768', comp_alg='zlib'):
-    """Benchmark combined PQC + Compression approach"""
+def benchmark_combined(data, pqc_alg='Kyber768', comp_alg='zlib', sig_alg=None, level=None, dataset=None):
+    """Benchmark combined PQC + Compression approach (dataset: name recorded with the result)
+    
+    With sig_alg set, the compressed payload is also signed and verified
+    (compress + sign + KEM), so the authenticated per-message overhead shows up
+    in total_transmission and total_time.
+    """
     results = {
         'pqc_algorithm': pqc_alg,
         'compression': comp_alg,
         'original_size': len(data),
         'success': False
     }
+    if dataset:
+        results['dataset'] = dataset
+    if sig_alg:
+        results['sig_algorithm'] = sig_alg
+    if level is not None:
+        results['compression_level'] = level
     
     try:
         # Compression phase
-        comp_results = benchmark_compression(data, comp_alg)
+        comp_results = benchmark_compression(data, comp_alg, level)
         results['compressed_size'] = comp_results['compressed_size']
         results['compression_time'] = comp_results['compression_time']
         results['decompression_time'] = comp_results['decompression_time']
@@ -229,9 +598,22 @@ def benchmark_combined(data, pqc_alg='Kyber768', comp_alg='zlib'):
                                 pqc_results['encap_time'] +
                                 pqc_results['decap_time'])
         
-        results['bandwidth_savings'] = ((len(data) - results['total_transmission']) / len(data)) * 100
         results['success'] = comp_results['success'] and pqc_results['success']
         
+        # Authentication phase (signature over the compressed payload)
+        if sig_alg:
+            # The codecs are deterministic: these are the bytes that were timed above
+            payload = compress_payload(data, comp_alg, level)
+            sig_results = benchmark_signature(sig_alg, payload, iterations=1)
+            results['sig_overhead'] = sig_results['sig_size']
+            results['sign_time'] = sig_results['sign_time']
+            results['verify_time'] = sig_results['verify_time']
+            results['total_transmission'] += sig_results['sig_size']
+            results['total_time'] += sig_results['sign_time'] + sig_results['verify_time']
+            results['success'] = results['success'] and sig_results['success']
+        
+        results['bandwidth_savings'] = ((len(data) - results['total_transmission']) / len(data)) * 100
+        
     except Exception as e:
         results['error'] = str(e)
     
@@ -249,7 +631,8 @@ def print_header(title):
 
 def print_compression_results(results):
     """Print compression benchmark results"""
-    print(f"Algorithm:         {results['algorithm']}")
+    level = f" (level {results['level']})" if 'level' in results else ''
+    print(f"Algorithm:         {results['algorithm']}{level}")
     print(f"Original Size:     {results['original_size']:,} bytes")
     print(f"Compressed Size:   {results['compressed_size']:,} bytes")
     print(f"Compression Ratio: {results['compression_ratio']:.2f}x")
@@ -269,15 +652,39 @@ def print_pqc_results(results):
     print(f"Encap Time:      {results['encap_time']*1000:.3f} ms")
     print(f"Decap Time:      {results['decap_time']*1000:.3f} ms")
     print(f"Total Time:      {(results['keygen_time']+results['encap_time']+results['decap_time'])*1000:.3f} ms")
-    if 'simulated' in results:
+    if 'profile' in results:
+        print(f"Note:            [SIMULATED from calibration profile {results['profile']}]")
+    elif 'simulated' in results:
+        print(f"Note:            [SIMULATED - Install liboqs-python for real results]")
+    elif results.get('backend') == 'numpy':
+        print(f"Note:            [NumPy ML-KEM fallback - Install liboqs-python for optimized timings]")
+
+def print_signature_results(results):
+    """Print signature benchmark results"""
+    print(f"Algorithm:       {results['algorithm']}")
+    print(f"Public Key:      {results['pk_size']:,} bytes")
+    print(f"Signature:       {results['sig_size']:,} bytes")
+    for op, label in (('keygen', 'KeyGen'), ('sign', 'Sign'), ('verify', 'Verify')):
+        print(f"{label + ' Time:':<17}{results[op + '_time']*1000:.3f} ms "
+              f"(p50 {results[op + '_p50']*1000:.3f} / p95 {results[op + '_p95']*1000:.3f} / "
+              f"p99 {results[op + '_p99']*1000:.3f} ms, {results[op + '_ops_per_sec']:,.0f} ops/s)")
+    print(f"Status:          {'✓ SUCCESS' if results['success'] else '✗ FAILED'}")
+    if 'profile' in results:
+        print(f"Note:            [SIMULATED from calibration profile {results['profile']}]")
+    elif 'simulated' in results:
         print(f"Note:            [SIMULATED - Install liboqs-python for real results]")
 
 def print_combined_results(results):
     """Print combined benchmark results"""
-    print(f"Configuration:     {results['pqc_algorithm']} + {results['compression']}")
+    configuration = f"{results['pqc_algorithm']} + {results['compression']}"
+    if 'sig_algorithm' in results:
+        configuration += f" + {results['sig_algorithm']}"
+    print(f"Configuration:     {configuration}")
     print(f"Original Size:     {results['original_size']:,} bytes")
     print(f"Compressed:        {results['compressed_size']:,} bytes ({results['compression_ratio']:.2f}x)")
     print(f"PQC Overhead:      {results['pqc_overhead']:,} bytes")
+    if 'sig_overhead' in results:
+        print(f"Signature:         {results['sig_overhead']:,} bytes")
     print(f"Total Transmission:{results['total_transmission']:,} bytes")
     print(f"Bandwidth Savings: {results['bandwidth_savings']:+.1f}%")
     print(f"Total Time:        {results['total_time']*1000:.3f} ms")
@@ -332,6 +739,62 @@ def export_results_latex(all_results, filename='benchmark_results.tex'):
         f.write("\\hline\n")
         f.write("\\end{tabular}\n")
         f.write("\\end{table}\n")
+        
+        # Signature results table
+        if 'signatures' in all_results:
+            f.write("\n\\begin{table}[h]\n")
+            f.write("\\centering\n")
+            f.write("\\caption{Post-Quantum Signature Performance}\n")
+            f.write("\\begin{tabular}{lcccccc}\n")
+            f.write("\\hline\n")
+            f.write("Algorithm & PK (B) & Sig (B) & KeyGen (ms) & Sign (ms) & Sign p99 (ms) & Verify (ms) \\\\\n")
+            f.write("\\hline\n")
+            
+            for r in all_results['signatures']:
+                f.write(f"{r['algorithm']} & {r['pk_size']} & {r['sig_size']} & ")
+                f.write(f"{r['keygen_time']*1000:.2f} & {r['sign_time']*1000:.2f} & ")
+                f.write(f"{r['sign_p99']*1000:.2f} & {r['verify_time']*1000:.2f} \\\\\n")
+            
+            f.write("\\hline\n")
+            f.write("\\end{tabular}\n")
+            f.write("\\end{table}\n")
+        
+        # Energy results table (reference device if measured, one column per radio)
+        energy = all_results.get('energy') or []
+        if energy:
+            devices = [r.get('device') for r in energy]
+            device = 'nrf52840' if 'nrf52840' in devices else devices[0]
+            rows = {}
+            for r in energy:
+                if r.get('device') == device:
+                    rows.setdefault(r['configuration'], {})[r.get('radio')] = r
+            present = {radio for by_radio in rows.values() for radio in by_radio}
+            radios = [r for r in RADIO_PROFILES if r in present] + sorted(present - set(RADIO_PROFILES) - {None})
+            device_name = DEVICE_PROFILES.get(device, {}).get('name', device)
+            
+            f.write("\n\\begin{table}[h]\n")
+            f.write("\\centering\n")
+            f.write(f"\\caption{{Energy per Message and Battery Life ({device_name})}}\n")
+            f.write("\\begin{tabular}{l" + "cc" * len(radios) + "}\n")
+            f.write("\\hline\n")
+            f.write("Configuration & " + " & ".join(f"{RADIO_PROFILES.get(r, {}).get('name', r)} (mJ) & Life (days)"
+                                                    for r in radios))
+            f.write(" \\\\\n")
+            f.write("\\hline\n")
+            
+            for configuration, by_radio in rows.items():
+                f.write(configuration)
+                for radio in radios:
+                    e = by_radio.get(radio)
+                    if e is None:
+                        f.write(" & - & -")
+                    else:
+                        f.write(f" & {e['energy_per_message']*1000:.2f} & {e['battery_life_days']:.0f}")
+                f.write(" \\\\\n")
+            
+            f.write("\\hline\n")
+            f.write("\\end{tabular}\n")
+            f.write("\\end{table}\n")
     
     print(f"✓ LaTeX tables exported to {filename}")
 
@@ -339,8 +802,16 @@ def export_results_latex(all_results, filename='benchmark_results.tex'):
 # MAIN BENCHMARK SUITE
 # ============================================
 
-def run_full_benchmark():
-    """Run comprehensive benchmark suite"""
+def run_full_benchmark(resume=False, log_file=LOG_FILE, profile=None, profile_dir=PROFILE_DIR, top=TOP_N):
+    """Run comprehensive benchmark suite
+    
+    Every finished cell is appended to `log_file`; with resume=True the cells
+    already in the log are replayed instead of measured again.
+    With profile='cprofile' or 'sample', every measured cell re-runs its
+    stages under the profiler after timing them (the logged timings are not
+    profiled), writes per-stage dumps to `profile_dir` and a top-N hotspot
+    table is printed.
+    """
     print("""
 ╔══════════════════════════════════════════════════════════════════════════════╗
 ║                  PQC + COMPRESSION BENCHMARK SUITE                           ║
@@ -351,78 +822,158 @@ def run_full_benchmark():
     
     # Check dependencies
     print("Checking dependencies...")
-    print(f"  ├─ liboqs-python: {'✓' if HAS_OQS else '✗'} {'' if HAS_OQS else '(SIMULATED MODE)'}")
+    print(f"  ├─ liboqs-python: {'✓' if HAS_OQS else '✗'} {'' if HAS_OQS else '(NumPy ML-KEM fallback)' if HAS_MLKEM else '(SIMULATED MODE)'}")
+    print(f"  ├─ numpy ML-KEM:  {'✓' if HAS_MLKEM else '✗'}")
     print(f"  ├─ lz4:           {'✓' if HAS_LZ4 else '✗'}")
-    print(f"  └─ zstandard:     {'✓' if HAS_ZSTD else '✗'}")
+    print(f"  ├─ zstandard:     {'✓' if HAS_ZSTD else '✗'}")
+    print(f"  └─ tANS (numpy):  {'✓' if HAS_TANS else '✗'}")
     
     all_results = {}
-    
-    # Generate test datasets
-    print("\nGenerating test datasets...")
-    datasets = generate_test_datasets()
-    print(f"  ✓ Generated {len(datasets)} datasets")
-    
-    # Benchmark 1: Compression algorithms
-    print_header("BENCHMARK 1: COMPRESSION ALGORITHMS")
-    
-    compression_algos = ['zlib']
-    if HAS_LZ4:
-        compression_algos.append('lz4')
-    if HAS_ZSTD:
-        compression_algos.append('zstd')
-    
-    all_results['compression'] = {}
-    
-    for dataset_name, data in datasets.items():
-        print(f"\nDataset: {dataset_name} ({len(data)} bytes)")
-        print("-" * 80)
+    with ResultLog(log_file, resume=resume) as log:
+        if resume:
+            print(f"\nResuming: {len(log.done)} cells already recorded in {log_file}")
+        if profile:
+            PROFILER.enable(profile, profile_dir)
+            print(f"\nProfiling ({profile}): per-cell dumps in {profile_dir}/")
+        
+        def cell(key, measure):
+            return log.cell(key, lambda: PROFILER.run_cell(key, measure))
+        
+        # Generate test datasets
+        print("\nGenerating test datasets...")
+        datasets = generate_test_datasets()
+        print(f"  ✓ Generated {len(datasets)} datasets")
+        
+        # Benchmark 1: Compression algorithms
+        print_header("BENCHMARK 1: COMPRESSION ALGORITHMS")
+        
+        compression_algos = ['zlib']
+        if HAS_LZ4:
+            compression_algos.append('lz4')
+        if HAS_ZSTD:
+            compression_algos.append('zstd')
+        
+        # Classic (pure Python) and entropy coders are measured here only, they
+        # back the thesis comparison figures but are not used in the combined pipeline
+        classic_algos = ['rle', 'lz77', 'lz78', 'lzw']
+        entropy_algos = ['tans'] if HAS_TANS else []
+        
+        all_results['compression'] = {}
+        
+        for dataset_name, data in datasets.items():
+            print(f"\nDataset: {dataset_name} ({len(data)} bytes)")
+            print("-" * 80)
+            
+            all_results['compression'][dataset_name] = []
+            
+            for algo in compression_algos + classic_algos + entropy_algos:
+                result = cell(f"compression/{dataset_name}/{algo}",
+                                  lambda: benchmark_compression(data, algo))
+                all_results['compression'][dataset_name].append(result)
+                print_compression_results(result)
+                print()
         
-        all_results['compression'][dataset_name] = []
+        if HAS_TANS:
+            print("\nEntropy coders (bits per byte vs order-0 entropy):")
+            all_results['entropy_coders'] = cell("entropy_coders",
+                                                     lambda: tans_codec.benchmark_entropy_coders(datasets))
+            tans_codec.print_entropy_results(all_results['entropy_coders'])
         
-        for algo in compression_algos:
-            result = benchmark_compression(data, algo)
-            all_results['compression'][dataset_name].append(result)
-            print_compression_results(result)
+        # Benchmark 2: PQC algorithms
+        print_header("BENCHMARK 2: POST-QUANTUM CRYPTOGRAPHY")
+        
+        pqc_algos = ['Kyber512', 'Kyber768', 'Kyber1024']
+        all_results['pqc'] = []
+        
+        for algo in pqc_algos:
+            print(f"\nTesting: {algo}")
+            print("-" * 80)
+            result = cell(f"pqc/{algo}", lambda: benchmark_pqc(algo))
+            all_results['pqc'].append(result)
+            print_pqc_results(result)
+            print()
+        
+        # Benchmark 3: Combined approach
+        print_header("BENCHMARK 3: COMBINED PQC + COMPRESSION")
+        
+        test_data = datasets['iot_medium']  # Use 10KB IoT data
+        all_results['combined'] = []
+        
+        for pqc_alg in pqc_algos:
+            for comp_alg in compression_algos:
+                print(f"\nConfiguration: {pqc_alg} + {comp_alg}")
+                print("-" * 80)
+                result = cell(f"combined/iot_medium/{pqc_alg}/{comp_alg}",
+                                  lambda: benchmark_combined(test_data, pqc_alg, comp_alg, dataset='iot_medium'))
+                all_results['combined'].append(result)
+                print_combined_results(result)
+                print()
+        
+        # Benchmark 4: Signature schemes
+        print_header("BENCHMARK 4: POST-QUANTUM SIGNATURES")
+        
+        sig_algos = ['Dilithium2', 'Dilithium3', 'Falcon-512', 'SPHINCS+-SHA2-128f-simple']
+        all_results['signatures'] = []
+        
+        for algo in sig_algos:
+            print(f"\nTesting: {algo}")
+            print("-" * 80)
+            result = cell(f"signature/{algo}", lambda: benchmark_signature(algo))
+            all_results['signatures'].append(result)
+            print_signature_results(result)
+            print()
+        
+        # Benchmark 5: Authenticated combined approach (compress + sign + KEM)
+        print_header("BENCHMARK 5: COMPRESS + SIGN + KEM")
+        
+        all_results['combined_authenticated'] = []
+        
+        for sig_alg in sig_algos:
+            print(f"\nConfiguration: Kyber768 + zlib + {sig_alg}")
+            print("-" * 80)
+            result = cell(f"combined/iot_medium/Kyber768/zlib/{sig_alg}",
+                              lambda: benchmark_combined(test_data, 'Kyber768', 'zlib', sig_alg, dataset='iot_medium'))
+            all_results['combined_authenticated'].append(result)
+            print_combined_results(result)
             print()
     
-    # Benchmark 2: PQC algorithms
-    print_header("BENCHMARK 2: POST-QUANTUM CRYPTOGRAPHY")
+    if log.resumed:
+        print(f"\n↺ {log.resumed} cells replayed from {log_file}")
     
-    pqc_algos = ['Kyber512', 'Kyber768', 'Kyber1024']
-    all_results['pqc'] = []
+    if profile:
+        print_header(f"PROFILE: TOP {top} HOTSPOTS (SELF TIME)")
+        print_hotspots(PROFILER.hotspots(top), PROFILER.stage_times)
     
-    for algo in pqc_algos:
-        print(f"\nTesting: {algo}")
-        print("-" * 80)
-        result = benchmark_pqc(algo)
-        all_results['pqc'].append(result)
-        print_pqc_results(result)
-        print()
+    # Benchmark 6: Energy per message on constrained devices
+    print_header("BENCHMARK 6: ENERGY PER MESSAGE")
     
-    # Benchmark 3: Combined approach
-    print_header("BENCHMARK 3: COMBINED PQC + COMPRESSION")
+    all_results['energy'] = estimate_energy(all_results['combined'] + all_results['combined_authenticated'])
+    all_results['energy_recommendation'] = recommend_configuration(all_results['energy'])
     
-    test_data = datasets['iot_medium']  # Use 10KB IoT data
-    all_results['combined'] = []
+    print_energy_results(all_results['energy'])
+    print("\nMinimum-energy configuration per device / radio:")
+    for r in all_results['energy_recommendation']:
+        print(f"  • {r['device']:<9} {r['radio']:<6} {r['configuration']:<44} "
+              f"{r['energy_per_message']*1000:.2f} mJ, {r['battery_life_days']:.0f} days")
     
-    for pqc_alg in pqc_algos:
-        for comp_alg in compression_algos:
-            print(f"\nConfiguration: {pqc_alg} + {comp_alg}")
-            print("-" * 80)
-            result = benchmark_combined(test_data, pqc_alg, comp_alg)
-            all_results['combined'].append(result)
-            print_combined_results(result)
-            print()
+    # Benchmark 7: Link-layer airtime, fragmentation and goodput
+    print_header("BENCHMARK 7: LINK-LAYER AIRTIME")
+    
+    all_results['link'] = link_report(all_results['combined'] + all_results['combined_authenticated'])
+    print_link_results(all_results['link'])
     
     # Export results
     print_header("EXPORTING RESULTS")
     export_results_json(all_results)
     export_results_latex(all_results)
+    run_id = store_results(all_results)
+    print(f"✓ Results stored as run {run_id} in {DB_FILE}")
     
     # Summary
     print_header("BENCHMARK COMPLETE")
     print("Results saved to:")
     print("  • benchmark_results.json (JSON format)")
+    print(f"  • {DB_FILE} (SQLite, one run per benchmark)")
     print("  • benchmark_results.tex (LaTeX tables)")
     print(f"\nBenchmark completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -444,12 +995,171 @@ def run_quick_benchmark():
     result = benchmark_combined(data, 'Kyber768', 'zlib')
     print_combined_results(result)
 
+# ============================================
+# SWEEP RUNNER (declarative spec, see sweep_spec.py)
+# ============================================
+
+@lru_cache(maxsize=None)
+def sweep_dataset(name):
+    """Named test dataset, or generated IoT data for "iot_<N>kb" (generated once per process)"""
+    datasets = generate_test_datasets()
+    if name in datasets:
+        return datasets[name]
+    match = re.fullmatch(r'iot_(\d+)kb', name)
+    if match:
+        return generate_iot_data(int(match.group(1)))
+    raise ValueError(f"Unknown dataset: {name}")
+
+@lru_cache(maxsize=None)
+def sweep_batch(name, batch):
+    """`batch` distinct messages the size of IoT dataset `name`
+
+    Like the dataset, each message is one reading repeated to the size, but
+    every message holds a different reading (sequence number, timestamp,
+    values), so a batch does not compress as N copies of one message would.
+    """
+    size = len(sweep_dataset(name))
+    return tuple((reading * (size // len(reading) + 1))[:size]
+                 for reading in generate_iot_readings(batch))
+
+def run_sweep_cell(cell):
+    """Measure one sweep cell (module level so worker processes can run it)
+    
+    A batch of N sends N distinct messages (sweep_batch) as one payload under
+    one encapsulation; per-message figures are the totals divided by N.
+    """
+    data = sweep_dataset(cell.dataset) if cell.dataset else None
+    if cell.benchmark == 'compression':
+        return benchmark_compression(data, cell.codec, cell.level)
+    if cell.benchmark == 'pqc':
+        return benchmark_pqc(cell.kem)
+    if cell.benchmark == 'signature':
+        return benchmark_signature(cell.signature)
+    
+    sig_alg = cell.signature if cell.benchmark == 'authenticated' else None
+    if cell.batch != 1:
+        data = b''.join(sweep_batch(cell.dataset, cell.batch))
+    result = benchmark_combined(data, cell.kem, cell.codec, sig_alg, cell.level, cell.dataset)
+    if cell.batch != 1:
+        result['batch_size'] = cell.batch
+        result['per_message_transmission'] = result.get('total_transmission', 0) / cell.batch
+        result['per_message_time'] = result.get('total_time', 0) / cell.batch
+    return result
+
+def sweep_summary(cell, result):
+    """(bytes on the wire, seconds) of a cell, per message for batches"""
+    if cell.benchmark == 'compression':
+        return result.get('compressed_size', 0), result.get('compression_time', 0) + result.get('decompression_time', 0)
+    if cell.benchmark == 'pqc':
+        return result.get('ct_size', 0), sum(result.get(f'{op}_time', 0) for op in ('keygen', 'encap', 'decap'))
+    if cell.benchmark == 'signature':
+        return result.get('sig_size', 0), sum(result.get(f'{op}_time', 0) for op in ('keygen', 'sign', 'verify'))
+    return (result.get('per_message_transmission', result.get('total_transmission', 0)),
+            result.get('per_message_time', result.get('total_time', 0)))
+
+def print_sweep_results(rows):
+    """One line per cell"""
+    print(f"{'Cell':<52} {'Bytes':>9} {'Time (ms)':>10} {'OK':>3}")
+    print("-" * 77)
+    for r in rows:
+        print(f"{r['key'][:52]:<52} {r['bytes']:>9,.0f} {r['time']*1000:>10.3f} {'✓' if r['success'] else '✗':>3}")
+    print("\nBytes: compressed / ciphertext / signature / total transmission per message")
+
+def run_sweep(spec_file, selection=None, shard=None, resume=False, log_file=LOG_FILE, list_only=False):
+    """Run the selected cells of a sweep spec
+    
+    Cells share the ResultLog (and keys) of run_full_benchmark, so --resume
+    skips cells recorded by either. Cells with workers=N run N at a time in
+    worker processes (timings then include the contention).
+    """
+    spec = load_spec(spec_file)
+    expanded = expand_cells(spec)
+    cells = select_cells(expanded, selection, shard)
+    print_header(f"SWEEP: {spec['name'].upper()}")
+    print(f"{len(expanded)} unique cells in {spec_file}, {len(cells)} selected")
+    if list_only:
+        for cell in cells:
+            print(f"  {cell_key(cell)}")
+        return []
+    
+    with ResultLog(log_file, resume=resume) as log:
+        if resume:
+            print(f"Resuming: {len(log.done)} cells already recorded in {log_file}")
+        rows = []
+        for workers in dict.fromkeys(cell.workers for cell in cells):
+            group = [cell for cell in cells if cell.workers == workers]
+            measured = {}
+            pending = [cell for cell in group if cell_key(cell) not in log.done]
+            if workers > 1 and pending:
+                with ProcessPoolExecutor(workers) as pool:
+                    for cell, result in zip(pending, pool.map(run_sweep_cell, pending)):
+                        measured[cell_key(cell)] = result
+                        log.record(cell_key(cell), result)
+            
+            for cell in group:
+                key = cell_key(cell)
+                result = measured[key] if key in measured else log.cell(key, lambda: run_sweep_cell(cell))
+                wire_bytes, seconds = sweep_summary(cell, result)
+                rows.append({'key': key, 'cell': cell._asdict(), 'result': result, 'bytes': wire_bytes,
+                             'time': seconds, 'success': result.get('success', False)})
+    
+    print_sweep_results(rows)
+    if log.resumed:
+        print(f"↺ {log.resumed} cells replayed from {log_file}")
+    export_results_json({'spec': spec, 'cells': rows}, f"{spec['name']}_results.json")
+    return rows
+
 # ============================================
 # ENTRY POINT
 # ============================================
 
+USAGE = """Usage: python benchmark_pqc_compression.py [--resume] [--profile [sample]] [--profile-dir DIR] [--top N]
+       python benchmark_pqc_compression.py --quick | --calibrate
+       python benchmark_pqc_compression.py --sweep SPEC [--select AXIS=V1,V2 ...] [--shard I/N] [--list] [--resume]"""
+
+def option_values(args, name):
+    """Every value given to option `name` (the argument after each occurrence)"""
+    values = []
+    for i, arg in enumerate(args):
+        if arg == name:
+            if i + 1 == len(args) or args[i + 1].startswith('--'):
+                raise ValueError(f"{name} needs a value")
+            values.append(args[i + 1])
+    return values
+
+def option_value(args, name, default=None):
+    values = option_values(args, name)
+    return values[-1] if values else default
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == '--quick':
+    args = sys.argv[1:]
+    try:
+        if '--sweep' in args:
+            spec_file = option_value(args, '--sweep')
+            if not os.path.isfile(spec_file):
+                raise ValueError(f"Sweep spec not found: {spec_file}")
+            selection = parse_selection(option_values(args, '--select'))
+            shard = parse_shard(option_value(args, '--shard')) if '--shard' in args else None
+        else:
+            profile_dir = option_value(args, '--profile-dir', PROFILE_DIR)
+            top = option_value(args, '--top', TOP_N)
+            if not str(top).isdigit():
+                raise ValueError(f"--top takes a number, got '{top}'")
+            top = int(top)
+    except ValueError as e:
+        sys.exit(f"Error: {e}\n{USAGE}")
+    
+    if args[:1] == ['--quick']:
         run_quick_benchmark()
+    elif args[:1] == ['--calibrate']:
+        print("\n[CALIBRATION MODE]\n")
+        calibrate_pqc()
+    elif '--sweep' in args:
+        run_sweep(spec_file, selection=selection, shard=shard,
+                  resume='--resume' in args, list_only='--list' in args)
     else:
-        run_full_benchmark()
+        profile = None
+        if '--profile' in args:
+            following = args[args.index('--profile') + 1:args.index('--profile') + 2]
+            profile = 'sample' if following == ['sample'] else 'cprofile'
+        run_full_benchmark(resume='--resume' in args, profile=profile, profile_dir=profile_dir, top=top)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Block-Parallel Compression
+Splits large payloads (batched readings, firmware logs) into independent
+blocks that are compressed and decompressed on a thread pool. zlib, lz4 and
+zstandard release the GIL while they work, so the blocks run on all cores.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Container layout:
+    magic 'PBC1' | algorithm (1 B) | block count (4 B)
+    block index: (compressed size, original size) per block, 4 B each
+    compressed blocks, back to back
+"""
+
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_pqc_compression import generate_iot_readings, print_header
+from pqc_compression_demo import HAS_LZ4, HAS_ZSTD, compress_data, decompress_data
+
+MAGIC = b'PBC1'
+HEADER = struct.Struct('>4sBI')
+INDEX_ENTRY = struct.Struct('>II')
+DEFAULT_BLOCK_SIZE = 256 * 1024
+
+ALGORITHM_IDS = {'zlib': 1, 'lz4': 2, 'zstd': 3}
+ALGORITHM_NAMES = {v: k for k, v in ALGORITHM_IDS.items()}
+
+# ============================================
+# CONTAINER
+# ============================================
+
+def split_blocks(data, block_size=DEFAULT_BLOCK_SIZE):
+    """Zero-copy views of consecutive blocks"""
+    view = memoryview(data)
+    return [view[i:i + block_size] for i in range(0, len(data), block_size)]
+
+def compress_parallel(data, algorithm='zlib', block_size=DEFAULT_BLOCK_SIZE, workers=None):
+    """Compress independent blocks on a thread pool, returns the container bytes"""
+    if algorithm not in ALGORITHM_IDS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    blocks = split_blocks(data, block_size)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        compressed = list(pool.map(lambda block: compress_data(block, algorithm), blocks))
+
+    index = b''.join(INDEX_ENTRY.pack(len(c), len(b)) for c, b in zip(compressed, blocks))
+    return HEADER.pack(MAGIC, ALGORITHM_IDS[algorithm], len(blocks)) + index + b''.join(compressed)
+
+def read_index(container):
+    """Algorithm and (offset, compressed size, original size) per block"""
+    magic, algorithm_id, count = HEADER.unpack_from(container)
+    if magic != MAGIC:
+        raise ValueError("Not a block-parallel container")
+
+    entries = []
+    offset = HEADER.size + count * INDEX_ENTRY.size
+    for i in range(count):
+        compressed_size, original_size = INDEX_ENTRY.unpack_from(container, HEADER.size + i * INDEX_ENTRY.size)
+        entries.append((offset, compressed_size, original_size))
+        offset += compressed_size
+    return ALGORITHM_NAMES[algorithm_id], entries
+
+def decompress_parallel(container, workers=None):
+    """Decompress all blocks on a thread pool into one preallocated buffer"""
+    algorithm, entries = read_index(container)
+    view = memoryview(container)
+    out = bytearray(sum(size for _, _, size in entries))
+    out_view = memoryview(out)
+
+    starts = []
+    position = 0
+    for _, _, size in entries:
+        starts.append(position)
+        position += size
+
+    def inflate(i):
+        offset, compressed_size, original_size = entries[i]
+        block = decompress_data(view[offset:offset + compressed_size], algorithm)
+        if len(block) != original_size:
+            raise ValueError(f"Block {i}: expected {original_size} bytes, got {len(block)}")
+        out_view[starts[i]:starts[i] + original_size] = block
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        list(pool.map(inflate, range(len(entries))))
+    return bytes(out)
+
+# ============================================
+# BENCHMARK: CORE SCALING AND BLOCK-BOUNDARY LOSS
+# ============================================
+
+def generate_log_payload(size_mb=8):
+    """Large batched-readings payload (a day of readings from many sensors)"""
+    readings = []
+    size = 0
+    sensor = 0
+    while size < size_mb * 1024 * 1024:
+        batch = generate_iot_readings(500, sensor_id=f"sensor_{sensor:04d}")
+        readings.extend(batch)
+        size += sum(len(r) + 1 for r in batch)
+        sensor += 1
+    return b'\n'.join(readings)[:size_mb * 1024 * 1024]
+
+def benchmark_block_parallel(size_mb=8, algorithms=None, block_sizes=(64 * 1024, 256 * 1024, 1024 * 1024),
+                             max_workers=None, repeats=3):
+    """Throughput from 1..N threads and ratio lost to block boundaries (best of `repeats`)"""
+    data = generate_log_payload(size_mb)
+    algorithms = algorithms or ['zlib'] + (['lz4'] if HAS_LZ4 else []) + (['zstd'] if HAS_ZSTD else [])
+    max_workers = max_workers or max(os.cpu_count() or 1, 4)
+    mb = len(data) / 1024 / 1024
+    results = []
+
+    for algorithm in algorithms:
+        whole = len(compress_data(data, algorithm))
+
+        for block_size in block_sizes:
+            workers = 1
+            while workers <= max_workers:
+                compress_time = decompress_time = float('inf')
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    container = compress_parallel(data, algorithm, block_size, workers)
+                    compress_time = min(compress_time, time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    restored = decompress_parallel(container, workers)
+                    decompress_time = min(decompress_time, time.perf_counter() - start)
+
+                results.append({
+                    'algorithm': algorithm,
+                    'block_size': block_size,
+                    'workers': workers,
+                    'original_size': len(data),
+                    'compressed_size': len(container),
+                    'single_stream_size': whole,
+                    'ratio': len(data) / len(container),
+                    'ratio_loss': (len(container) / whole - 1) * 100,
+                    'compress_mbps': mb / compress_time,
+                    'decompress_mbps': mb / decompress_time,
+                    'success': restored == data
+                })
+                workers *= 2
+
+    # Speedup relative to 1 thread for the same algorithm / block size
+    baseline = {(r['algorithm'], r['block_size']): r for r in results if r['workers'] == 1}
+    for r in results:
+        base = baseline[(r['algorithm'], r['block_size'])]
+        r['compress_speedup'] = r['compress_mbps'] / base['compress_mbps']
+        r['decompress_speedup'] = r['decompress_mbps'] / base['decompress_mbps']
+    return results
+
+def print_block_parallel_results(results):
+    """Print scaling table"""
+    print(f"{'Codec':<6} {'Block':>7} {'Threads':>8} {'Ratio':>7} {'Loss':>7} {'Comp MB/s':>10} "
+          f"{'x':>5} {'Decomp MB/s':>12} {'x':>5} {'OK':>3}")
+    print("-" * 82)
+    for r in results:
+        print(f"{r['algorithm']:<6} {r['block_size']//1024:>5}KB {r['workers']:>8} {r['ratio']:>6.1f}x "
+              f"{r['ratio_loss']:>6.1f}% {r['compress_mbps']:>10.1f} {r['compress_speedup']:>5.2f} "
+              f"{r['decompress_mbps']:>12.1f} {r['decompress_speedup']:>5.2f} {'✓' if r['success'] else '✗':>3}")
+    print(f"\nLoss: container size vs one-shot compression of the whole payload "
+          f"(host has {os.cpu_count()} CPU(s))")
+
+if __name__ == "__main__":
+    size_mb = 2 if '--quick' in sys.argv else 8
+    print_header("BLOCK-PARALLEL COMPRESSION")
+    print_block_parallel_results(benchmark_block_parallel(size_mb))
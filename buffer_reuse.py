@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Buffer Reuse Benchmark
+Compares the bytes-returning compression / framing calls with their *_into
+variants writing into a preallocated buffer, on memoryview slices of one
+receive buffer (as a gateway sees them). Reports time per call and the heap
+allocated per call (tracemalloc peak).
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmark_pqc_compression import generate_test_datasets, print_header
+from compression_demo import (
+    huffman_encode, huffman_encode_into, rle_decode, rle_decode_into, rle_encode, rle_encode_into
+)
+from pqc_compression_demo import (
+    HAS_AESGCM, HAS_LZ4, HAS_ZSTD, BufferArena, compress_data, compress_data_into, decompress_data,
+    decompress_data_into, seal_message, seal_message_into
+)
+
+# ============================================
+# OPERATIONS
+# ============================================
+
+def pipeline_ops(data):
+    """name -> (bytes-returning call, *_into call writing into the arena)
+
+    Inputs are memoryview slices of a larger receive buffer, not bytes copies.
+    """
+    receive = bytearray(16) + data
+    view = memoryview(receive)[16:]
+    key = os.urandom(32)
+    arena = BufferArena(4 * len(data) + 1024)
+
+    def into(function, *args):
+        def call():
+            arena.reset()
+            arena.commit(function(*args[:1], arena.free(), *args[1:]))
+        return call
+
+    ops = {}
+    for algorithm in ['zlib'] + (['lz4'] if HAS_LZ4 else []) + (['zstd'] if HAS_ZSTD else []):
+        compressed = memoryview(bytearray(16) + compress_data(data, algorithm))[16:]
+        ops[f'{algorithm} compress'] = (lambda a=algorithm: compress_data(view, a),
+                                        into(compress_data_into, view, algorithm))
+        ops[f'{algorithm} decompress'] = (lambda c=compressed, a=algorithm: decompress_data(c, a),
+                                          into(decompress_data_into, compressed, algorithm))
+
+    rle = memoryview(bytearray(16) + rle_encode(data))[16:]
+    ops['rle encode'] = (lambda: rle_encode(view), into(rle_encode_into, view))
+    ops['rle decode'] = (lambda: rle_decode(rle), into(rle_decode_into, rle))
+
+    def huffman_into():
+        arena.reset()
+        arena.commit(huffman_encode_into(view, arena.free())[0])
+    ops['huffman encode'] = (lambda: huffman_encode(view), huffman_into)
+
+    if HAS_AESGCM:
+        ops['aes-gcm seal'] = (lambda: seal_message(key, view), into(lambda v, dst: seal_message_into(key, v, dst), view))
+    return ops
+
+# ============================================
+# BENCHMARK: TIME AND HEAP PER CALL
+# ============================================
+
+def heap_per_call(call, calls=50):
+    """Mean peak heap bytes allocated during one call (tracemalloc)"""
+    call()
+    tracemalloc.start()
+    total = 0
+    for _ in range(calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / calls
+
+def time_per_call(call, min_time=0.2):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        call()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+def benchmark_buffer_api(datasets=('iot_small', 'iot_medium')):
+    """Time and heap per call: bytes-returning API vs *_into into a reused arena"""
+    all_data = generate_test_datasets()
+    results = []
+    for dataset in datasets:
+        data = all_data[dataset]
+        for name, (returning, into) in pipeline_ops(data).items():
+            r = {'dataset': dataset, 'operation': name, 'size': len(data)}
+            for api, call in (('bytes', returning), ('into', into)):
+                r[f'{api}_time'] = time_per_call(call)
+                r[f'{api}_heap'] = heap_per_call(call)
+            r['heap_saved'] = (1 - r['into_heap'] / r['bytes_heap']) * 100 if r['bytes_heap'] else 0
+            results.append(r)
+    return results
+
+def print_buffer_results(results):
+    """Print per-operation comparison"""
+    print(f"{'Dataset':<11} {'Operation':<16} {'bytes µs':>9} {'into µs':>9} "
+          f"{'bytes heap':>11} {'into heap':>10} {'Saved':>7}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r['dataset']:<11} {r['operation']:<16} {r['bytes_time']*1e6:>9.1f} {r['into_time']*1e6:>9.1f} "
+              f"{r['bytes_heap']:>9,.0f} B {r['into_heap']:>8,.0f} B {r['heap_saved']:>6.1f}%")
+    print("\nheap = peak bytes allocated during one call (tracemalloc); inputs are memoryview slices")
+
+if __name__ == "__main__":
+    print_header("BUFFER-PROTOCOL / OUTPUT-INTO-BUFFER API")
+    print_buffer_results(benchmark_buffer_api())
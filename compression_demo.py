@@ -10,6 +10,9 @@ import gzip
 import time
 from collections import Counter
 import heapq
+import struct
+
+WORD = struct.Struct('>I')
 
 # ============================================
 # 1. RUN-LENGTH ENCODING (RLE)
@@ -17,34 +20,67 @@ import heapq
 
 def rle_encode(data):
     """Simple Run-Length Encoding implementation"""
-    if not data:
-        return b''
+    out = bytearray(2 * len(data))
+    del out[rle_encode_into(data, out):]
+    return bytes(out)
+
+def rle_encode_into(data, dst):
+    """RLE of any buffer (bytes, bytearray, memoryview slice) into dst, returns bytes written"""
+    src = memoryview(data).cast('B')
+    out = memoryview(dst).cast('B')
+    if not len(src):
+        return 0
     
-    encoded = []
+    pos = 0
     count = 1
-    prev = data[0]
+    prev = src[0]
     
-    for byte in data[1:]:
+    for byte in src[1:]:
         if byte == prev and count < 255:
             count += 1
         else:
-            encoded.append(prev)
-            encoded.append(count)
+            if pos + 2 > len(out):
+                raise ValueError(f"Output buffer too small ({len(out)} bytes)")
+            out[pos] = prev
+            out[pos + 1] = count
+            pos += 2
             prev = byte
             count = 1
     
-    encoded.append(prev)
-    encoded.append(count)
-    
-    return bytes(encoded)
+    if pos + 2 > len(out):
+        raise ValueError(f"Output buffer too small ({len(out)} bytes)")
+    out[pos] = prev
+    out[pos + 1] = count
+    return pos + 2
 
 def rle_decode(data):
     """Decode RLE encoded data"""
-    decoded = []
-    for i in range(0, len(data), 2):
-        if i + 1 < len(data):
-            decoded.extend([data[i]] * data[i + 1])
-    return bytes(decoded)
+    out = bytearray(rle_decoded_size(data))
+    rle_decode_into(data, out)
+    return bytes(out)
+
+# Runs of every byte value at the maximum run length, sliced without copying
+_RUNS = [memoryview(bytes((value,)) * 255) for value in range(256)]
+
+def rle_decoded_size(data):
+    """Output size of rle_decode (sum of the run counts)"""
+    src = memoryview(data).cast('B')
+    return sum(src[1:len(src) - len(src) % 2:2])
+
+def rle_decode_into(data, dst):
+    """Decode RLE from any buffer into dst, returns bytes written"""
+    src = memoryview(data).cast('B')
+    out = memoryview(dst).cast('B')
+    size = rle_decoded_size(src)
+    if size > len(out):
+        raise ValueError(f"Output buffer too small ({len(out)} bytes, need {size})")
+    
+    pos = 0
+    for i in range(0, len(src) - 1, 2):
+        count = src[i + 1]
+        out[pos:pos + count] = _RUNS[src[i]][:count]
+        pos += count
+    return pos
 
 # ============================================
 # 2. HUFFMAN CODING
@@ -97,16 +133,53 @@ def huffman_encode(data):
     tree = build_huffman_tree(data)
     codes = build_codes(tree)
     
-    encoded_bits = ''.join(codes[byte] for byte in data)
+    encoded = bytearray(_huffman_size(data, codes))
+    _huffman_pack(data, codes, encoded)
+    
+    return bytes(encoded), codes
+
+def huffman_encode_into(data, dst):
+    """Huffman-code any buffer into dst, returns (bytes written, code table)"""
+    src = memoryview(data).cast('B')
+    if not len(src):
+        return 0, {}
     
-    # Convert bit string to bytes
-    padding = 8 - len(encoded_bits) % 8
-    if padding != 8:
-        encoded_bits += '0' * padding
+    codes = build_codes(build_huffman_tree(src))
+    size = _huffman_size(src, codes)
+    if size > len(memoryview(dst)):
+        raise ValueError(f"Output buffer too small ({len(memoryview(dst))} bytes, need {size})")
+    return _huffman_pack(src, codes, dst), codes
+
+def _huffman_size(data, codes):
+    """Encoded size in bytes (bits padded to a whole byte)"""
+    bits = sum(freq * len(codes[byte]) for byte, freq in Counter(data).items())
+    return (bits + 7) // 8
+
+def _huffman_pack(data, codes, dst):
+    """Pack the codes of data MSB-first into dst, 32 bits at a time"""
+    table = {byte: (int(code, 2) if code else 0, len(code)) for byte, code in codes.items()}
+    out = memoryview(dst).cast('B')
+    acc = 0
+    pending = 0
+    pos = 0
     
-    encoded_bytes = int(encoded_bits, 2).to_bytes(len(encoded_bits) // 8, 'big')
+    for byte in memoryview(data).cast('B'):
+        value, length = table[byte]
+        acc = (acc << length) | value
+        pending += length
+        if pending >= 32:
+            pending -= 32
+            WORD.pack_into(out, pos, acc >> pending)
+            acc &= (1 << pending) - 1
+            pos += 4
     
-    return encoded_bytes, codes
+    # Last bits, zero-padded to a whole byte
+    while pending > 0:
+        shift = pending - 8
+        out[pos] = (acc >> shift if shift >= 0 else acc << -shift) & 0xFF
+        pending -= 8
+        pos += 1
+    return pos
 
 # ============================================
 # 3. MODERN COMPRESSION (using libraries)
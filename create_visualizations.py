@@ -5,20 +5,22 @@ For thesis presentation and report
 Abdessamad JAOUAD - M2 Big Data & IoT
 """
 
-import json
+import sys
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 
+from figure_output import save_figure
+
 def load_results():
-    """Load benchmark results from JSON"""
-    try:
-        with open('benchmark_results.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Error: benchmark_results.json not found!")
+    """Load the latest benchmark run (results store, else JSON export)"""
+    from figure_build import load_results as load_latest
+    results = load_latest()
+    if not results:
+        print("Error: no benchmark results found (benchmark_results.db / .json)!")
         print("Run: python3 benchmark_pqc_compression.py first")
         return None
+    return results
 
 def plot_compression_comparison(results):
     """Plot compression algorithm comparison"""
@@ -62,7 +64,7 @@ def plot_compression_comparison(results):
     ax2.text(1, savings, f'{savings:.1f}%', ha='center', va='bottom', fontweight='bold', fontsize=12)
     
     plt.tight_layout()
-    plt.savefig('compression_comparison.png', dpi=300, bbox_inches='tight')
+    save_figure('compression_comparison.png', bbox_inches='tight')
     print("✓ Created: compression_comparison.png")
     plt.close()
 
@@ -99,7 +101,7 @@ def plot_pqc_sizes(results):
                    ha='center', va='bottom', fontsize=9)
     
     plt.tight_layout()
-    plt.savefig('pqc_sizes.png', dpi=300, bbox_inches='tight')
+    save_figure('pqc_sizes.png', bbox_inches='tight')
     print("✓ Created: pqc_sizes.png")
     plt.close()
 
@@ -108,7 +110,7 @@ def plot_combined_comparison(results):
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
     # Extract data
-    configs = [f"{r['pqc_algorithm']}\n+ZLIB" for r in results['combined']]
+    configs = [f"{r['pqc_algorithm']}\n+{r['compression'].upper()}" for r in results['combined']]
     original = [r['original_size']/1024 for r in results['combined']]
     transmitted = [r['total_transmission']/1024 for r in results['combined']]
     savings = [r['bandwidth_savings'] for r in results['combined']]
@@ -149,7 +151,7 @@ def plot_combined_comparison(results):
                 ha='center', va='bottom', fontweight='bold', fontsize=11)
     
     plt.tight_layout()
-    plt.savefig('combined_comparison.png', dpi=300, bbox_inches='tight')
+    save_figure('combined_comparison.png', bbox_inches='tight')
     print("✓ Created: combined_comparison.png")
     plt.close()
 
@@ -159,7 +161,8 @@ def plot_workflow_diagram(results):
     ax.axis('off')
     
     # Get sample data
-    sample = results['combined'][1]  # Kyber768 + ZLIB
+    sample = next(r for r in results['combined']
+                  if r['pqc_algorithm'] == 'Kyber768' and r['compression'] == 'zlib')
     
     # Draw boxes
     boxes = [
@@ -218,7 +221,7 @@ def plot_workflow_diagram(results):
     ax.set_ylim(0, 1)
     
     plt.tight_layout()
-    plt.savefig('workflow_diagram.png', dpi=300, bbox_inches='tight')
+    save_figure('workflow_diagram.png', bbox_inches='tight')
     print("✓ Created: workflow_diagram.png")
     plt.close()
 
@@ -236,7 +239,7 @@ def create_summary_table_image(results):
     
     for r in results['combined']:
         row = [
-            f"{r['pqc_algorithm']}\n+ ZLIB",
+            f"{r['pqc_algorithm']}\n+ {r['compression'].upper()}",
             f"{r['original_size']/1024:.1f}",
             f"{r['compressed_size']/1024:.2f}",
             f"{r['total_transmission']/1024:.2f}",
@@ -274,7 +277,7 @@ def create_summary_table_image(results):
            transform=ax.transAxes)
     
     plt.tight_layout()
-    plt.savefig('summary_table.png', dpi=300, bbox_inches='tight')
+    save_figure('summary_table.png', bbox_inches='tight')
     print("✓ Created: summary_table.png")
     plt.close()
 
@@ -308,11 +311,9 @@ def main():
     print("-" * 70)
     
     try:
-        plot_compression_comparison(results)
-        plot_pqc_sizes(results)
-        plot_combined_comparison(results)
-        plot_workflow_diagram(results)
-        create_summary_table_image(results)
+        # Only figures whose input data (or plotting code) changed are re-rendered
+        from figure_build import RESULTS_FIGURES, build_figures, build_options, print_build_report
+        print_build_report(build_figures(RESULTS_FIGURES, results=results, **build_options(sys.argv)))
     except Exception as e:
         print(f"\n✗ Error creating visualizations: {e}")
         print("  Make sure matplotlib is installed: pip install matplotlib")
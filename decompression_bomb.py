@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Decompression Bomb Benchmark
+Feeds adversarial payloads (tiny frames that inflate to hundreds of MB) to
+decompress_data and to decompress_bounded, each in a fresh subprocess, and
+compares the peak RSS of the gateway process.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: python decompression_bomb.py [--size-mb N]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+from benchmark_pqc_compression import print_header
+from pqc_compression_demo import (
+    DecompressionLimitError, HAS_LZ4, HAS_ZSTD, decompress_bounded, decompress_data
+)
+
+if HAS_LZ4:
+    import lz4.frame as lz4
+if HAS_ZSTD:
+    import zstandard as zstd
+
+# ============================================
+# ADVERSARIAL PAYLOADS
+# ============================================
+
+def make_bomb(algorithm, size_mb=256):
+    """Frame of `size_mb` MB of zeros, built in 1 MB pieces so this process stays small"""
+    piece = bytes(1024 * 1024)
+    if algorithm == 'zlib':
+        c = zlib.compressobj(9)
+        return b''.join([c.compress(piece) for _ in range(size_mb)] + [c.flush()])
+    if algorithm == 'lz4':
+        c = lz4.LZ4FrameCompressor()
+        return b''.join([c.begin()] + [c.compress(piece) for _ in range(size_mb)] + [c.flush()])
+    if algorithm == 'zstd':
+        # Declares its content size so one-shot decompress_data accepts it
+        c = zstd.ZstdCompressor(level=3).compressobj(size=size_mb * len(piece))
+        return b''.join([c.compress(piece) for _ in range(size_mb)] + [c.flush()])
+    raise ValueError(f"Unknown algorithm: {algorithm}")
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def _child(mode, algorithm, path):
+    """Subprocess body: decompress one payload, print 'outcome peak_rss time'"""
+    with open(path, 'rb') as f:
+        payload = f.read()
+    start = time.perf_counter()
+    try:
+        if mode == 'unbounded':
+            outcome = f"inflated:{len(decompress_data(payload, algorithm))}"
+        elif mode == 'bounded':
+            outcome = f"inflated:{len(decompress_bounded(payload, algorithm))}"
+        else:
+            outcome = 'idle'
+    except DecompressionLimitError:
+        outcome = 'rejected'
+    except MemoryError:
+        outcome = 'oom'
+    print(outcome, peak_rss_mb(), time.perf_counter() - start)
+
+# ============================================
+# BENCHMARK: PEAK RSS BEFORE / AFTER
+# ============================================
+
+def run_child(mode, algorithm, path):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, algorithm, path],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'outcome': f"exit {result.returncode}", 'peak_rss_mb': float('nan'), 'time': 0}
+    outcome, rss, elapsed = result.stdout.split()
+    return {'outcome': outcome, 'peak_rss_mb': float(rss), 'time': float(elapsed)}
+
+def benchmark_bombs(size_mb=256, algorithms=None):
+    """Peak RSS of decompress_data vs decompress_bounded on one bomb per codec"""
+    algorithms = algorithms or ['zlib'] + (['lz4'] if HAS_LZ4 else []) + (['zstd'] if HAS_ZSTD else [])
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for algorithm in algorithms:
+            path = os.path.join(tmp, f"bomb.{algorithm}")
+            bomb = make_bomb(algorithm, size_mb)
+            with open(path, 'wb') as f:
+                f.write(bomb)
+
+            baseline = run_child('idle', algorithm, path)
+            for mode in ('unbounded', 'bounded'):
+                r = run_child(mode, algorithm, path)
+                results.append({
+                    'algorithm': algorithm,
+                    'mode': mode,
+                    'payload_size': len(bomb),
+                    'bomb_size': size_mb * 1024 * 1024,
+                    'outcome': r['outcome'],
+                    'peak_rss_mb': r['peak_rss_mb'],
+                    'rss_growth_mb': r['peak_rss_mb'] - baseline['peak_rss_mb'],
+                    'time': r['time'],
+                    'success': r['outcome'] == ('rejected' if mode == 'bounded' else f"inflated:{size_mb << 20}")
+                })
+    return results
+
+def print_bomb_results(results):
+    """Print peak RSS table"""
+    print(f"{'Codec':<6} {'Payload':>9} {'Inflates to':>12} {'Mode':<10} {'Outcome':<18} "
+          f"{'Peak RSS':>9} {'Growth':>9} {'Time ms':>9} {'OK':>3}")
+    print("-" * 95)
+    for r in results:
+        print(f"{r['algorithm']:<6} {r['payload_size']:>9,} {r['bomb_size']//1024//1024:>9} MB {r['mode']:<10} "
+              f"{r['outcome']:<18} {r['peak_rss_mb']:>6.1f} MB {r['rss_growth_mb']:>6.1f} MB "
+              f"{r['time']*1000:>9.1f} {'✓' if r['success'] else '✗':>3}")
+    print("\nGrowth: peak RSS above a subprocess that only loads the payload")
+
+if __name__ == "__main__":
+    if '--child' in sys.argv:
+        _child(*sys.argv[sys.argv.index('--child') + 1:][:3])
+        sys.exit(0)
+
+    size_mb = int(sys.argv[sys.argv.index('--size-mb') + 1]) if '--size-mb' in sys.argv else 256
+    print_header("DECOMPRESSION BOMBS: PEAK RSS")
+    print_bomb_results(benchmark_bombs(size_mb))
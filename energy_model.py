@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Device Energy Model
+Turns measured CPU time and bytes on the wire into joules per reading,
+battery-life projections and a minimum-energy recommendation.
+For IoT PQC Project - Abdessamad JAOUAD
+
+All figures are datasheet-level approximations; edit the profiles below to
+match the actual hardware.
+"""
+
+# ============================================
+# DEVICE AND RADIO PROFILES
+# ============================================
+
+# Clock of the machine the benchmarks run on: measured host time is scaled by
+# host_clock / mcu_clock * cpu_scale to estimate the MCU execution time.
+HOST_CLOCK_MHZ = 3000
+
+DEVICE_PROFILES = {
+    'nrf52840': {
+        'name': 'nRF52840 (Cortex-M4F)',
+        'clock_mhz': 64,
+        'cpu_scale': 3.0,           # Cycles per host cycle (IPC gap, no SIMD)
+        'active_current_ma': 6.3,
+        'sleep_current_ua': 3.0,
+        'voltage': 3.0,
+        'battery_mah': 2000,
+    },
+    'stm32l4': {
+        'name': 'STM32L476 (Cortex-M4F)',
+        'clock_mhz': 80,
+        'cpu_scale': 3.0,
+        'active_current_ma': 10.2,
+        'sleep_current_ua': 1.5,
+        'voltage': 3.3,
+        'battery_mah': 2400,
+    },
+    'esp32': {
+        'name': 'ESP32 (Xtensa LX6)',
+        'clock_mhz': 240,
+        'cpu_scale': 2.0,
+        'active_current_ma': 50.0,
+        'sleep_current_ua': 10.0,
+        'voltage': 3.3,
+        'battery_mah': 2400,
+    },
+}
+
+# Radio cost = fixed energy per message (wake-up, preamble, RX windows,
+# connection set-up) + energy per payload byte
+RADIO_PROFILES = {
+    'lora': {
+        'name': 'LoRa SF7/125 kHz',
+        'per_message_uj': 25_000,
+        'per_byte_uj': 190,
+    },
+    'nbiot': {
+        'name': 'NB-IoT (PSM, 23 dBm)',
+        'per_message_uj': 150_000,
+        'per_byte_uj': 60,
+    },
+    'ble': {
+        'name': 'BLE 1M PHY',
+        'per_message_uj': 50,
+        'per_byte_uj': 0.3,
+    },
+}
+
+# ============================================
+# ENERGY MODEL
+# ============================================
+
+def mcu_time(host_cpu_time, device):
+    """Estimated execution time on the MCU for a measured host CPU time"""
+    return host_cpu_time * (HOST_CLOCK_MHZ / device['clock_mhz']) * device['cpu_scale']
+
+def message_energy(host_cpu_time, tx_bytes, device='nrf52840', radio='lora'):
+    """Energy (joules) for one message: CPU part + radio part"""
+    device = DEVICE_PROFILES[device] if isinstance(device, str) else device
+    radio = RADIO_PROFILES[radio] if isinstance(radio, str) else radio
+
+    cpu_seconds = mcu_time(host_cpu_time, device)
+    cpu_energy = cpu_seconds * device['active_current_ma'] / 1000 * device['voltage']
+    radio_energy = (radio['per_message_uj'] + radio['per_byte_uj'] * tx_bytes) / 1e6
+
+    return {
+        'mcu_time': cpu_seconds,
+        'cpu_energy': cpu_energy,
+        'radio_energy': radio_energy,
+        'energy_per_message': cpu_energy + radio_energy
+    }
+
+def battery_life_days(energy_per_message, device='nrf52840', messages_per_day=96):
+    """Projected battery life with the device sleeping between messages"""
+    device = DEVICE_PROFILES[device] if isinstance(device, str) else device
+
+    battery_joules = device['battery_mah'] * 3.6 * device['voltage']
+    sleep_joules = device['sleep_current_ua'] / 1e6 * device['voltage'] * 86400
+    daily_joules = energy_per_message * messages_per_day + sleep_joules
+
+    return battery_joules / daily_joules
+
+def device_cpu_time(result):
+    """Device-side CPU time of a benchmark_combined result
+
+    Only what the sensor runs is counted: compression, encapsulation and
+    signing. Key generation, decapsulation, verification and decompression
+    happen on the gateway.
+    """
+    return (result.get('compression_time', 0) + result.get('encap_time', 0) +
+            result.get('sign_time', 0))
+
+def estimate_energy(results, devices=None, radios=None, messages_per_day=96):
+    """Energy per message and battery life for every result x device x radio"""
+    devices = devices or list(DEVICE_PROFILES)
+    radios = radios or list(RADIO_PROFILES)
+    estimates = []
+
+    for result in results:
+        configuration = f"{result['pqc_algorithm']} + {result['compression']}"
+        if 'sig_algorithm' in result:
+            configuration += f" + {result['sig_algorithm']}"
+
+        for device in devices:
+            for radio in radios:
+                energy = message_energy(device_cpu_time(result), result['total_transmission'],
+                                        device, radio)
+                estimates.append({
+                    'configuration': configuration,
+                    'device': device,
+                    'radio': radio,
+                    'tx_bytes': result['total_transmission'],
+                    'host_cpu_time': device_cpu_time(result),
+                    **energy,
+                    'messages_per_day': messages_per_day,
+                    'battery_life_days': battery_life_days(energy['energy_per_message'],
+                                                           device, messages_per_day)
+                })
+
+    return estimates
+
+def recommend_configuration(estimates):
+    """Minimum-energy configuration for each (device, radio) pair"""
+    best = {}
+    for e in estimates:
+        key = (e['device'], e['radio'])
+        if key not in best or e['energy_per_message'] < best[key]['energy_per_message']:
+            best[key] = e
+    return list(best.values())
+
+def print_energy_results(estimates, device='nrf52840'):
+    """Print energy per message (mJ) per radio for one device profile"""
+    rows = {}
+    for e in estimates:
+        if e['device'] == device:
+            rows.setdefault(e['configuration'], {})[e['radio']] = e
+
+    radios = list(RADIO_PROFILES)
+    print(f"Device: {DEVICE_PROFILES[device]['name']} - energy per message (mJ) / battery life (days)")
+    print(f"{'Configuration':<44}" + ''.join(f"{r:>18}" for r in radios))
+    print("-" * (44 + 18 * len(radios)))
+    for configuration, by_radio in rows.items():
+        cells = ''.join(f"{by_radio[r]['energy_per_message']*1000:>9.2f} /{by_radio[r]['battery_life_days']:>6.0f}d"
+                        for r in radios if r in by_radio)
+        print(f"{configuration:<44}{cells}")
+
+if __name__ == "__main__":
+    # Quick sanity check: 10 KB of readings compressed to ~256 B + Kyber768
+    example = {'pqc_algorithm': 'Kyber768', 'compression': 'zlib', 'total_transmission': 1344,
+               'compression_time': 0.0001, 'encap_time': 0.0001}
+    estimates = estimate_energy([example])
+    for device in DEVICE_PROFILES:
+        print_energy_results(estimates, device)
+        print()
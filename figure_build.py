@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Incremental Figure Build
+Every figure declares the slice of the benchmark results it reads. The slice,
+the render parameters and the plotting code are hashed, and a figure is only
+re-rendered when that hash changed or its output file is missing. Stale
+figures are rendered in parallel by a process pool (Agg backend per worker).
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: python figure_build.py [--force] [--draft] [--vector | --format pdf,svg]
+                              [--jobs N] [--results FILE] [figure ...]
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import create_visualizations as viz
+import generate_thesis_figures as thesis
+from figure_output import (
+    DRAFT_DPI, FINAL_DPI, OUTPUT, VECTOR_FORMATS, configure_output, output_paths
+)
+from results_store import DB_FILE, load_run
+
+RESULTS_FILE = 'benchmark_results.json'
+CACHE_FILE = '.figure_cache.json'
+
+# ============================================
+# INPUT SELECTORS
+# ============================================
+
+def _compression_inputs(results, dataset='iot_medium'):
+    return {
+        'compression': results.get('compression', {}).get(dataset, []),
+        'entropy_coders': [r for r in results.get('entropy_coders', []) if r['dataset'] == dataset]
+    }
+
+def _combined_inputs(results):
+    return [{k: r[k] for k in ('pqc_algorithm', 'compression', 'original_size', 'compressed_size',
+                               'pqc_overhead', 'total_transmission', 'bandwidth_savings', 'total_time')}
+            for r in results['combined']]
+
+# ============================================
+# BUILD GRAPH
+# ============================================
+
+# function: renderer, called with the results when inputs is set
+# inputs: results -> JSON-serializable slice the figure depends on (None: static figure)
+# depends: helper functions whose code also affects the output
+# outputs: files the figure writes
+FIGURES = {
+    # Chapter figures (generate_thesis_figures.py)
+    'iot_architecture': {
+        'function': thesis.create_iot_architecture, 'inputs': None,
+        'outputs': ['thesis/figures/iot_architecture.png']},
+    'iot_constraints': {
+        'function': thesis.create_iot_constraints, 'inputs': None,
+        'outputs': ['thesis/figures/iot_constraints.png']},
+    'quantum_timeline': {
+        'function': thesis.create_quantum_threat_timeline, 'inputs': None,
+        'outputs': ['thesis/figures/quantum_timeline.png']},
+    'pqc_families_comparison': {
+        'function': thesis.create_pqc_families_comparison, 'inputs': None,
+        'outputs': ['thesis/figures/pqc_families_comparison.png']},
+    'pqc_vs_classical': {
+        'function': thesis.create_pqc_vs_classical,
+        'inputs': lambda r: [{k: p[k] for k in ('algorithm', 'pk_size')} for p in r['pqc']],
+        'outputs': ['thesis/figures/pqc_vs_classical.png']},
+    'compression_comparison_detailed': {
+        'function': thesis.create_compression_algorithm_comparison, 'inputs': _compression_inputs,
+        'depends': [thesis.load_compression_measurements],
+        'outputs': ['thesis/figures/compression_comparison_detailed.png']},
+    'compression_tradeoff': {
+        'function': thesis.create_compression_tradeoff, 'inputs': _compression_inputs,
+        'depends': [thesis.load_compression_measurements],
+        'outputs': ['thesis/figures/compression_tradeoff.png']},
+    'system_architecture': {
+        'function': thesis.create_system_architecture, 'inputs': None,
+        'outputs': ['thesis/figures/system_architecture.png']},
+    'bandwidth_breakdown': {
+        'function': thesis.create_bandwidth_breakdown, 'inputs': _combined_inputs,
+        'depends': [thesis.combined_result],
+        'outputs': ['thesis/figures/bandwidth_breakdown.png']},
+
+    # Results figures (create_visualizations.py)
+    'compression_comparison': {
+        'function': viz.plot_compression_comparison,
+        'inputs': lambda r: r['compression']['iot_medium'][0],
+        'outputs': ['compression_comparison.png']},
+    'pqc_sizes': {
+        'function': viz.plot_pqc_sizes,
+        'inputs': lambda r: [{k: p[k] for k in ('algorithm', 'pk_size', 'ct_size')} for p in r['pqc']],
+        'outputs': ['pqc_sizes.png']},
+    'combined_comparison': {
+        'function': viz.plot_combined_comparison, 'inputs': _combined_inputs,
+        'outputs': ['combined_comparison.png']},
+    'workflow_diagram': {
+        'function': viz.plot_workflow_diagram, 'inputs': _combined_inputs,
+        'outputs': ['workflow_diagram.png']},
+    'summary_table': {
+        'function': viz.create_summary_table_image, 'inputs': _combined_inputs,
+        'outputs': ['summary_table.png']},
+}
+
+THESIS_FIGURES = [name for name, job in FIGURES.items() if job['function'].__module__ == thesis.__name__]
+RESULTS_FIGURES = [name for name, job in FIGURES.items() if job['function'].__module__ == viz.__name__]
+
+def load_results(filename=None, db=DB_FILE):
+    """Results of an explicit file (.db: its latest run, else JSON); with no
+    file, the latest run in the results store, else the JSON export, else {}"""
+    if filename is None:
+        if db and os.path.exists(db):
+            results = load_run(db)
+            if results:
+                return results
+        filename = RESULTS_FILE
+    elif filename.endswith('.db'):
+        return load_run(filename)
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def figure_hash(job, results, params):
+    """Content hash of a figure: plotting code + input slice + render parameters"""
+    digest = hashlib.sha256()
+    for function in [job['function']] + job.get('depends', []):
+        digest.update(inspect.getsource(function).encode())
+    inputs = job['inputs'](results) if job['inputs'] else None
+    digest.update(json.dumps({'inputs': inputs, 'params': params}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def _init_worker(dpi, formats):
+    """Process pool initializer: headless backend and the build's output settings"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    configure_output(dpi, formats)
+
+def _render(name, results):
+    """Render one figure in a worker, returns its wall time"""
+    job = FIGURES[name]
+    start = time.perf_counter()
+    if job['inputs']:
+        job['function'](results)
+    else:
+        job['function']()
+    return time.perf_counter() - start
+
+def build_figures(names=None, results=None, results_file=None, force=False,
+                  cache_file=CACHE_FILE, jobs=None, draft=False, formats=('png',)):
+    """Render the figures whose hash changed, returns one report entry per figure
+
+    jobs: worker processes (default: CPU count, 1 renders in this process),
+    draft: low-dpi preview, formats: e.g. ('png',) or ('pdf', 'svg').
+    """
+    names = names or list(FIGURES)
+    unknown = [name for name in names if name not in FIGURES]
+    if unknown:
+        raise ValueError(f"Unknown figure(s): {', '.join(unknown)}")
+    results = results if results is not None else load_results(results_file)
+    params = {'dpi': DRAFT_DPI if draft else FINAL_DPI, 'formats': list(formats)}
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    report = {}
+    stale = {}
+    for name in names:
+        job = FIGURES[name]
+        try:
+            digest = figure_hash(job, results, params)
+        except (KeyError, IndexError, StopIteration) as e:
+            report[name] = {'figure': name, 'status': 'missing inputs', 'time': 0, 'error': repr(e)}
+            continue
+
+        outputs = [path for output in job['outputs'] for path in output_paths(output, formats)]
+        if not force and cache.get(name) == digest and all(os.path.exists(o) for o in outputs):
+            report[name] = {'figure': name, 'status': 'cached', 'time': 0}
+            continue
+
+        for output in outputs:
+            if os.path.dirname(output):
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+        stale[name] = digest
+
+    def finished(name, elapsed):
+        report[name] = {'figure': name, 'status': 'rendered', 'time': elapsed}
+        # Saved after every figure so an interrupted build keeps its progress
+        cache[name] = stale[name]
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(stale) <= 1:
+        saved = dict(OUTPUT)
+        configure_output(params['dpi'], formats)
+        try:
+            for name in stale:
+                finished(name, _render(name, results))
+        finally:
+            configure_output(saved['dpi'], saved['formats'])
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(stale)), initializer=_init_worker,
+                                 initargs=(params['dpi'], formats)) as pool:
+            futures = {pool.submit(_render, name, results): name for name in stale}
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+
+    return [report[name] for name in names]
+
+def build_options(argv):
+    """Parse the shared figure build flags"""
+    options = {'force': '--force' in argv, 'draft': '--draft' in argv, 'formats': ('png',)}
+    if '--vector' in argv:
+        options['formats'] = VECTOR_FORMATS
+    if '--format' in argv:
+        options['formats'] = tuple(argv[argv.index('--format') + 1].split(','))
+    if '--jobs' in argv:
+        options['jobs'] = int(argv[argv.index('--jobs') + 1])
+    return options
+
+def print_build_report(report):
+    """Print rendered / cached status per figure"""
+    print(f"\n{'Figure':<34} {'Status':<15} {'Time':>9}")
+    print("-" * 60)
+    for r in report:
+        print(f"{r['figure']:<34} {r['status']:<15} {r['time']:>8.2f}s")
+    rendered = sum(r['status'] == 'rendered' for r in report)
+    slowest = max(report, key=lambda r: r['time'], default=None)
+    print(f"\n{rendered} rendered, {len(report) - rendered} up to date or skipped")
+    if rendered:
+        print(f"Render time: {sum(r['time'] for r in report):.2f}s total, "
+              f"slowest {slowest['figure']} ({slowest['time']:.2f}s)")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    results_file = args[args.index('--results') + 1] if '--results' in args else None
+    options = build_options(args)
+
+    # Remaining positional arguments select figures by name
+    valued = {'--results', '--format', '--jobs'}
+    names = [a for i, a in enumerate(args)
+             if not a.startswith('--') and (i == 0 or args[i - 1] not in valued)] or None
+    unknown = [name for name in names or [] if name not in FIGURES]
+    if unknown:
+        print(f"Unknown figure(s): {', '.join(unknown)}\nAvailable figures:")
+        for name in FIGURES:
+            print(f"  {name}")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    report = build_figures(names, results_file=results_file, **options)
+    print_build_report(report)
+    print(f"Wall time: {time.perf_counter() - start:.2f}s")
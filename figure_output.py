@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Figure Output Settings
+Resolution and file formats shared by every plotting function, so the
+figure build can switch to low-dpi drafts or vector (PDF/SVG) output.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import os
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+FINAL_DPI = 300
+DRAFT_DPI = 72
+VECTOR_FORMATS = ('pdf', 'svg')
+
+OUTPUT = {'dpi': FINAL_DPI, 'formats': ['png']}
+
+def configure_output(dpi=FINAL_DPI, formats=('png',)):
+    """Set the resolution and formats used by save_figure"""
+    OUTPUT['dpi'] = dpi
+    OUTPUT['formats'] = list(formats)
+
+def output_paths(filename, formats=None):
+    """Files written for `filename`, one per format (extension replaced)"""
+    base, _ = os.path.splitext(filename)
+    return [f"{base}.{fmt}" for fmt in (formats or OUTPUT['formats'])]
+
+def save_figure(filename, **kwargs):
+    """plt.savefig in every configured format at the configured dpi"""
+    for path in output_paths(filename):
+        plt.savefig(path, dpi=OUTPUT['dpi'], **kwargs)
@@ -4,6 +4,7 @@ Generate additional figures for thesis chapters 1-4
 Abdessamad JAOUAD - M2 Big Data & IoT
 """
 
+import sys
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.patches import FancyBboxPatch, FancyArrowPatch, Circle, Rectangle
@@ -11,6 +12,8 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 
+from figure_output import save_figure
+
 # Set style
 plt.style.use('seaborn-v0_8-whitegrid')
 plt.rcParams['font.family'] = 'DejaVu Sans'
@@ -97,7 +100,7 @@ def create_iot_architecture():
         ax.text(x, y, text, fontsize=8, color='#c0392b', va='center')
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/iot_architecture.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/iot_architecture.png', bbox_inches='tight',
                 facecolor='white', edgecolor='none')
     print("✓ Created: iot_architecture.png")
     plt.close()
@@ -154,7 +157,7 @@ def create_quantum_threat_timeline():
     ax.spines['top'].set_visible(False)
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/quantum_timeline.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/quantum_timeline.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: quantum_timeline.png")
     plt.close()
@@ -207,20 +210,23 @@ def create_pqc_families_comparison():
             fontweight='bold', ha='center')
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/pqc_families_comparison.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/pqc_families_comparison.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: pqc_families_comparison.png")
     plt.close()
 
 
-def create_pqc_vs_classical():
-    """Chapter 2: PQC vs Classical Key Sizes"""
+def create_pqc_vs_classical(results):
+    """Chapter 2: PQC vs Classical Key Sizes (Kyber sizes from the benchmark results)"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    algorithms = ['RSA-2048', 'RSA-3072', 'ECC P-256', 'Kyber-512', 'Kyber-768', 'Kyber-1024']
-    public_key = [256, 384, 64, 800, 1184, 1568]
-    security_level = ['112-bit', '128-bit', '128-bit', 'Level 1', 'Level 3', 'Level 5']
-    quantum_safe = [False, False, False, True, True, True]
+    levels = {'Kyber512': 'Level 1', 'Kyber768': 'Level 3', 'Kyber1024': 'Level 5'}
+    kyber = [r for r in results['pqc'] if r['algorithm'] in levels]
+    
+    algorithms = ['RSA-2048', 'RSA-3072', 'ECC P-256'] + [r['algorithm'].replace('Kyber', 'Kyber-') for r in kyber]
+    public_key = [256, 384, 64] + [r['pk_size'] for r in kyber]
+    security_level = ['112-bit', '128-bit', '128-bit'] + [levels[r['algorithm']] for r in kyber]
+    quantum_safe = [False, False, False] + [True] * len(kyber)
     
     colors = ['#e74c3c' if not qs else '#2ecc71' for qs in quantum_safe]
     
@@ -240,26 +246,64 @@ def create_pqc_vs_classical():
                        mpatches.Patch(facecolor='#2ecc71', label='Quantum Resistant')]
     ax.legend(handles=legend_elements, loc='lower right', fontsize=10)
     
-    ax.set_xlim(0, 2000)
+    ax.set_xlim(0, max(public_key) * 1.25)
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/pqc_vs_classical.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/pqc_vs_classical.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: pqc_vs_classical.png")
     plt.close()
 
 
-def create_compression_algorithm_comparison():
-    """Chapter 3: Compression Algorithm Performance"""
+# Display names for the algorithms measured by benchmark_pqc_compression
+COMPRESSION_LABELS = {
+    'rle': 'RLE',
+    'huffman': 'Huffman',
+    'tans': 'tANS',
+    'lz77': 'LZ77',
+    'lz78': 'LZ78',
+    'lzw': 'LZW',
+    'zlib': 'DEFLATE\n(ZLIB)',
+    'lz4': 'LZ4',
+    'zstd': 'Zstandard',
+}
+
+def load_compression_measurements(results, dataset='iot_medium'):
+    """Measured (ratio, compression MB/s) per algorithm on one benchmark dataset
+
+    Only read from the benchmark results: figures render in worker
+    processes, where timings would be skewed by the other renders and
+    would never reach the results file. Algorithms missing from an older
+    results file are left out (re-run benchmark_pqc_compression.py).
+    """
+    measured = {}
+    for r in results.get('compression', {}).get(dataset, []):
+        if r.get('success') and r['compression_time'] > 0:
+            measured[r['algorithm']] = (r['compression_ratio'],
+                                        r['original_size'] / 1024 / 1024 / r['compression_time'])
+    for r in results.get('entropy_coders', []):
+        if r['dataset'] == dataset and r['coder'] == 'huffman':
+            measured['huffman'] = (8 / r['bits_per_byte'], r['encode_mbps'])
+
+    missing = [a for a in COMPRESSION_LABELS if a not in measured]
+    if missing:
+        print(f"  Note: no {dataset} measurements for {', '.join(missing)} in the results "
+              f"(run benchmark_pqc_compression.py to include them)")
+    return {a: measured[a] for a in COMPRESSION_LABELS if a in measured}
+
+
+def create_compression_algorithm_comparison(results, dataset='iot_medium'):
+    """Chapter 3: Compression Algorithm Performance (measured)"""
+    measured = load_compression_measurements(results, dataset)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
-    algorithms = ['RLE', 'Huffman', 'LZ77', 'LZ78', 'DEFLATE\n(ZLIB)', 'LZ4', 'Zstandard', 'Brotli']
+    algorithms = [COMPRESSION_LABELS[a] for a in measured]
     
     # Compression ratio (higher is better)
-    compression_ratio = [1.2, 1.5, 2.5, 2.3, 3.5, 2.2, 4.0, 4.5]
+    compression_ratio = [ratio for ratio, _ in measured.values()]
     
     # Speed (MB/s, compression)
-    speed = [500, 150, 80, 70, 50, 400, 200, 30]
+    speed = [mbps for _, mbps in measured.values()]
     
     colors = plt.cm.viridis(np.linspace(0.2, 0.8, len(algorithms)))
     
@@ -267,74 +311,74 @@ def create_compression_algorithm_comparison():
     bars1 = ax1.bar(algorithms, compression_ratio, color=colors, edgecolor='black', linewidth=1)
     ax1.set_ylabel('Compression Ratio', fontsize=12, fontweight='bold')
     ax1.set_xlabel('Algorithm', fontsize=12, fontweight='bold')
-    ax1.set_title('Compression Ratio Comparison\n(Higher is Better)', fontsize=12, fontweight='bold')
+    ax1.set_title(f'Compression Ratio Comparison ({dataset})\n(Higher is Better)', fontsize=12, fontweight='bold')
     ax1.tick_params(axis='x', rotation=45)
-    ax1.axhline(y=3.5, color='#27ae60', linestyle='--', linewidth=2, label='ZLIB baseline')
-    ax1.legend()
+    ax1.set_yscale('log')
+    if 'zlib' in measured:
+        ax1.axhline(y=measured['zlib'][0], color='#27ae60', linestyle='--', linewidth=2, label='ZLIB baseline')
+        ax1.legend()
     
     # Add value labels
     for bar, val in zip(bars1, compression_ratio):
-        ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
+        ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() * 1.05, 
                 f'{val:.1f}x', ha='center', fontsize=9)
     
     # Plot 2: Speed
     bars2 = ax2.bar(algorithms, speed, color=colors, edgecolor='black', linewidth=1)
-    ax2.set_ylabel('Speed (MB/s)', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Speed (MB/s, log scale)', fontsize=12, fontweight='bold')
     ax2.set_xlabel('Algorithm', fontsize=12, fontweight='bold')
-    ax2.set_title('Compression Speed Comparison\n(Higher is Better)', fontsize=12, fontweight='bold')
+    ax2.set_title('Compression Speed Comparison\n(Higher is Better; RLE/Huffman/tANS/LZ* are pure Python)',
+                  fontsize=12, fontweight='bold')
     ax2.tick_params(axis='x', rotation=45)
+    ax2.set_yscale('log')
+    
+    for bar, val in zip(bars2, speed):
+        ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() * 1.1, 
+                f'{val:.1f}', ha='center', fontsize=9)
     
     # Highlight IoT-suitable algorithms
     ax2.axhspan(50, 400, alpha=0.1, color='green')
-    ax2.text(3.5, 420, 'IoT-Suitable Range', fontsize=10, color='#27ae60', fontweight='bold')
+    ax2.text(0, 420, 'IoT-Suitable Range', fontsize=10, color='#27ae60', fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/compression_comparison_detailed.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/compression_comparison_detailed.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: compression_comparison_detailed.png")
     plt.close()
 
 
-def create_compression_tradeoff():
-    """Chapter 3: Compression Ratio vs Speed Tradeoff"""
+def create_compression_tradeoff(results, dataset='iot_medium'):
+    """Chapter 3: Compression Ratio vs Speed Tradeoff (measured)"""
+    measured = load_compression_measurements(results, dataset)
     fig, ax = plt.subplots(figsize=(10, 7))
     
-    algorithms = {
-        'RLE': (1.2, 500, '#e74c3c'),
-        'Huffman': (1.5, 150, '#e67e22'),
-        'LZ77': (2.5, 80, '#f1c40f'),
-        'LZ78': (2.3, 70, '#2ecc71'),
-        'ZLIB': (3.5, 50, '#3498db'),
-        'LZ4': (2.2, 400, '#9b59b6'),
-        'Zstandard': (4.0, 200, '#1abc9c'),
-        'Brotli': (4.5, 30, '#34495e')
-    }
+    colors = plt.cm.tab10(np.linspace(0, 1, len(measured)))
     
-    for name, (ratio, speed, color) in algorithms.items():
-        ax.scatter(ratio, speed, s=300, c=color, edgecolors='black', linewidth=2, zorder=5)
-        ax.annotate(name, (ratio, speed), xytext=(10, 5), textcoords='offset points',
-                   fontsize=10, fontweight='bold')
+    for (name, (ratio, speed)), color in zip(measured.items(), colors):
+        ax.scatter(ratio, speed, s=300, color=color, edgecolors='black', linewidth=2, zorder=5)
+        ax.annotate(COMPRESSION_LABELS[name].replace('\n', ' '), (ratio, speed), xytext=(10, 5),
+                    textcoords='offset points', fontsize=10, fontweight='bold')
     
-    # Ideal zone (high ratio, high speed)
-    ax.axvspan(2.5, 5, alpha=0.1, color='green')
-    ax.axhspan(100, 600, alpha=0.1, color='blue')
+    # Fast zone: at least 100 MB/s
+    ax.axhspan(100, max(s for _, s in measured.values()) * 3, alpha=0.1, color='blue')
     
     # Mark optimal for IoT
-    ellipse = plt.Circle((3.5, 50), 0.3, fill=False, color='red', linewidth=3)
-    ax.add_patch(ellipse)
-    ax.annotate('Recommended\nfor IoT', (3.5, 50), xytext=(4.2, 120),
-               arrowprops=dict(arrowstyle='->', color='red', lw=2),
-               fontsize=11, color='red', fontweight='bold')
-    
-    ax.set_xlabel('Compression Ratio (higher = smaller output)', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Compression Speed (MB/s)', fontsize=12, fontweight='bold')
-    ax.set_title('Compression Algorithm Trade-offs: Ratio vs Speed', fontsize=14, fontweight='bold')
-    ax.set_xlim(0.5, 5.5)
-    ax.set_ylim(0, 600)
+    if 'zlib' in measured:
+        ax.scatter(*measured['zlib'], s=1500, facecolors='none', edgecolors='red', linewidth=3, zorder=6)
+        ax.annotate('Recommended\nfor IoT', measured['zlib'], xytext=(-120, 60), textcoords='offset points',
+                   arrowprops=dict(arrowstyle='->', color='red', lw=2),
+                   fontsize=11, color='red', fontweight='bold')
+    
+    ax.set_xlabel('Compression Ratio (higher = smaller output, log scale)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Compression Speed (MB/s, log scale)', fontsize=12, fontweight='bold')
+    ax.set_title(f'Compression Algorithm Trade-offs: Ratio vs Speed ({dataset}, measured)',
+                 fontsize=14, fontweight='bold')
+    ax.set_xscale('log')
+    ax.set_yscale('log')
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/compression_tradeoff.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/compression_tradeoff.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: compression_tradeoff.png")
     plt.close()
@@ -422,42 +466,54 @@ def create_system_architecture():
             ha='center', va='center', fontsize=9)
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/system_architecture.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/system_architecture.png', bbox_inches='tight',
                 facecolor='white', edgecolor='none')
     print("✓ Created: system_architecture.png")
     plt.close()
 
 
-def create_bandwidth_breakdown():
-    """Chapter 4: Bandwidth Savings Breakdown"""
+def combined_result(results, pqc_algorithm='Kyber768', compression='zlib'):
+    """One configuration of the combined benchmark"""
+    for r in results['combined']:
+        if r['pqc_algorithm'] == pqc_algorithm and r['compression'] == compression:
+            return r
+    raise KeyError(f"No combined result for {pqc_algorithm} + {compression}")
+
+
+def create_bandwidth_breakdown(results):
+    """Chapter 4: Bandwidth Savings Breakdown (Kyber768 + ZLIB from the benchmark results)"""
     fig, ax = plt.subplots(figsize=(10, 6))
+    sample = combined_result(results)
     
     categories = ['Original\nData', 'After\nCompression', 'PQC\nOverhead', 'Final\nPacket']
-    sizes = [100, 15, 2.4, 17.4]
+    sizes = [sample['original_size'] / 1024, sample['compressed_size'] / 1024,
+             sample['pqc_overhead'] / 1024, sample['total_transmission'] / 1024]
     colors = ['#e74c3c', '#2ecc71', '#f39c12', '#3498db']
+    top = sizes[0]
     
     bars = ax.bar(categories, sizes, color=colors, edgecolor='black', linewidth=2)
     
     # Add value labels
     for bar, val in zip(bars, sizes):
-        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2,
-                f'{val:.1f} KB', ha='center', fontsize=12, fontweight='bold')
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + top * 0.02,
+                f'{val:.2f} KB', ha='center', fontsize=12, fontweight='bold')
     
     # Draw arrows showing savings
-    ax.annotate('', xy=(1, 15), xytext=(0, 100),
+    ax.annotate('', xy=(1, sizes[1]), xytext=(0, top),
                arrowprops=dict(arrowstyle='->', color='green', lw=3))
-    ax.text(0.5, 60, '-85%', fontsize=14, fontweight='bold', color='#27ae60')
+    ax.text(0.5, top * 0.6, f'-{(1 - sizes[1] / top) * 100:.1f}%', fontsize=14, fontweight='bold', color='#27ae60')
     
-    ax.annotate('', xy=(3, 17.4), xytext=(0, 100),
+    ax.annotate('', xy=(3, sizes[3]), xytext=(0, top),
                arrowprops=dict(arrowstyle='->', color='blue', lw=3, ls='--'))
-    ax.text(1.8, 70, 'Net: -82.6%', fontsize=12, fontweight='bold', color='#3498db')
+    ax.text(1.8, top * 0.7, f"Net: -{sample['bandwidth_savings']:.1f}%", fontsize=12, fontweight='bold', color='#3498db')
     
     ax.set_ylabel('Size (KB)', fontsize=12, fontweight='bold')
-    ax.set_title('Bandwidth Usage Breakdown', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 120)
+    ax.set_title(f"Bandwidth Usage Breakdown ({sample['pqc_algorithm']} + {sample['compression'].upper()})",
+                 fontsize=14, fontweight='bold')
+    ax.set_ylim(0, top * 1.2)
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/bandwidth_breakdown.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/bandwidth_breakdown.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: bandwidth_breakdown.png")
     plt.close()
@@ -500,36 +556,26 @@ def create_iot_constraints():
                  fontsize=13, fontweight='bold', pad=20)
     
     plt.tight_layout()
-    plt.savefig('thesis/figures/iot_constraints.png', dpi=300, bbox_inches='tight',
+    save_figure('thesis/figures/iot_constraints.png', bbox_inches='tight',
                 facecolor='white')
     print("✓ Created: iot_constraints.png")
     plt.close()
 
 
 def main():
+    from figure_build import THESIS_FIGURES, build_figures, build_options, print_build_report
+
     print("=" * 70)
     print("Generating Additional Thesis Figures")
     print("=" * 70)
     
-    print("\n📊 Chapter 1: IoT and Security Challenges")
-    create_iot_architecture()
-    create_iot_constraints()
-    create_quantum_threat_timeline()
-    
-    print("\n📊 Chapter 2: Post-Quantum Cryptography")
-    create_pqc_families_comparison()
-    create_pqc_vs_classical()
-    
-    print("\n📊 Chapter 3: Compression Algorithms")
-    create_compression_algorithm_comparison()
-    create_compression_tradeoff()
-    
-    print("\n📊 Chapter 4: Combined Approach")
-    create_system_architecture()
-    create_bandwidth_breakdown()
+    # Chapter order: 1 (IoT), 2 (PQC), 3 (compression), 4 (combined approach);
+    # figures whose inputs and code are unchanged are skipped
+    report = build_figures(THESIS_FIGURES, **build_options(sys.argv))
+    print_build_report(report)
     
     print("\n" + "=" * 70)
-    print("✅ All figures generated successfully!")
+    print("✅ All figures up to date!")
     print("=" * 70)
 
 
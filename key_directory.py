@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Gateway Public-Key Directory
+Devices refer to an already-known Kyber public key by a 16-byte fingerprint
+instead of shipping the full key on every handshake.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import hashlib
+import random
+import struct
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from benchmark_pqc_compression import benchmark_pqc, latency_stats, print_header
+
+FINGERPRINT_SIZE = 16
+
+# Handshake message types (1-byte header)
+MSG_FULL_KEY = 0x01     # header | public key | ciphertext
+MSG_KEY_REF = 0x02      # header | fingerprint | ciphertext
+MSG_KEY_REQUEST = 0x03  # gateway -> device: header | fingerprint (cache miss)
+
+# ============================================
+# KEY DIRECTORY
+# ============================================
+
+def key_fingerprint(public_key):
+    """Short identifier of a public key (truncated SHA3-256)"""
+    return hashlib.sha3_256(public_key).digest()[:FINGERPRINT_SIZE]
+
+class KeyDirectory:
+    """Bounded fingerprint -> public key map with LRU eviction"""
+
+    def __init__(self, capacity=100_000):
+        self.capacity = capacity
+        self._keys = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def register(self, public_key):
+        """Store a key, evicting the least recently used one when full"""
+        fingerprint = key_fingerprint(public_key)
+        if fingerprint in self._keys:
+            self._keys.move_to_end(fingerprint)
+            return fingerprint
+
+        self._keys[fingerprint] = public_key
+        if len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+            self.evictions += 1
+        return fingerprint
+
+    def lookup(self, fingerprint):
+        """Return the cached key or None on a miss"""
+        public_key = self._keys.get(fingerprint)
+        if public_key is None:
+            self.misses += 1
+            return None
+        self._keys.move_to_end(fingerprint)
+        self.hits += 1
+        return public_key
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+# ============================================
+# HANDSHAKE PROTOCOL
+# ============================================
+
+def build_handshake(public_key, ciphertext, use_reference):
+    """Device side: full key on first contact, fingerprint afterwards"""
+    if use_reference:
+        return struct.pack('B', MSG_KEY_REF) + key_fingerprint(public_key) + ciphertext
+    return struct.pack('B', MSG_FULL_KEY) + public_key + ciphertext
+
+def handle_handshake(directory, message, pk_size, ct_size):
+    """Gateway side: returns (public_key, ciphertext, reply)
+
+    reply is None when the handshake can proceed, or a MSG_KEY_REQUEST frame
+    asking the device to resend with its full public key (cache miss).
+    The frame comes from the network: a wrong length raises ValueError
+    before anything is registered or looked up.
+    """
+    if not message:
+        raise ValueError("Empty handshake message")
+    msg_type = message[0]
+    if msg_type == MSG_FULL_KEY:
+        if len(message) != 1 + pk_size + ct_size:
+            raise ValueError(f"Full-key handshake of {len(message)} bytes, expected {1 + pk_size + ct_size}")
+        public_key = message[1:1 + pk_size]
+        directory.register(public_key)
+        return public_key, message[1 + pk_size:], None
+
+    if msg_type == MSG_KEY_REF:
+        if len(message) != 1 + FINGERPRINT_SIZE + ct_size:
+            raise ValueError(f"Key-reference handshake of {len(message)} bytes, "
+                             f"expected {1 + FINGERPRINT_SIZE + ct_size}")
+        fingerprint = message[1:1 + FINGERPRINT_SIZE]
+        public_key = directory.lookup(fingerprint)
+        if public_key is None:
+            return None, None, struct.pack('B', MSG_KEY_REQUEST) + fingerprint
+        return public_key, message[1 + FINGERPRINT_SIZE:], None
+
+    raise ValueError(f"Unknown handshake message type: {msg_type:#x}")
+
+def handshake(directory, public_key, ciphertext, pk_size, use_reference=True):
+    """Complete exchange including the cache-miss fallback, returns bytes on the wire"""
+    message = build_handshake(public_key, ciphertext, use_reference)
+    wire_bytes = len(message)
+    received_key, _, reply = handle_handshake(directory, message, pk_size, len(ciphertext))
+
+    if reply is not None:
+        # Fallback: gateway asks for the key, device resends the full handshake
+        message = build_handshake(public_key, ciphertext, use_reference=False)
+        wire_bytes += len(reply) + len(message)
+        received_key, _, _ = handle_handshake(directory, message, pk_size, len(ciphertext))
+
+    if received_key != public_key:
+        raise ValueError("Handshake resolved to the wrong public key")
+    return wire_bytes
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def device_public_key(device_id, pk_size):
+    """Deterministic stand-in public key for a simulated device"""
+    return hashlib.shake_256(struct.pack('>Q', device_id)).digest(pk_size)
+
+def directory_entry_size(pk_size, sample=10_000):
+    """Measured heap bytes per directory entry"""
+    directory = KeyDirectory(capacity=sample)
+    keys = [device_public_key(i, pk_size) for i in range(sample)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for public_key in keys:
+        directory.register(public_key)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Keys were allocated before tracing started: add their own size
+    return (after - before) / sample + sys.getsizeof(keys[0])
+
+def benchmark_key_directory(fleet_sizes=(10_000, 100_000, 1_000_000), capacity=100_000,
+                            handshakes_per_device=2, algorithm='Kyber768', seed=1):
+    """Handshake bytes and lookup latency with and without the key directory"""
+    pqc = benchmark_pqc(algorithm)
+    pk_size, ct_size = pqc['pk_size'], pqc['ct_size']
+    ciphertext = bytes(ct_size)
+    entry_size = directory_entry_size(pk_size)
+    results = []
+
+    for fleet_size in fleet_sizes:
+        rng = random.Random(seed)
+        directory = KeyDirectory(capacity)
+
+        # First contact: every device registers its full key
+        for device_id in range(fleet_size):
+            handshake(directory, device_public_key(device_id, pk_size), ciphertext,
+                      pk_size, use_reference=False)
+
+        # Repeat handshakes in random order, referring to cached keys
+        total_bytes = 0
+        lookup_samples = []
+        repeat_count = fleet_size * handshakes_per_device
+        directory.hits = directory.misses = 0
+
+        for _ in range(repeat_count):
+            public_key = device_public_key(rng.randrange(fleet_size), pk_size)
+            total_bytes += handshake(directory, public_key, ciphertext, pk_size)
+
+            if len(lookup_samples) < 10_000:
+                # The timed lookup is not a handshake: keep it out of the hit rate
+                counters = directory.hits, directory.misses
+                fingerprint = key_fingerprint(public_key)
+                start = time.perf_counter()
+                directory.lookup(fingerprint)
+                lookup_samples.append(time.perf_counter() - start)
+                directory.hits, directory.misses = counters
+
+        lookup = latency_stats(lookup_samples)
+        baseline_bytes = 1 + pk_size + ct_size
+        results.append({
+            'algorithm': algorithm,
+            'fleet_size': fleet_size,
+            'capacity': capacity,
+            'entries': len(directory),
+            'hit_rate': directory.hit_rate(),
+            'evictions': directory.evictions,
+            'handshake_bytes': total_bytes / repeat_count,
+            'handshake_bytes_baseline': baseline_bytes,
+            'bandwidth_savings': (1 - total_bytes / repeat_count / baseline_bytes) * 100,
+            'lookup_p50': lookup['p50'],
+            'lookup_p99': lookup['p99'],
+            'memory_bytes': len(directory) * entry_size,
+            'simulated': pqc.get('simulated', False)
+        })
+
+    return results
+
+def print_key_directory_results(results):
+    """Print key directory benchmark table"""
+    print(f"{'Fleet':>10} {'Entries':>9} {'Hit rate':>9} {'Bytes/hs':>9} {'Baseline':>9} "
+          f"{'Savings':>8} {'p50 (us)':>9} {'p99 (us)':>9} {'Memory':>10}")
+    print("-" * 90)
+    for r in results:
+        print(f"{r['fleet_size']:>10,} {r['entries']:>9,} {r['hit_rate']*100:>8.1f}% "
+              f"{r['handshake_bytes']:>9.0f} {r['handshake_bytes_baseline']:>9,} "
+              f"{r['bandwidth_savings']:>7.1f}% {r['lookup_p50']*1e6:>9.2f} "
+              f"{r['lookup_p99']*1e6:>9.2f} {r['memory_bytes']/1024/1024:>7.1f} MB")
+
+if __name__ == "__main__":
+    fleet_sizes = (10_000, 100_000) if '--quick' in sys.argv else (10_000, 100_000, 1_000_000)
+    print_header("GATEWAY PUBLIC-KEY DIRECTORY")
+    print_key_directory_results(benchmark_key_directory(fleet_sizes))
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Link-Layer Airtime and Fragmentation Simulator
+Turns bytes to transmit into frames, airtime, duty-cycle waits and effective
+goodput on LoRaWAN, NB-IoT and BLE links with loss and retransmission.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import math
+import random
+
+# ============================================
+# LINK PROFILES
+# ============================================
+
+# max_payload: application bytes per frame, overhead: header/MIC bytes per frame,
+# ack_timeout_s: time lost before a missing frame is retransmitted
+LINK_PROFILES = {
+    'lorawan_sf7': {
+        'name': 'LoRaWAN EU868 SF7/125 kHz',
+        'kind': 'lora',
+        'sf': 7, 'bw': 125_000, 'cr': 1, 'preamble': 8,
+        'max_payload': 222,
+        'overhead': 13,          # MHDR + FHDR + FPort + MIC
+        'duty_cycle': 0.01,
+        'ack_timeout_s': 2.0,
+    },
+    'lorawan_sf12': {
+        'name': 'LoRaWAN EU868 SF12/125 kHz',
+        'kind': 'lora',
+        'sf': 12, 'bw': 125_000, 'cr': 1, 'preamble': 8,
+        'max_payload': 51,
+        'overhead': 13,
+        'duty_cycle': 0.01,
+        'ack_timeout_s': 2.0,
+    },
+    'nbiot': {
+        'name': 'NB-IoT (UDP/IPv4)',
+        'kind': 'generic',
+        'data_rate_bps': 25_000,
+        'frame_setup_s': 0.01,
+        'max_payload': 1200,
+        'overhead': 28,          # IPv4 + UDP headers
+        'duty_cycle': 1.0,
+        'ack_timeout_s': 0.5,
+    },
+    'ble': {
+        'name': 'BLE 1M PHY (DLE)',
+        'kind': 'generic',
+        'data_rate_bps': 1_000_000,
+        'frame_setup_s': 0.00015,  # Inter-frame space
+        'max_payload': 244,
+        'overhead': 21,          # Preamble, access address, LL/L2CAP/ATT headers, MIC, CRC
+        'duty_cycle': 1.0,
+        'ack_timeout_s': 0.0075,
+    },
+}
+
+# ============================================
+# AIRTIME AND FRAGMENTATION
+# ============================================
+
+def lora_airtime(phy_payload, sf=7, bw=125_000, cr=1, preamble=8):
+    """LoRa time on air (Semtech AN1200.13, explicit header, CRC on)"""
+    t_sym = (2 ** sf) / bw
+    low_data_rate = 1 if t_sym > 0.016 else 0
+    numerator = 8 * phy_payload - 4 * sf + 28 + 16
+    payload_symbols = 8 + max(math.ceil(numerator / (4 * (sf - 2 * low_data_rate))) * (cr + 4), 0)
+    return (preamble + 4.25) * t_sym + payload_symbols * t_sym
+
+def frame_airtime(payload, profile):
+    """Time on air of one frame carrying `payload` application bytes"""
+    frame_bytes = payload + profile['overhead']
+    if profile['kind'] == 'lora':
+        return lora_airtime(frame_bytes, profile['sf'], profile['bw'], profile['cr'], profile['preamble'])
+    return profile['frame_setup_s'] + frame_bytes * 8 / profile['data_rate_bps']
+
+def fragment(tx_bytes, profile):
+    """Split a message into frame payload sizes"""
+    full, rest = divmod(tx_bytes, profile['max_payload'])
+    return [profile['max_payload']] * full + ([rest] if rest else [])
+
+def simulate_transmission(tx_bytes, profile='lorawan_sf7', loss_rate=0.0, max_retx=3,
+                          trials=200, seed=1):
+    """Monte-Carlo delivery of one message: frames, airtime, latency, delivery rate"""
+    profile = LINK_PROFILES[profile] if isinstance(profile, str) else profile
+    frames = fragment(tx_bytes, profile)
+    airtimes = [frame_airtime(payload, profile) for payload in frames]
+    # After each transmission the radio must stay silent to respect the duty cycle
+    off_factor = 1 / profile['duty_cycle'] - 1
+    rng = random.Random(seed)
+
+    total_airtime = total_latency = total_retx = 0
+    delivered = 0
+    latencies = []
+
+    for _ in range(trials):
+        airtime = latency = 0
+        retransmissions = 0
+        ok = True
+
+        for index, frame_time in enumerate(airtimes):
+            for attempt in range(max_retx + 1):
+                airtime += frame_time
+                latency += frame_time
+                if attempt > 0:
+                    retransmissions += 1
+                lost = rng.random() < loss_rate
+                if lost:
+                    latency += max(profile['ack_timeout_s'], frame_time * off_factor)
+                    continue
+                if index < len(airtimes) - 1:
+                    latency += frame_time * off_factor
+                break
+            else:
+                ok = False
+                break
+
+        total_airtime += airtime
+        total_latency += latency
+        total_retx += retransmissions
+        latencies.append(latency)
+        delivered += ok
+
+    latencies.sort()
+    return {
+        'link': profile['name'],
+        'tx_bytes': tx_bytes,
+        'frames': len(frames),
+        'wire_bytes': tx_bytes + len(frames) * profile['overhead'],
+        'airtime': total_airtime / trials,
+        'latency': total_latency / trials,
+        'latency_p95': latencies[min(trials - 1, math.ceil(0.95 * trials) - 1)],
+        'retransmissions': total_retx / trials,
+        'delivery_rate': delivered / trials
+    }
+
+def link_report(results, links=None, loss_rate=0.05, max_retx=3, trials=200):
+    """Airtime, frame count and effective goodput for each benchmark_combined result
+
+    Goodput counts the original (uncompressed) reading bytes delivered per
+    second of elapsed link time, so compression and batching show up directly.
+    A raw baseline (uncompressed data, no PQC) is added per link.
+    """
+    links = links or list(LINK_PROFILES)
+    report = []
+
+    rows = []
+    if results:
+        rows.append(('raw (no compression, no PQC)', results[0]['original_size'], results[0]['original_size']))
+    for result in results:
+        configuration = f"{result['pqc_algorithm']} + {result['compression']}"
+        if 'sig_algorithm' in result:
+            configuration += f" + {result['sig_algorithm']}"
+        rows.append((configuration, result['original_size'], result['total_transmission']))
+
+    for link in links:
+        for configuration, original_size, tx_bytes in rows:
+            sim = simulate_transmission(tx_bytes, link, loss_rate, max_retx, trials)
+            report.append({
+                'configuration': configuration,
+                'link_profile': link,
+                'original_size': original_size,
+                'loss_rate': loss_rate,
+                'max_retx': max_retx,
+                **sim,
+                'goodput_bps': original_size * 8 / sim['latency'] if sim['latency'] > 0 else 0
+            })
+
+    return report
+
+def print_link_results(report):
+    """Print link simulation table grouped by link profile"""
+    current = None
+    for r in report:
+        if r['link'] != current:
+            current = r['link']
+            print(f"\nLink: {current} (loss {r['loss_rate']*100:.0f}%, max {r['max_retx']} retx)")
+            print(f"{'Configuration':<44} {'Bytes':>7} {'Frames':>7} {'Airtime':>10} "
+                  f"{'Latency':>10} {'Goodput':>12} {'Delivered':>10}")
+            print("-" * 105)
+        print(f"{r['configuration']:<44} {r['tx_bytes']:>7,} {r['frames']:>7} {r['airtime']:>9.3f}s "
+              f"{r['latency']:>9.2f}s {r['goodput_bps']:>8.1f} bps {r['delivery_rate']*100:>9.1f}%")
+
+if __name__ == "__main__":
+    # Kyber768 ciphertext alone, then with a compressed 10 KB batch
+    for tx_bytes in (1088, 1344):
+        for link in LINK_PROFILES:
+            sim = simulate_transmission(tx_bytes, link, loss_rate=0.05)
+            print(f"{tx_bytes:>6} B on {sim['link']:<28} {sim['frames']:>3} frames, "
+                  f"airtime {sim['airtime']:.3f} s, latency {sim['latency']:.2f} s")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Dictionary Compression: LZ77, LZ78 and LZW
+Byte-exact encoders and decoders for the classic dictionary coders discussed
+in the thesis, so their ratio and speed can be measured instead of quoted.
+For IoT PQC Project - Abdessamad JAOUAD
+
+LZ77 uses a hash-chain match finder (3-byte rolling key, bounded chain
+depth) with an LZSS token format; LZ78 and LZW keep their dictionary as a
+trie flattened into a dict keyed by (node << 8) | byte.
+"""
+
+import struct
+
+LENGTH_HEADER = struct.Struct('>I')
+
+# ============================================
+# BIT I/O
+# ============================================
+
+class BitWriter:
+    """MSB-first bit packer"""
+
+    def __init__(self):
+        self._out = bytearray()
+        self._acc = 0
+        self._pending = 0
+
+    def write(self, value, nbits):
+        self._acc = (self._acc << nbits) | value
+        self._pending += nbits
+        if self._pending >= 32:
+            self._pending -= 32
+            self._out += (self._acc >> self._pending).to_bytes(4, 'big')
+            self._acc &= (1 << self._pending) - 1
+
+    def getvalue(self):
+        out = bytes(self._out)
+        if self._pending:
+            out += (self._acc << (-self._pending % 8)).to_bytes((self._pending + 7) // 8, 'big')
+        return out
+
+class BitReader:
+    """MSB-first bit reader (reads zeros past the end)"""
+
+    def __init__(self, data):
+        self._data = bytes(data) + bytes(4)
+        self._pos = 0
+        self._acc = 0
+        self._pending = 0
+
+    def read(self, nbits):
+        while self._pending < nbits:
+            self._acc = (self._acc << 32) | int.from_bytes(self._data[self._pos:self._pos + 4], 'big')
+            self._pos += 4
+            self._pending += 32
+        self._pending -= nbits
+        value = self._acc >> self._pending
+        self._acc &= (1 << self._pending) - 1
+        return value
+
+# ============================================
+# LZ77 (LZSS TOKENS, HASH-CHAIN MATCH FINDER)
+# ============================================
+
+WINDOW_SIZE = 32768
+MIN_MATCH = 3
+MAX_MATCH = MIN_MATCH + 255
+MAX_CHAIN = 32
+
+def _match_length(data, candidate, pos, limit):
+    """Length of the common prefix of data[candidate:] and data[pos:] (<= limit)
+
+    Binary search over slice comparisons keeps the byte loop in C.
+    """
+    if data[candidate:candidate + limit] == data[pos:pos + limit]:
+        return limit
+    low, high = 0, limit
+    while high - low > 1:
+        mid = (low + high) // 2
+        if data[candidate:candidate + mid] == data[pos:pos + mid]:
+            low = mid
+        else:
+            high = mid
+    return low
+
+def lz77_encode(data, window=WINDOW_SIZE, max_chain=MAX_CHAIN):
+    """LZ77 with a flag byte per 8 tokens: literal = 1 byte, match = offset (2) + length (1)"""
+    n = len(data)
+    out = bytearray(LENGTH_HEADER.pack(n))
+    head = {}
+    prev = [-1] * n
+
+    def insert(i):
+        key = (data[i] << 16) | (data[i + 1] << 8) | data[i + 2]
+        prev[i] = head.get(key, -1)
+        head[key] = i
+
+    flag_pos = len(out)
+    out.append(0)
+    flag_bit = 0
+    i = 0
+    while i < n:
+        if flag_bit == 8:
+            flag_pos = len(out)
+            out.append(0)
+            flag_bit = 0
+
+        best_len = 0
+        best_offset = 0
+        if i + MIN_MATCH <= n:
+            limit = min(MAX_MATCH, n - i)
+            key = (data[i] << 16) | (data[i + 1] << 8) | data[i + 2]
+            candidate = head.get(key, -1)
+            chain = 0
+            while candidate >= 0 and i - candidate <= window and chain < max_chain:
+                # Cheap reject: the match must beat best_len at its last byte
+                if best_len == 0 or data[candidate + best_len] == data[i + best_len]:
+                    length = _match_length(data, candidate, i, limit)
+                    if length > best_len:
+                        best_len, best_offset = length, i - candidate
+                        if length == limit:
+                            break
+                candidate = prev[candidate]
+                chain += 1
+
+        if best_len >= MIN_MATCH:
+            out[flag_pos] |= 0x80 >> flag_bit
+            out += struct.pack('>HB', best_offset - 1, best_len - MIN_MATCH)
+            for j in range(i, min(i + best_len, n - MIN_MATCH + 1)):
+                insert(j)
+            i += best_len
+        else:
+            out.append(data[i])
+            if i + MIN_MATCH <= n:
+                insert(i)
+            i += 1
+        flag_bit += 1
+
+    return bytes(out)
+
+def lz77_decode(encoded):
+    """Decode lz77_encode output"""
+    n, = LENGTH_HEADER.unpack_from(encoded)
+    out = bytearray()
+    pos = LENGTH_HEADER.size
+    while len(out) < n:
+        flags = encoded[pos]
+        pos += 1
+        for bit in range(8):
+            if len(out) >= n:
+                break
+            if flags & (0x80 >> bit):
+                offset, length = struct.unpack_from('>HB', encoded, pos)
+                pos += 3
+                offset += 1
+                length += MIN_MATCH
+                start = len(out) - offset
+                if offset >= length:
+                    out += out[start:start + length]
+                else:
+                    # Overlapping copy: the match repeats its own last `offset` bytes
+                    pattern = out[start:]
+                    out += (pattern * (length // offset + 1))[:length]
+            else:
+                out.append(encoded[pos])
+                pos += 1
+    return bytes(out)
+
+# ============================================
+# LZ78 (TRIE DICTIONARY)
+# ============================================
+
+LZ78_MAX_ENTRIES = 1 << 16
+
+def lz78_encode(data, max_entries=LZ78_MAX_ENTRIES):
+    """LZ78 (phrase index, next byte) pairs, index width grows with the dictionary"""
+    writer = BitWriter()
+    trie = {}
+    next_index = 1
+    node = 0
+
+    for byte in data:
+        child = trie.get((node << 8) | byte)
+        if child is not None:
+            node = child
+            continue
+        writer.write(node, (next_index - 1).bit_length() or 1)
+        writer.write(byte, 8)
+        trie[(node << 8) | byte] = next_index
+        next_index += 1
+        node = 0
+        if next_index == max_entries:
+            trie.clear()
+            next_index = 1
+
+    if node:
+        # Incomplete last phrase: pad with a dummy byte, the length header trims it
+        writer.write(node, (next_index - 1).bit_length() or 1)
+        writer.write(0, 8)
+
+    return LENGTH_HEADER.pack(len(data)) + writer.getvalue()
+
+def lz78_decode(encoded, max_entries=LZ78_MAX_ENTRIES):
+    """Decode lz78_encode output"""
+    n, = LENGTH_HEADER.unpack_from(encoded)
+    reader = BitReader(encoded[LENGTH_HEADER.size:])
+    phrases = [b'']
+    out = bytearray()
+
+    while len(out) < n:
+        index = reader.read((len(phrases) - 1).bit_length() or 1)
+        phrase = phrases[index] + bytes((reader.read(8),))
+        out += phrase
+        phrases.append(phrase)
+        if len(phrases) == max_entries:
+            phrases = [b'']
+
+    return bytes(out[:n])
+
+# ============================================
+# LZW (TRIE DICTIONARY, VARIABLE-WIDTH CODES)
+# ============================================
+
+LZW_CLEAR = 256
+LZW_FIRST = 257
+LZW_MAX_CODES = 1 << 16
+
+def lzw_encode(data, max_codes=LZW_MAX_CODES):
+    """LZW with 9..16-bit codes and a clear code when the dictionary is full"""
+    writer = BitWriter()
+    trie = {}
+    next_code = LZW_FIRST
+    if not data:
+        return LENGTH_HEADER.pack(0)
+
+    code = data[0]
+    for byte in data[1:]:
+        child = trie.get((code << 8) | byte)
+        if child is not None:
+            code = child
+            continue
+        writer.write(code, (next_code - 1).bit_length())
+        if next_code < max_codes:
+            trie[(code << 8) | byte] = next_code
+            next_code += 1
+        else:
+            writer.write(LZW_CLEAR, (next_code - 1).bit_length())
+            trie.clear()
+            next_code = LZW_FIRST
+        code = byte
+    writer.write(code, (next_code - 1).bit_length())
+
+    return LENGTH_HEADER.pack(len(data)) + writer.getvalue()
+
+def lzw_decode(encoded, max_codes=LZW_MAX_CODES):
+    """Decode lzw_encode output"""
+    n, = LENGTH_HEADER.unpack_from(encoded)
+    reader = BitReader(encoded[LENGTH_HEADER.size:])
+    entries = [bytes((i,)) for i in range(256)] + [b'']
+    out = bytearray()
+    previous = None
+    # The encoder never writes wider codes than this, even with a full dictionary
+    max_width = (max_codes - 1).bit_length()
+
+    while len(out) < n:
+        # The decoder adds each entry one code later than the encoder did
+        width = min((len(entries) - (0 if previous is not None else 1)).bit_length(), max_width)
+        code = reader.read(width)
+        if code == LZW_CLEAR:
+            entries = entries[:LZW_FIRST]
+            previous = None
+            continue
+        if code < len(entries):
+            entry = entries[code]
+        else:
+            entry = previous + previous[:1]      # cScSc case: code defined by this very step
+        out += entry
+        if previous is not None and len(entries) < max_codes:
+            entries.append(previous + entry[:1])
+        previous = entry
+
+    return bytes(out)
+
+CODECS = {
+    'lz77': (lz77_encode, lz77_decode),
+    'lz78': (lz78_encode, lz78_decode),
+    'lzw': (lzw_encode, lzw_decode),
+}
+
+if __name__ == "__main__":
+    import time
+
+    from benchmark_pqc_compression import generate_test_datasets
+
+    print(f"{'Dataset':<12} {'Codec':<6} {'Original':>9} {'Compressed':>11} {'Ratio':>7} "
+          f"{'Comp MB/s':>10} {'Decomp MB/s':>12} {'OK':>3}")
+    print("-" * 78)
+    for name, data in generate_test_datasets().items():
+        for codec, (encode, decode) in CODECS.items():
+            start = time.perf_counter()
+            encoded = encode(data)
+            encode_time = time.perf_counter() - start
+            start = time.perf_counter()
+            decoded = decode(encoded)
+            decode_time = time.perf_counter() - start
+            mb = len(data) / 1024 / 1024
+            print(f"{name:<12} {codec:<6} {len(data):>9,} {len(encoded):>11,} "
+                  f"{len(data)/len(encoded):>6.2f}x {mb/encode_time:>10.2f} {mb/decode_time:>12.2f} "
+                  f"{'✓' if decoded == data else '✗':>3}")
+
+    # High-entropy input fills the 16-bit dictionary several times (clear codes)
+    import os
+    data = os.urandom(300_000)
+    for codec, (encode, decode) in CODECS.items():
+        print(f"round-trip {codec:<5} on {len(data):,} random bytes: "
+              f"{'✓' if decode(encode(data)) == data else '✗'}")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Merkle-Tree Batch Signing for IoT Readings
+One PQC signature over a Merkle root authenticates a whole batch of readings;
+each reading travels with a logarithmic-size inclusion proof.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import hashlib
+import os
+import struct
+import time
+
+from benchmark_pqc_compression import (
+    HAS_OQS, SIMULATED_SIG_SIZES, benchmark_signature, generate_iot_readings,
+    latency_stats, print_header
+)
+
+if HAS_OQS:
+    import oqs
+
+HASH_SIZE = 32
+LEAF_PREFIX = b'\x00'  # Domain separation between leaves and inner nodes
+NODE_PREFIX = b'\x01'  # (prevents second-preimage tricks, as in RFC 6962)
+ROOT_CONTEXT = b'pqc-iot-merkle-batch-v1'
+
+# ============================================
+# MERKLE TREE
+# ============================================
+
+def hash_leaf(reading):
+    """Hash one reading into a leaf"""
+    return hashlib.sha256(LEAF_PREFIX + reading).digest()
+
+def hash_node(left, right):
+    """Hash two children into their parent"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def build_merkle_tree(leaves):
+    """Build the tree bottom-up, returns the list of levels (leaves first, root last)"""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree over an empty batch")
+
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [hash_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            # Odd node is promoted unchanged (no duplication of the last leaf)
+            parent.append(level[-1])
+        levels.append(parent)
+
+    return levels
+
+def inclusion_proof(levels, index):
+    """Sibling hashes from leaf `index` up to the root"""
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(level[sibling])
+        index //= 2
+    return path
+
+def encode_proof(index, path):
+    """Wire format of an inclusion proof: 4-byte index + sibling hashes"""
+    return struct.pack('>I', index) + b''.join(path)
+
+def decode_proof(proof):
+    """Inverse of encode_proof"""
+    index, = struct.unpack_from('>I', proof)
+    path = [proof[i:i + HASH_SIZE] for i in range(4, len(proof), HASH_SIZE)]
+    return index, path
+
+def root_from_proof(leaf, index, size, path, verified=None):
+    """Recompute the root from a leaf and its proof (None if the proof is malformed)
+
+    `verified` optionally maps (level, index) -> hash for nodes already proven to
+    lead to the root; climbing stops as soon as one of them is reached, which
+    makes verifying a whole batch O(n) instead of O(n log n).
+    """
+    if not 0 <= index < size:
+        return None
+
+    node = leaf
+    remaining = iter(path)
+    level = 0
+    trail = []
+
+    while size > 1:
+        if verified is not None and verified.get((level, index)) == node:
+            return verified[('root',)]
+        trail.append((level, index, node))
+
+        sibling = index ^ 1
+        if sibling < size:
+            sibling_hash = next(remaining, None)
+            if sibling_hash is None:
+                return None
+            node = hash_node(sibling_hash, node) if index & 1 else hash_node(node, sibling_hash)
+
+        index //= 2
+        size = (size + 1) // 2
+        level += 1
+
+    if next(remaining, None) is not None:
+        return None
+
+    if verified is not None and verified.get(('root',)) == node:
+        for lvl, idx, value in trail:
+            verified[(lvl, idx)] = value
+
+    return node
+
+def root_message(root, size):
+    """Message actually signed for a batch"""
+    return ROOT_CONTEXT + struct.pack('>I', size) + root
+
+# ============================================
+# BATCH AUTHENTICATOR
+# ============================================
+
+class BatchAuthenticator:
+    """Signs batches of readings with a single PQC signature over the Merkle root"""
+
+    def __init__(self, sig_alg='Dilithium2'):
+        self.sig_alg = sig_alg
+        self.simulated = not HAS_OQS
+
+        if HAS_OQS:
+            self._signer = oqs.Signature(sig_alg)
+            self.public_key = self._signer.generate_keypair()
+        else:
+            # Keyed hash with the right signature length - NOT a real signature,
+            # only stands in for liboqs so the byte accounting stays correct
+            sizes = SIMULATED_SIG_SIZES.get(sig_alg, SIMULATED_SIG_SIZES['Dilithium2'])
+            self._sig_size = sizes['sig']
+            self._secret = os.urandom(32)
+            self.public_key = hashlib.shake_256(self._secret).digest(sizes['pk'])
+
+    def _sign(self, message):
+        if HAS_OQS:
+            return self._signer.sign(message)
+        return hashlib.shake_256(self._secret + message).digest(self._sig_size)
+
+    def _verify(self, message, signature):
+        if HAS_OQS:
+            return oqs.Signature(self.sig_alg).verify(message, signature, self.public_key)
+        return signature == hashlib.shake_256(self._secret + message).digest(self._sig_size)
+
+    def sign_batch(self, readings):
+        """Sign a batch, returns {'size', 'root', 'signature', 'proofs'}"""
+        levels = build_merkle_tree([hash_leaf(r) for r in readings])
+        root = levels[-1][0]
+
+        return {
+            'size': len(readings),
+            'root': root,
+            'signature': self._sign(root_message(root, len(readings))),
+            'proofs': [encode_proof(i, inclusion_proof(levels, i)) for i in range(len(readings))]
+        }
+
+    def verify_root(self, batch):
+        """Check the batch signature (once per batch)"""
+        return self._verify(root_message(batch['root'], batch['size']), batch['signature'])
+
+    def verify_reading(self, reading, proof, batch):
+        """Check a single reading against an already verified batch root"""
+        index, path = decode_proof(proof)
+        return root_from_proof(hash_leaf(reading), index, batch['size'], path) == batch['root']
+
+    def verify_many(self, readings, proofs, batch):
+        """Check many readings against one root; shared subtrees are hashed once"""
+        if not self.verify_root(batch):
+            return [False] * len(readings)
+
+        verified = {('root',): batch['root']}
+        results = []
+        for reading, proof in zip(readings, proofs):
+            index, path = decode_proof(proof)
+            root = root_from_proof(hash_leaf(reading), index, batch['size'], path, verified)
+            results.append(root == batch['root'])
+        return results
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def benchmark_batch_signing(sig_alg='Dilithium2', batch_sizes=(1, 4, 16, 64, 256, 1024), repeat=5):
+    """Per-message bytes and CPU: Merkle batch signing vs per-message signing"""
+    readings = generate_iot_readings(max(batch_sizes))
+    reading_size = sum(len(r) for r in readings) / len(readings)
+
+    # Per-message signing baseline (real liboqs timings when available)
+    baseline = benchmark_signature(sig_alg, readings[0])
+    authenticator = BatchAuthenticator(sig_alg)
+
+    results = []
+    for batch_size in batch_sizes:
+        batch_readings = readings[:batch_size]
+        tree_samples, verify_samples = [], []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            levels = build_merkle_tree([hash_leaf(r) for r in batch_readings])
+            proofs = [encode_proof(i, inclusion_proof(levels, i)) for i in range(batch_size)]
+            tree_samples.append(time.perf_counter() - start)
+
+            batch = {'size': batch_size, 'root': levels[-1][0]}
+            verified = {('root',): batch['root']}
+            start = time.perf_counter()
+            ok = True
+            for reading, proof in zip(batch_readings, proofs):
+                index, path = decode_proof(proof)
+                ok &= root_from_proof(hash_leaf(reading), index, batch_size, path,
+                                      verified) == batch['root']
+            verify_samples.append(time.perf_counter() - start)
+
+        tree_time = latency_stats(tree_samples)['p50']
+        verify_time = latency_stats(verify_samples)['p50']
+        proof_bytes = sum(len(p) for p in proofs) / batch_size
+        header_bytes = baseline['sig_size'] + 4  # signature + batch size
+
+        batch_cpu = tree_time + baseline['sign_time'] + verify_time + baseline['verify_time']
+        per_message_bytes = proof_bytes + header_bytes / batch_size
+        per_message_cpu = batch_cpu / batch_size
+        baseline_cpu = baseline['sign_time'] + baseline['verify_time']
+
+        results.append({
+            'sig_algorithm': sig_alg,
+            'batch_size': batch_size,
+            'reading_size': reading_size,
+            'proof_size': proof_bytes,
+            'per_message_bytes': per_message_bytes,
+            'per_message_bytes_baseline': baseline['sig_size'],
+            'per_message_cpu_time': per_message_cpu,
+            'per_message_cpu_time_baseline': baseline_cpu,
+            'byte_savings': (1 - per_message_bytes / baseline['sig_size']) * 100,
+            'cpu_speedup': baseline_cpu / per_message_cpu if per_message_cpu > 0 else 0,
+            'success': ok and authenticator.verify_many(
+                batch_readings, proofs, authenticator.sign_batch(batch_readings)) == [True] * batch_size,
+            'simulated': baseline.get('simulated', False)
+        })
+
+    return results
+
+def print_batch_signing_results(results):
+    """Print batch signing comparison table"""
+    print(f"{'Batch':>6} {'Proof (B)':>10} {'Bytes/msg':>10} {'Per-msg sig':>12} "
+          f"{'Savings':>8} {'CPU/msg (ms)':>13} {'Per-msg (ms)':>13} {'OK':>3}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r['batch_size']:>6} {r['proof_size']:>10.0f} {r['per_message_bytes']:>10.1f} "
+              f"{r['per_message_bytes_baseline']:>12,} {r['byte_savings']:>7.1f}% "
+              f"{r['per_message_cpu_time']*1000:>13.4f} {r['per_message_cpu_time_baseline']*1000:>13.4f} "
+              f"{'✓' if r['success'] else '✗':>3}")
+    if results and results[0]['simulated']:
+        print("\nNote: [SIMULATED signature timings - Install liboqs-python for real results]")
+
+if __name__ == "__main__":
+    for sig_alg in ['Dilithium2', 'Falcon-512', 'SPHINCS+-SHA2-128f-simple']:
+        print_header(f"MERKLE BATCH SIGNING: {sig_alg}")
+        print_batch_signing_results(benchmark_batch_signing(sig_alg))
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+ML-KEM (FIPS 203) in pure Python + NumPy
+Fallback KEM when liboqs is not installed: real keys, real ciphertexts and
+real (if slower) timings. Polynomial arithmetic is vectorized with a
+precomputed-twiddle NTT and batched across many keys at once.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Requires: pip install numpy
+Note: this is a reference implementation for benchmarking, not constant-time.
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+# ============================================
+# PARAMETERS (FIPS 203, Table 2)
+# ============================================
+
+N = 256
+Q = 3329
+
+PARAMS = {
+    'ML-KEM-512': {'k': 2, 'eta1': 3, 'eta2': 2, 'du': 10, 'dv': 4},
+    'ML-KEM-768': {'k': 3, 'eta1': 2, 'eta2': 2, 'du': 10, 'dv': 4},
+    'ML-KEM-1024': {'k': 4, 'eta1': 2, 'eta2': 2, 'du': 11, 'dv': 5},
+}
+
+# The rest of the project uses the round-3 Kyber names; sizes are identical
+ALIASES = {
+    'Kyber512': 'ML-KEM-512',
+    'Kyber768': 'ML-KEM-768',
+    'Kyber1024': 'ML-KEM-1024',
+}
+
+def get_params(algorithm):
+    """Parameter set for an ML-KEM / Kyber algorithm name"""
+    name = ALIASES.get(algorithm, algorithm)
+    if name not in PARAMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    return PARAMS[name]
+
+def key_sizes(algorithm):
+    """Public key, secret key and ciphertext sizes in bytes"""
+    p = get_params(algorithm)
+    k = p['k']
+    return {
+        'pk': 384 * k + 32,
+        'sk': 768 * k + 96,
+        'ct': 32 * (p['du'] * k + p['dv']),
+    }
+
+# ============================================
+# PRECOMPUTED TABLES
+# ============================================
+
+def _bitrev7(i):
+    return int(f'{i:07b}'[::-1], 2)
+
+ZETAS = np.array([pow(17, _bitrev7(i), Q) for i in range(128)], dtype=np.int64)
+GAMMAS = np.array([pow(17, 2 * _bitrev7(i) + 1, Q) for i in range(128)], dtype=np.int64)
+N_INV = pow(128, -1, Q)
+
+# Twiddles per NTT layer: layer with half-size `length` uses zetas[128/length : 256/length]
+NTT_LAYERS = [(length, ZETAS[128 // length:256 // length].reshape(-1, 1))
+              for length in (128, 64, 32, 16, 8, 4, 2)]
+INTT_LAYERS = [(length, ZETAS[128 // length:256 // length][::-1].reshape(-1, 1))
+               for length in (2, 4, 8, 16, 32, 64, 128)]
+
+# ============================================
+# VECTORIZED POLYNOMIAL ARITHMETIC
+# ============================================
+
+def ntt(f):
+    """Forward NTT over the last axis (any number of leading batch axes)"""
+    f = f.copy()
+    batch = f.shape[:-1]
+    for length, zetas in NTT_LAYERS:
+        view = f.reshape(batch + (N // (2 * length), 2, length))
+        t = zetas * view[..., 1, :] % Q
+        view[..., 1, :] = (view[..., 0, :] - t) % Q
+        view[..., 0, :] = (view[..., 0, :] + t) % Q
+    return f
+
+def intt(f):
+    """Inverse NTT over the last axis"""
+    f = f.copy()
+    batch = f.shape[:-1]
+    for length, zetas in INTT_LAYERS:
+        view = f.reshape(batch + (N // (2 * length), 2, length))
+        t = view[..., 0, :].copy()
+        view[..., 0, :] = (t + view[..., 1, :]) % Q
+        view[..., 1, :] = zetas * (view[..., 1, :] - t) % Q
+    return f * N_INV % Q
+
+def multiply_ntts(f, g):
+    """Pointwise product in the NTT domain (128 degree-1 base-case products)"""
+    a0, a1 = f[..., 0::2], f[..., 1::2]
+    b0, b1 = g[..., 0::2], g[..., 1::2]
+    out = np.empty(np.broadcast_shapes(f.shape, g.shape), dtype=np.int64)
+    out[..., 0::2] = (a0 * b0 + a1 * b1 % Q * GAMMAS) % Q
+    out[..., 1::2] = (a0 * b1 + a1 * b0) % Q
+    return out
+
+def matrix_vector_ntt(matrix, vector):
+    """sum_j matrix[..., i, j, :] * vector[..., j, :] in the NTT domain"""
+    return multiply_ntts(matrix, vector[..., None, :, :]).sum(axis=-2) % Q
+
+def compress(x, d):
+    """Compress_d: round(2^d / q * x) mod 2^d"""
+    return ((x << (d + 1)) + Q) // (2 * Q) & ((1 << d) - 1)
+
+def decompress(y, d):
+    """Decompress_d: round(q / 2^d * y)"""
+    return (y * Q + (1 << (d - 1))) >> d
+
+# ============================================
+# BYTE ENCODING
+# ============================================
+
+_SHIFTS = {d: np.arange(d, dtype=np.int64) for d in range(1, 13)}
+
+def byte_encode(f, d):
+    """ByteEncode_d of a (batch, ..., 256) array -> one bytes object per batch row"""
+    bits = ((f[..., None] >> _SHIFTS[d]) & 1).astype(np.uint8)
+    packed = np.packbits(bits.reshape(f.shape[0], -1), axis=-1, bitorder='little')
+    return [row.tobytes() for row in packed]
+
+def byte_decode(data, d, count):
+    """ByteDecode_d of a list of equal-length byte strings -> (batch, count, 256)"""
+    raw = np.frombuffer(b''.join(data), dtype=np.uint8).reshape(len(data), -1)
+    bits = np.unpackbits(raw, axis=-1, bitorder='little').astype(np.int64)
+    values = (bits.reshape(len(data), count, N, d) << _SHIFTS[d]).sum(axis=-1)
+    return values % Q if d == 12 else values
+
+# ============================================
+# HASHING AND SAMPLING
+# ============================================
+
+def _G(data):
+    digest = hashlib.sha3_512(data).digest()
+    return digest[:32], digest[32:]
+
+def _H(data):
+    return hashlib.sha3_256(data).digest()
+
+def _J(data):
+    return hashlib.shake_256(data).digest(32)
+
+def _prf(eta, seed, nonce):
+    return hashlib.shake_256(seed + bytes([nonce])).digest(64 * eta)
+
+def _ntt_candidates(stream):
+    """Split a SHAKE128 stream into 12-bit SampleNTT candidates (last axis)"""
+    c = stream.reshape(stream.shape[:-1] + (-1, 3)).astype(np.int64)
+    d1 = c[..., 0] + 256 * (c[..., 1] & 15)
+    d2 = (c[..., 1] >> 4) + 16 * c[..., 2]
+    return np.stack([d1, d2], axis=-1).reshape(stream.shape[:-1] + (-1,))
+
+def sample_ntt(seed, length=504):
+    """SampleNTT: rejection-sample a uniform NTT-domain polynomial from SHAKE128"""
+    while True:
+        stream = np.frombuffer(hashlib.shake_128(seed).digest(length), dtype=np.uint8)
+        candidates = _ntt_candidates(stream)
+        accepted = candidates[candidates < Q]
+        if len(accepted) >= N:
+            return accepted[:N]
+        length += 168  # One more SHAKE128 block (prefix of the same stream)
+
+def sample_matrices(rhos, k):
+    """A_hat[i][j] = SampleNTT(rho || j || i) for every rho -> (batch, k, k, 256)
+
+    All k*k*batch rejection samplings run as one vectorized pass; the rare
+    stream that needs more than 3 SHAKE128 blocks falls back to sample_ntt.
+    """
+    seeds = [rho + bytes([j, i]) for rho in rhos for i in range(k) for j in range(k)]
+    raw = b''.join(hashlib.shake_128(seed).digest(504) for seed in seeds)
+    candidates = _ntt_candidates(np.frombuffer(raw, dtype=np.uint8).reshape(len(seeds), 504))
+
+    accepted = candidates < Q
+    keep = accepted & (np.cumsum(accepted, axis=1) <= N)
+    counts = keep.sum(axis=1)
+
+    out = np.empty((len(seeds), N), dtype=np.int64)
+    full = counts == N
+    out[full] = candidates[full][keep[full]].reshape(-1, N)
+    for row in np.nonzero(~full)[0]:
+        out[row] = sample_ntt(seeds[row], 672)
+
+    return out.reshape(len(rhos), k, k, N)
+
+def sample_cbd(data, eta):
+    """SamplePolyCBD_eta over a (batch, ..., 64*eta) uint8 array"""
+    bits = np.unpackbits(data, axis=-1, bitorder='little').astype(np.int64)
+    bits = bits.reshape(data.shape[:-1] + (N, 2, eta)).sum(axis=-1)
+    return (bits[..., 0] - bits[..., 1]) % Q
+
+def sample_noise(seeds, eta, first_nonce, count):
+    """CBD noise vectors of `count` polynomials for each seed -> (batch, count, 256)"""
+    raw = b''.join(_prf(eta, seed, first_nonce + i) for seed in seeds for i in range(count))
+    data = np.frombuffer(raw, dtype=np.uint8).reshape(len(seeds), count, 64 * eta)
+    return sample_cbd(data, eta)
+
+# ============================================
+# K-PKE AND ML-KEM (batched)
+# ============================================
+
+def _pke_keygen(params, seeds):
+    k, eta1 = params['k'], params['eta1']
+    expanded = [_G(d + bytes([k])) for d in seeds]
+    rhos = [rho for rho, _ in expanded]
+    sigmas = [sigma for _, sigma in expanded]
+
+    a_hat = sample_matrices(rhos, k)
+    s_hat = ntt(sample_noise(sigmas, eta1, 0, k))
+    e_hat = ntt(sample_noise(sigmas, eta1, k, k))
+    t_hat = (matrix_vector_ntt(a_hat, s_hat) + e_hat) % Q
+
+    eks = [t + rho for t, rho in zip(byte_encode(t_hat, 12), rhos)]
+    dks = byte_encode(s_hat, 12)
+    return eks, dks
+
+def _pke_encrypt(params, eks, messages, coins):
+    k, du, dv = params['k'], params['du'], params['dv']
+    t_hat = byte_decode([ek[:384 * k] for ek in eks], 12, k)
+    a_hat = sample_matrices([ek[384 * k:] for ek in eks], k)
+
+    y_hat = ntt(sample_noise(coins, params['eta1'], 0, k))
+    e1 = sample_noise(coins, params['eta2'], k, k)
+    e2 = sample_noise(coins, params['eta2'], 2 * k, 1)[:, 0]
+    mu = decompress(byte_decode(messages, 1, 1)[:, 0], 1)
+
+    u = (intt(matrix_vector_ntt(np.swapaxes(a_hat, -2, -3), y_hat)) + e1) % Q
+    v = (intt(multiply_ntts(t_hat, y_hat).sum(axis=-2) % Q) + e2 + mu) % Q
+
+    c1 = byte_encode(compress(u, du), du)
+    c2 = byte_encode(compress(v, dv)[:, None, :], dv)
+    return [a + b for a, b in zip(c1, c2)]
+
+def _pke_decrypt(params, dks, ciphertexts):
+    k, du, dv = params['k'], params['du'], params['dv']
+    split = 32 * du * k
+    u = decompress(byte_decode([c[:split] for c in ciphertexts], du, k), du)
+    v = decompress(byte_decode([c[split:] for c in ciphertexts], dv, 1)[:, 0], dv)
+    s_hat = byte_decode(dks, 12, k)
+
+    w = (v - intt(multiply_ntts(s_hat, ntt(u)).sum(axis=-2) % Q)) % Q
+    return byte_encode(compress(w, 1)[:, None, :], 1)
+
+def keygen_batch(algorithm, count=1, seeds=None):
+    """Generate `count` keypairs at once -> list of (public_key, secret_key)
+
+    seeds optionally provides (d, z) pairs for deterministic key generation.
+    """
+    params = get_params(algorithm)
+    if seeds is None:
+        seeds = [(os.urandom(32), os.urandom(32)) for _ in range(count)]
+
+    eks, pke_dks = _pke_keygen(params, [d for d, _ in seeds])
+    return [(ek, pke_dk + ek + _H(ek) + z) for ek, pke_dk, (_, z) in zip(eks, pke_dks, seeds)]
+
+def _check_public_key(params, public_key):
+    """FIPS 203 encapsulation key check (length and modulus)"""
+    k = params['k']
+    if len(public_key) != 384 * k + 32:
+        raise ValueError("Invalid ML-KEM public key length")
+    t = byte_decode([public_key[:384 * k]], 12, k)
+    if byte_encode(t, 12)[0] != public_key[:384 * k]:
+        raise ValueError("Invalid ML-KEM public key (coefficient out of range)")
+
+def encaps_batch(algorithm, public_keys, messages=None):
+    """Encapsulate against many public keys at once -> list of (ciphertext, shared_secret)"""
+    params = get_params(algorithm)
+    for public_key in public_keys:
+        _check_public_key(params, public_key)
+    if messages is None:
+        messages = [os.urandom(32) for _ in public_keys]
+
+    derived = [_G(m + _H(ek)) for m, ek in zip(messages, public_keys)]
+    ciphertexts = _pke_encrypt(params, public_keys, messages, [r for _, r in derived])
+    return [(c, key) for c, (key, _) in zip(ciphertexts, derived)]
+
+def decaps_batch(algorithm, secret_keys, ciphertexts):
+    """Decapsulate many ciphertexts at once (implicit rejection) -> list of shared secrets"""
+    params = get_params(algorithm)
+    k = params['k']
+    sizes = key_sizes(algorithm)
+    for secret_key, ciphertext in zip(secret_keys, ciphertexts):
+        if len(secret_key) != sizes['sk'] or len(ciphertext) != sizes['ct']:
+            raise ValueError("Invalid ML-KEM secret key or ciphertext length")
+
+    pke_dks = [sk[:384 * k] for sk in secret_keys]
+    eks = [sk[384 * k:768 * k + 32] for sk in secret_keys]
+    hashes = [sk[768 * k + 32:768 * k + 64] for sk in secret_keys]
+    zs = [sk[768 * k + 64:] for sk in secret_keys]
+
+    messages = _pke_decrypt(params, pke_dks, ciphertexts)
+    derived = [_G(m + h) for m, h in zip(messages, hashes)]
+    reencrypted = _pke_encrypt(params, eks, messages, [r for _, r in derived])
+
+    return [key if c == c_prime else _J(z + c)
+            for (key, _), c, c_prime, z in zip(derived, ciphertexts, reencrypted, zs)]
+
+# ============================================
+# liboqs-COMPATIBLE INTERFACE
+# ============================================
+
+class KeyEncapsulation:
+    """Drop-in for oqs.KeyEncapsulation backed by the NumPy implementation"""
+
+    def __init__(self, alg_name, secret_key=None):
+        get_params(alg_name)
+        self.alg_name = alg_name
+        self.secret_key = secret_key
+
+    def generate_keypair(self):
+        public_key, self.secret_key = keygen_batch(self.alg_name, 1)[0]
+        return public_key
+
+    def export_secret_key(self):
+        return self.secret_key
+
+    def encap_secret(self, public_key):
+        return encaps_batch(self.alg_name, [public_key])[0]
+
+    def decap_secret(self, ciphertext):
+        return decaps_batch(self.alg_name, [self.secret_key], [ciphertext])[0]
+
+# ============================================
+# BATCH BENCHMARK
+# ============================================
+
+def benchmark_batched_kem(algorithm='ML-KEM-768', batch_sizes=(1, 8, 64, 256)):
+    """Per-key keygen/encap/decap cost as the batch grows"""
+    results = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        keypairs = keygen_batch(algorithm, batch_size)
+        keygen_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encapsulated = encaps_batch(algorithm, [pk for pk, _ in keypairs])
+        encap_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        secrets = decaps_batch(algorithm, [sk for _, sk in keypairs], [c for c, _ in encapsulated])
+        decap_time = time.perf_counter() - start
+
+        results.append({
+            'algorithm': algorithm,
+            'batch_size': batch_size,
+            'keygen_time': keygen_time / batch_size,
+            'encap_time': encap_time / batch_size,
+            'decap_time': decap_time / batch_size,
+            'keygen_per_sec': batch_size / keygen_time,
+            'success': secrets == [key for _, key in encapsulated]
+        })
+    return results
+
+if __name__ == "__main__":
+    for algorithm in PARAMS:
+        print(f"\n{algorithm} (sizes: {key_sizes(algorithm)})")
+        print(f"{'Batch':>6} {'KeyGen/key':>12} {'Encap/key':>12} {'Decap/key':>12} {'Keys/s':>10} {'OK':>3}")
+        print("-" * 60)
+        for r in benchmark_batched_kem(algorithm):
+            print(f"{r['batch_size']:>6} {r['keygen_time']*1000:>9.3f} ms {r['encap_time']*1000:>9.3f} ms "
+                  f"{r['decap_time']*1000:>9.3f} ms {r['keygen_per_sec']:>10.0f} {'✓' if r['success'] else '✗':>3}")
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Pipeline Metrics (Prometheus Text Format)
+Counters and latency histograms for the compress / KEM / AEAD stages of
+the gateway pipeline: bytes in and out, compression ratio, operation
+latency and errors, labelled by stage and codec / KEM. Served in the
+Prometheus text exposition format on a local HTTP endpoint.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: METRICS.enable() or serve_metrics(port) at gateway start-up, then
+       scrape http://127.0.0.1:9108/metrics
+"""
+
+import functools
+import inspect
+import threading
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+METRICS_PORT = 9108
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds: from a zlib call on a small reading (µs) to a SPHINCS+ signature
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+RATIO_BUCKETS = (1, 1.5, 2, 3, 4, 6, 8, 12, 16, 32, 64)
+
+# Queued operations are folded into the metrics at every scrape, and
+# earlier when this many are waiting (bounds memory without a scraper)
+DRAIN_EVERY = 1024
+
+# ============================================
+# METRIC TYPES
+# ============================================
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+# Children take no lock of their own: PipelineMetrics applies queued
+# operations to them under a single lock (see PipelineMetrics.record)
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One slot per bucket plus the +Inf overflow; cumulated at exposition
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Metric:
+    """A metric family: one child per label value tuple"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def clear(self):
+        with self._lock:
+            self._children = {}
+
+    def samples(self):
+        raise NotImplementedError
+
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {value}" for name, labels, value in self.samples()]
+        return '\n'.join(lines)
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def samples(self):
+        for values, child in sorted(self._children.items()):
+            yield self.name, _format_labels(self.labelnames, values), _format_value(child.value)
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def samples(self):
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), child.counts):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"'), cumulative)
+            yield f"{self.name}_sum", _format_labels(self.labelnames, values), _format_value(child.sum)
+            yield f"{self.name}_count", _format_labels(self.labelnames, values), cumulative
+
+# ============================================
+# PIPELINE METRICS
+# ============================================
+
+class PipelineMetrics:
+    """The metric families of the pipeline, off until enable()
+
+    Stages: compress, decompress (impl = codec), keygen, encap, decap
+    (impl = KEM), seal, open (impl = AEAD). When disabled, instrumented
+    calls cost one attribute check on top of the call itself; when enabled,
+    record() only queues the operation (a lock-free deque append), so the
+    label lookup and histogram update stay off the message path.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.bytes_in = Counter('pqc_pipeline_bytes_in_total', 'Bytes entering a pipeline stage',
+                                ('stage', 'impl'))
+        self.bytes_out = Counter('pqc_pipeline_bytes_out_total', 'Bytes leaving a pipeline stage',
+                                 ('stage', 'impl'))
+        self.duration = Histogram('pqc_pipeline_duration_seconds', 'Latency of one pipeline operation',
+                                  ('stage', 'impl'))
+        self.ratio = Histogram('pqc_compression_ratio', 'Original size / compressed size per message',
+                               ('codec',), RATIO_BUCKETS)
+        self.errors = Counter('pqc_pipeline_errors_total', 'Pipeline operations that raised',
+                              ('stage', 'impl'))
+        self.families = [self.bytes_in, self.bytes_out, self.duration, self.ratio, self.errors]
+        self._series = {}
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def _children(self, stage, impl):
+        series = self._series.get((stage, impl))
+        if series is None:
+            series = self._series[(stage, impl)] = (
+                self.bytes_in.labels(stage, impl), self.bytes_out.labels(stage, impl),
+                self.duration.labels(stage, impl),
+                self.ratio.labels(impl) if stage == 'compress' else None)
+        return series
+
+    def record(self, stage, impl, size_in, size_out, seconds):
+        pending = self._pending
+        pending.append((stage, impl, size_in, size_out, seconds))
+        if len(pending) >= DRAIN_EVERY:
+            self.drain()
+
+    def drain(self):
+        """Fold the queued operations into the metric families"""
+        with self._lock:
+            pending = self._pending
+            # popleft is atomic: records appended meanwhile wait for the next drain
+            for _ in range(len(pending)):
+                stage, impl, size_in, size_out, seconds = pending.popleft()
+                bytes_in, bytes_out, duration, ratio = self._children(stage, impl)
+                bytes_in.value += size_in
+                bytes_out.value += size_out
+                duration.observe(seconds)
+                if ratio is not None and size_out:
+                    ratio.observe(size_in / size_out)
+
+    def record_error(self, stage, impl):
+        error = self.errors.labels(stage, impl)
+        with self._lock:
+            error.value += 1
+
+    def reset(self):
+        """Drop every series recorded so far (e.g. benchmark traffic before serving)"""
+        with self._lock:
+            self._pending.clear()
+            for family in self.families:
+                family.clear()
+            self._series = {}
+
+    def exposition(self):
+        """All families in the Prometheus text format (a consistent snapshot)"""
+        self.drain()
+        with self._lock:
+            return '\n'.join(family.exposition() for family in self.families) + '\n'
+
+# Shared by the instrumented pipeline functions
+METRICS = PipelineMetrics()
+
+def instrumented(stage, impl=None, payload='data'):
+    """Decorator recording a pipeline function in METRICS
+
+    impl: fixed implementation label, or None to use the function's
+    `algorithm` argument. payload: name of the parameter holding the input
+    bytes. Both are found by name, so positional and keyword calls behave
+    the same. The undecorated function stays available as `__wrapped__`.
+    """
+    def decorate(function):
+        parameters = inspect.signature(function).parameters
+        names = list(parameters)
+        payload_index = names.index(payload)
+        if impl is None:
+            label_index = names.index('algorithm')
+            default = parameters['algorithm'].default
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            if impl is not None:
+                label = impl
+            else:
+                label = args[label_index] if len(args) > label_index else kwargs.get('algorithm', default)
+            data = args[payload_index] if len(args) > payload_index else kwargs[payload]
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                METRICS.record_error(stage, label)
+                raise
+            METRICS.record(stage, label, len(data), len(result), perf_counter() - start)
+            return result
+        return wrapper
+    return decorate
+
+class InstrumentedKEM:
+    """KEM object proxy recording keygen / encap / decap in METRICS
+
+    Works with liboqs, mlkem_numpy and PQCSimulator objects (arguments are
+    passed through unchanged).
+    """
+
+    def __init__(self, kem, algorithm):
+        self.kem = kem
+        self.algorithm = algorithm
+
+    def __getattr__(self, name):
+        return getattr(self.kem, name)
+
+    def _failed(self, stage):
+        METRICS.record_error(stage, self.algorithm)
+
+    # Each method times its call inline: right after a KEM operation the
+    # interpreter's caches are cold, and every extra frame on this path
+    # costs microseconds per message
+
+    def generate_keypair(self):
+        if not METRICS.enabled:
+            return self.kem.generate_keypair()
+        start = perf_counter()
+        try:
+            public_key = self.kem.generate_keypair()
+        except Exception:
+            self._failed('keygen')
+            raise
+        METRICS.record('keygen', self.algorithm, 0, len(public_key), perf_counter() - start)
+        return public_key
+
+    def keypair(self):
+        if not METRICS.enabled:
+            return self.kem.keypair()
+        start = perf_counter()
+        try:
+            public_key, secret_key = self.kem.keypair()
+        except Exception:
+            self._failed('keygen')
+            raise
+        METRICS.record('keygen', self.algorithm, 0, len(public_key) + len(secret_key), perf_counter() - start)
+        return public_key, secret_key
+
+    def encap_secret(self, public_key):
+        if not METRICS.enabled:
+            return self.kem.encap_secret(public_key)
+        start = perf_counter()
+        try:
+            ciphertext, secret = self.kem.encap_secret(public_key)
+        except Exception:
+            self._failed('encap')
+            raise
+        METRICS.record('encap', self.algorithm, len(public_key), len(ciphertext) + len(secret),
+                       perf_counter() - start)
+        return ciphertext, secret
+
+    def decap_secret(self, *args):
+        if not METRICS.enabled:
+            return self.kem.decap_secret(*args)
+        start = perf_counter()
+        try:
+            secret = self.kem.decap_secret(*args)
+        except Exception:
+            self._failed('decap')
+            raise
+        METRICS.record('decap', self.algorithm, len(args[-1]), len(secret), perf_counter() - start)
+        return secret
+
+# ============================================
+# HTTP ENDPOINT
+# ============================================
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    metrics = METRICS
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.metrics.exposition().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stderr
+        pass
+
+def serve_metrics(port=METRICS_PORT, host='127.0.0.1', metrics=METRICS):
+    """Enable `metrics` and serve them on http://host:port/metrics from a daemon thread
+
+    Returns the server; call shutdown() on it to stop.
+    """
+    metrics.enable()
+    handler = type('Handler', (MetricsHandler,), {'metrics': metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Pipeline Trace Spans
+Nested spans (compress, encap, seal, decap, open, decompress inside one
+message) recorded with their process and thread IDs, exported in the
+Chrome trace-event format so concurrent gateway runs can be opened in
+chrome://tracing or https://ui.perfetto.dev and queuing and contention
+seen on a timeline.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: TRACER.enable(); ... with TRACER.span('compress', codec='zlib'): ...
+       TRACER.export('pipeline_trace.json')
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter_ns
+
+TRACE_FILE = 'pipeline_trace.json'
+
+def now_us():
+    """Trace timestamp in µs (monotonic clock, shared by the processes of one host)"""
+    return perf_counter_ns() / 1000
+
+# ============================================
+# TRACER
+# ============================================
+
+class Tracer:
+    """Collects complete ('X') events; off until enable()
+
+    Spans nest by time containment on one thread, which is how trace
+    viewers draw them. When disabled, span() costs one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._events = []
+        self._lock = threading.Lock()
+        self._named = set()
+        self.pid = os.getpid()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def _after_fork(self):
+        # A forked worker starts with its parent's events and pid
+        self._events = []
+        self._lock = threading.Lock()
+        self._named = set()
+        self.pid = os.getpid()
+
+    def _thread(self):
+        tid = threading.get_ident()
+        if tid not in self._named:
+            self._named.add(tid)
+            self._events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                                 'args': {'name': threading.current_thread().name}})
+        return tid
+
+    def add_span(self, name, start, end, category='pipeline', **args):
+        """Record a span measured elsewhere (start/end from now_us())"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': start, 'dur': end - start,
+                                 'pid': self.pid, 'tid': self._thread(), 'args': args})
+
+    def add_async(self, name, start, end, span_id, category='queue', **args):
+        """Record an interval that is not on the current thread's stack (e.g. time in a queue)
+
+        Async events get their own track per name, so overlapping waits stay readable.
+        """
+        if not self.enabled:
+            return
+        common = {'name': name, 'cat': category, 'id': span_id, 'pid': self.pid, 'tid': 0}
+        with self._lock:
+            self._events.append({**common, 'ph': 'b', 'ts': start, 'args': args})
+            self._events.append({**common, 'ph': 'e', 'ts': end})
+
+    @contextmanager
+    def span(self, name, category='pipeline', **args):
+        """Trace the enclosed block; spans opened inside it become its children"""
+        if not self.enabled:
+            yield
+            return
+        start = now_us()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, now_us(), category, **args)
+
+    def name_process(self, name):
+        with self._lock:
+            self._events.append({'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                                 'args': {'name': name}})
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+            self._named = set()
+
+    def export(self, filename=TRACE_FILE, extra_events=()):
+        """Write the events (plus ones collected in other processes) as Chrome trace JSON"""
+        events = self.events() + list(extra_events)
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+# Shared by the traced pipeline functions
+TRACER = Tracer()
+os.register_at_fork(after_in_child=TRACER._after_fork)
+
+def span_durations(events, name):
+    """Durations (µs) of the complete or async events called `name`"""
+    durations = [e['dur'] for e in events if e.get('ph') == 'X' and e['name'] == name]
+    begins = {(e['pid'], e['id']): e['ts'] for e in events if e.get('ph') == 'b' and e['name'] == name}
+    durations += [e['ts'] - begins[(e['pid'], e['id'])] for e in events
+                  if e.get('ph') == 'e' and e['name'] == name and (e['pid'], e['id']) in begins]
+    return durations
@@ -4,13 +4,20 @@ PQC + Compression Demonstration
 Combines Post-Quantum Cryptography with Compression for IoT
 For IoT PQC Project - Abdessamad JAOUAD
 
-Requires: pip install liboqs-python lz4 zstandard
+Requires: pip install liboqs-python lz4 zstandard cryptography
 """
 
+import hashlib
+import os
+import random
 import time
 import zlib
 import sys
 
+from benchmark_pqc_compression import load_profile
+from pipeline_metrics import InstrumentedKEM, instrumented
+from pipeline_trace import TRACE_FILE, TRACER, now_us
+
 # Check if liboqs is available
 HAS_OQS = False
 try:
@@ -18,9 +25,14 @@ try:
     HAS_OQS = True
 except (ImportError, RuntimeError, Exception) as e:
     # liboqs-python not installed or C library not found
-    print("WARNING: liboqs C library not found!")
-    print("The Python package is installed but needs the system library.")
-    print("Running in simulation mode...\n")
+    pass
+
+# Pure-Python/NumPy ML-KEM fallback (real keys and ciphertexts, no C library)
+try:
+    import mlkem_numpy
+    HAS_MLKEM = True
+except ImportError:
+    HAS_MLKEM = False
 
 # Check for compression libraries
 try:
@@ -35,12 +47,20 @@ try:
 except ImportError:
     HAS_ZSTD = False
 
+# Authenticated encryption of the payload with the KEM shared secret
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    HAS_AESGCM = True
+except ImportError:
+    HAS_AESGCM = False
+
 # ============================================
 # COMPRESSION FUNCTIONS
 # ============================================
 
+@instrumented('compress')
 def compress_data(data, algorithm='zlib'):
-    """Compress data using specified algorithm"""
+    """Compress data (any buffer: bytes, bytearray, memoryview) using specified algorithm"""
     if algorithm == 'zlib':
         return zlib.compress(data, level=9)
     elif algorithm == 'lz4' and HAS_LZ4:
@@ -49,10 +69,11 @@ def compress_data(data, algorithm='zlib'):
         cctx = zstd.ZstdCompressor(level=3)
         return cctx.compress(data)
     else:
-        return data
+        return bytes(data)
 
+@instrumented('decompress')
 def decompress_data(data, algorithm='zlib'):
-    """Decompress data using specified algorithm"""
+    """Decompress data (any buffer) using specified algorithm"""
     if algorithm == 'zlib':
         return zlib.decompress(data)
     elif algorithm == 'lz4' and HAS_LZ4:
@@ -61,15 +82,263 @@ def decompress_data(data, algorithm='zlib'):
         dctx = zstd.ZstdDecompressor()
         return dctx.decompress(data)
     else:
-        return data
+        return bytes(data)
+
+# ============================================
+# BOUNDED DECOMPRESSION (UNTRUSTED PAYLOADS)
+# ============================================
+
+MAX_OUTPUT_SIZE = 16 * 1024 * 1024   # Largest payload a gateway accepts
+MAX_RATIO = 1024                     # Above the best legitimate ratio (zstd on iot_large: ~500x)
+RATIO_CHECK_FLOOR = 1024 * 1024      # Small outputs may compress arbitrarily well
+CHUNK_SIZE = 64 * 1024
+
+class DecompressionLimitError(ValueError):
+    """Decompressed output exceeded the size or ratio limit"""
+
+def _output_limit(data, max_output, max_ratio):
+    if max_ratio is None:
+        return max_output
+    return min(max_output, max(RATIO_CHECK_FLOOR, len(data) * max_ratio))
+
+def _zlib_chunks(data, chunk_size):
+    d = zlib.decompressobj()
+    chunk = d.decompress(data, chunk_size)
+    while chunk:
+        yield chunk
+        chunk = d.decompress(d.unconsumed_tail, chunk_size)
+    if not d.eof:
+        raise zlib.error("Truncated zlib stream")
+
+def _lz4_chunks(data, chunk_size):
+    d = lz4.LZ4FrameDecompressor()
+    chunk = d.decompress(data, max_length=chunk_size)
+    while chunk:
+        yield chunk
+        if d.eof:
+            return
+        chunk = d.decompress(b'', max_length=chunk_size)
+    if not d.eof:
+        raise RuntimeError("Truncated LZ4 frame")
+
+def _zstd_chunks(data, chunk_size):
+    # stream_reader stops quietly at the end of a truncated frame, so the
+    # output is checked against the declared content size (compress_data sets it)
+    declared = zstd.frame_content_size(data)
+    produced = 0
+    with zstd.ZstdDecompressor().stream_reader(data) as reader:
+        chunk = reader.read(chunk_size)
+        while chunk:
+            produced += len(chunk)
+            yield chunk
+            chunk = reader.read(chunk_size)
+    if declared >= 0 and produced != declared:
+        raise zstd.ZstdError(f"Truncated zstd frame: {produced} of {declared} bytes")
+
+DECOMPRESS_CHUNKS = {'zlib': _zlib_chunks}
+if HAS_LZ4:
+    DECOMPRESS_CHUNKS['lz4'] = _lz4_chunks
+if HAS_ZSTD:
+    DECOMPRESS_CHUNKS['zstd'] = _zstd_chunks
+
+@instrumented('decompress')
+def decompress_bounded(data, algorithm='zlib', max_output=MAX_OUTPUT_SIZE, max_ratio=MAX_RATIO,
+                       chunk_size=CHUNK_SIZE):
+    """Streaming decompress_data for untrusted input: never holds more than the limit
+
+    Output is produced `chunk_size` bytes at a time and decompression stops
+    as soon as it passes max_output, or max_ratio x the input size once past
+    RATIO_CHECK_FLOOR. Raises DecompressionLimitError.
+    """
+    limit = _output_limit(data, max_output, max_ratio)
+    if algorithm not in DECOMPRESS_CHUNKS:
+        if len(data) > max_output:
+            raise DecompressionLimitError(f"Payload of {len(data)} bytes exceeds {max_output}")
+        return bytes(data)
+
+    if algorithm == 'zstd':
+        # A frame that declares its size can be rejected before any work
+        declared = zstd.frame_content_size(data)
+        if declared > limit:
+            raise DecompressionLimitError(f"zstd frame declares {declared} bytes, limit is {limit}")
+
+    out = bytearray()
+    for chunk in DECOMPRESS_CHUNKS[algorithm](data, chunk_size):
+        out += chunk
+        if len(out) > limit:
+            reason = "size" if limit == max_output else f"ratio (> {max_ratio}x)"
+            raise DecompressionLimitError(
+                f"{algorithm} output passed {limit} bytes from a {len(data)}-byte input: {reason} limit")
+    return bytes(out)
+
+# ============================================
+# OUTPUT INTO CALLER BUFFERS
+# ============================================
+
+class BufferArena:
+    """Reusable output buffer: the stages of one message write into
+    consecutive regions (free() -> write -> commit(n)), reset() per message"""
+
+    def __init__(self, size=64 * 1024):
+        self.buffer = bytearray(size)
+        self._view = memoryview(self.buffer)
+        self.used = 0
+
+    def free(self):
+        """Writable view of the unused tail"""
+        return self._view[self.used:]
+
+    def commit(self, size):
+        """Claim `size` bytes just written at the tail, returns their view"""
+        region = self._view[self.used:self.used + size]
+        self.used += size
+        return region
+
+    def reset(self):
+        self.used = 0
+
+def _copy_into(out, pos, chunk, error=ValueError):
+    end = pos + len(chunk)
+    if end > len(out):
+        raise error(f"Output buffer too small ({len(out)} bytes)")
+    out[pos:end] = chunk
+    return end
+
+def _read_into(reader, out, error):
+    """Drain a zstandard stream_reader straight into out, returns bytes written"""
+    pos = 0
+    while True:
+        n = reader.readinto(out[pos:])
+        if n == 0:
+            return pos
+        pos += n
+        if pos == len(out) and reader.read(1):
+            raise error(f"Output buffer too small ({len(out)} bytes)")
+
+def compress_data_into(data, dst, algorithm='zlib'):
+    """compress_data writing into dst (bytearray, memoryview, arena.free()), returns bytes written
+
+    zstd streams straight into dst; zlib and lz4 copy their output once.
+    """
+    out = memoryview(dst).cast('B')
+    if algorithm == 'zstd' and HAS_ZSTD:
+        size = len(memoryview(data).cast('B'))
+        with zstd.ZstdCompressor(level=3).stream_reader(data, size=size) as reader:
+            return _read_into(reader, out, ValueError)
+    elif algorithm == 'zlib':
+        c = zlib.compressobj(9)
+        return _copy_into(out, _copy_into(out, 0, c.compress(data)), c.flush())
+    elif algorithm == 'lz4' and HAS_LZ4:
+        return _copy_into(out, 0, lz4.compress(data))
+    else:
+        return _copy_into(out, 0, memoryview(data).cast('B'))
+
+def decompress_data_into(data, dst, algorithm='zlib'):
+    """decompress_data writing into dst, returns bytes written
+
+    Bounded by the size of dst: output past it raises DecompressionLimitError.
+    """
+    out = memoryview(dst).cast('B')
+    if algorithm == 'zstd' and HAS_ZSTD:
+        declared = zstd.frame_content_size(data)
+        if declared > len(out):
+            raise DecompressionLimitError(f"zstd frame declares {declared} bytes, buffer holds {len(out)}")
+        with zstd.ZstdDecompressor().stream_reader(data) as reader:
+            pos = _read_into(reader, out, DecompressionLimitError)
+        if declared >= 0 and pos != declared:
+            raise zstd.ZstdError(f"Truncated zstd frame: {pos} of {declared} bytes")
+        return pos
+    elif algorithm == 'zlib':
+        # One output allocation, capped one byte past the buffer to detect overflow
+        d = zlib.decompressobj()
+        chunk = d.decompress(data, len(out) + 1)
+        pos = _copy_into(out, 0, chunk, DecompressionLimitError)
+        if not d.eof:
+            raise zlib.error("Truncated zlib stream")
+        return pos
+    elif algorithm == 'lz4' and HAS_LZ4:
+        declared = lz4.get_frame_info(data)['content_size']
+        if declared > len(out):
+            raise DecompressionLimitError(f"lz4 frame declares {declared} bytes, buffer holds {len(out)}")
+        if declared:
+            return _copy_into(out, 0, lz4.decompress(data), DecompressionLimitError)
+        pos = 0
+        for chunk in _lz4_chunks(data, CHUNK_SIZE):
+            pos = _copy_into(out, pos, chunk, DecompressionLimitError)
+        return pos
+    else:
+        return _copy_into(out, 0, memoryview(data).cast('B'), DecompressionLimitError)
+
+# ============================================
+# AUTHENTICATED ENCRYPTION (AES-256-GCM)
+# ============================================
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+SEAL_OVERHEAD = NONCE_SIZE + TAG_SIZE
+
+@instrumented('seal', 'aes-256-gcm', payload='plaintext')
+def seal_message(key, plaintext, associated_data=b''):
+    """Encrypt and authenticate with AES-256-GCM -> nonce || ciphertext || tag"""
+    if not HAS_AESGCM:
+        raise RuntimeError("AES-GCM needs the cryptography package (pip install cryptography)")
+    nonce = os.urandom(NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, plaintext, associated_data)
+
+@instrumented('open', 'aes-256-gcm', payload='sealed')
+def open_message(key, sealed, associated_data=b''):
+    """Inverse of seal_message (raises if the tag does not verify)"""
+    if not HAS_AESGCM:
+        raise RuntimeError("AES-GCM needs the cryptography package (pip install cryptography)")
+    return AESGCM(key).decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], associated_data)
+
+def seal_message_into(key, plaintext, dst, associated_data=b''):
+    """seal_message writing nonce || ciphertext || tag into dst, returns bytes written"""
+    if not HAS_AESGCM:
+        raise RuntimeError("AES-GCM needs the cryptography package (pip install cryptography)")
+    out = memoryview(dst).cast('B')
+    size = SEAL_OVERHEAD + len(memoryview(plaintext).cast('B'))
+    if size > len(out):
+        raise ValueError(f"Output buffer too small ({len(out)} bytes, need {size})")
+    nonce = os.urandom(NONCE_SIZE)
+    out[:NONCE_SIZE] = nonce
+    aead = AESGCM(key)
+    if hasattr(aead, 'encrypt_into'):
+        aead.encrypt_into(nonce, plaintext, associated_data, out[NONCE_SIZE:size])
+    else:
+        # cryptography < 45 has no encrypt_into: one copy
+        out[NONCE_SIZE:size] = aead.encrypt(nonce, plaintext, associated_data)
+    return size
+
+def open_message_into(key, sealed, dst, associated_data=b''):
+    """open_message writing the plaintext into dst, returns bytes written"""
+    if not HAS_AESGCM:
+        raise RuntimeError("AES-GCM needs the cryptography package (pip install cryptography)")
+    sealed = memoryview(sealed).cast('B')
+    out = memoryview(dst).cast('B')
+    size = len(sealed) - SEAL_OVERHEAD
+    if size > len(out):
+        raise ValueError(f"Output buffer too small ({len(out)} bytes, need {size})")
+    aead = AESGCM(key)
+    if hasattr(aead, 'decrypt_into'):
+        aead.decrypt_into(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], associated_data, out[:size])
+    else:
+        out[:size] = aead.decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], associated_data)
+    return size
 
 # ============================================
 # PQC OPERATIONS (using liboqs)
 # ============================================
 
 class PQCSimulator:
-    """Simulates PQC operations when liboqs is not available"""
-    def __init__(self, alg_name):
+    """Simulates PQC operations when neither liboqs nor NumPy is available
+    
+    Keys and ciphertexts are pseudo-random bytes of the real length, so they
+    compress like the real thing. With a calibration profile (see
+    `benchmark_pqc_compression.py --calibrate`) every operation also takes a
+    duration sampled from the recorded liboqs timings.
+    """
+    def __init__(self, alg_name, profile=None):
         self.alg_name = alg_name
         # Approximate sizes for common algorithms
         self.sizes = {
@@ -78,22 +347,47 @@ class PQCSimulator:
             'Kyber1024': {'pk': 1568, 'sk': 3168, 'ct': 1568},
             'Dilithium2': {'pk': 1312, 'sk': 2528, 'sig': 2420},
         }
+        self.timings = None
+        if profile:
+            entry = profile['kem'].get(alg_name) or profile['sig'].get(alg_name)
+            if entry:
+                self.timings = entry
+                self.sizes[alg_name] = {key: entry[key] for key in ('pk', 'sk', 'ct', 'sig') if key in entry}
+    
+    def _replay(self, op):
+        """Busy-wait for a sampled duration so callers' own timers see it"""
+        if self.timings and op in self.timings:
+            end = time.perf_counter() + random.choice(self.timings[op])
+            while time.perf_counter() < end:
+                pass
+    
+    def _shared_secret(self, ct):
+        # Derived from the ciphertext so decapsulation recovers the same secret
+        return hashlib.sha3_256(ct).digest()
     
     def keypair(self):
+        self._replay('keygen')
         sizes = self.sizes.get(self.alg_name, {'pk': 1000, 'sk': 2000})
-        return bytes(sizes['pk']), bytes(sizes['sk'])
+        return os.urandom(sizes['pk']), os.urandom(sizes['sk'])
     
     def encap_secret(self, pk):
+        self._replay('encap')
         sizes = self.sizes.get(self.alg_name, {'ct': 1000})
-        return bytes(sizes['ct']), bytes(32)
+        ct = os.urandom(sizes['ct'])
+        return ct, self._shared_secret(ct)
     
     def decap_secret(self, sk, ct):
-        return bytes(32)
+        self._replay('decap')
+        return self._shared_secret(ct)
 
 def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     """
     Complete workflow: Compress → Encrypt (PQC) → Decrypt → Decompress
+    
+    With TRACER enabled every stage is recorded as a span nested in one
+    'message' span.
     """
+    message_start = now_us()
     print(f"\n{'='*70}")
     print(f"PQC + COMPRESSION WORKFLOW")
     print(f"Algorithm: {algorithm}, Compression: {compression}")
@@ -109,9 +403,10 @@ def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     
     # Step 1: Compression
     print(f"\n[2] Compression ({compression})")
-    start = time.time()
-    compressed_message = compress_data(message, compression)
-    compression_time = time.time() - start
+    with TRACER.span('compress', codec=compression, size=len(message)):
+        start = time.time()
+        compressed_message = compress_data(message, compression)
+        compression_time = time.time() - start
     
     compression_ratio = len(message) / len(compressed_message) if len(compressed_message) > 0 else 1
     print(f"    Compressed size: {len(compressed_message)} bytes")
@@ -124,16 +419,19 @@ def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     # Step 2: PQC Setup
     print(f"\n[3] PQC Key Generation ({algorithm})")
     
-    if HAS_OQS:
-        kem = oqs.KeyEncapsulation(algorithm)
-        start = time.time()
-        public_key = kem.generate_keypair()
-        keygen_time = time.time() - start
+    if HAS_OQS or HAS_MLKEM:
+        kem = oqs.KeyEncapsulation(algorithm) if HAS_OQS else mlkem_numpy.KeyEncapsulation(algorithm)
+        kem = InstrumentedKEM(kem, algorithm)
+        with TRACER.span('keygen', kem=algorithm):
+            start = time.time()
+            public_key = kem.generate_keypair()
+            keygen_time = time.time() - start
     else:
-        kem = PQCSimulator(algorithm)
-        start = time.time()
-        public_key, _ = kem.keypair()
-        keygen_time = time.time() - start
+        kem = InstrumentedKEM(PQCSimulator(algorithm, load_profile()), algorithm)
+        with TRACER.span('keygen', kem=algorithm):
+            start = time.time()
+            public_key, _ = kem.keypair()
+            keygen_time = time.time() - start
     
     print(f"    Public key size: {len(public_key)} bytes")
     print(f"    Key generation time: {keygen_time*1000:.2f} ms")
@@ -142,14 +440,12 @@ def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     
     # Step 3: PQC Encapsulation (simulate encryption)
     print(f"\n[4] PQC Encapsulation")
-    start = time.time()
-    
-    if HAS_OQS:
-        ciphertext, shared_secret = kem.encap_secret(public_key)
-    else:
+    with TRACER.span('encap', kem=algorithm):
+        start = time.time()
+        
         ciphertext, shared_secret = kem.encap_secret(public_key)
-    
-    encap_time = time.time() - start
+        
+        encap_time = time.time() - start
     
     print(f"    Ciphertext size: {len(ciphertext)} bytes")
     print(f"    Shared secret size: {len(shared_secret)} bytes")
@@ -157,10 +453,21 @@ def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     results['ciphertext_size'] = len(ciphertext)
     results['encap_time'] = encap_time
     
+    # AEAD: the compressed payload sealed with the shared secret
+    sealed_message = compressed_message
+    if HAS_AESGCM:
+        with TRACER.span('seal', aead='aes-256-gcm', size=len(compressed_message)):
+            start = time.time()
+            sealed_message = seal_message(shared_secret, compressed_message)
+            results['seal_time'] = time.time() - start
+        print(f"    Sealed payload (AES-256-GCM): {len(sealed_message)} bytes, {results['seal_time']*1000:.2f} ms")
+    
     # Calculate total transmission size
-    total_size = len(compressed_message) + len(ciphertext)
+    total_size = len(sealed_message) + len(ciphertext)
     print(f"\n[5] Total Transmission")
     print(f"    Compressed message: {len(compressed_message)} bytes")
+    if HAS_AESGCM:
+        print(f"    Sealed message: {len(sealed_message)} bytes (+{SEAL_OVERHEAD} nonce + tag)")
     print(f"    PQC ciphertext: {len(ciphertext)} bytes")
     print(f"    Total: {total_size} bytes")
     print(f"    Overhead vs original: {((total_size/len(message) - 1) * 100):.1f}%")
@@ -168,24 +475,34 @@ def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     
     # Step 4: PQC Decapsulation (simulate decryption)
     print(f"\n[6] PQC Decapsulation")
-    start = time.time()
-    
-    if HAS_OQS:
-        recovered_secret = kem.decap_secret(ciphertext)
-    else:
-        recovered_secret = kem.decap_secret(None, ciphertext)
-    
-    decap_time = time.time() - start
+    with TRACER.span('decap', kem=algorithm):
+        start = time.time()
+        
+        if HAS_OQS or HAS_MLKEM:
+            recovered_secret = kem.decap_secret(ciphertext)
+        else:
+            recovered_secret = kem.decap_secret(None, ciphertext)
+        
+        decap_time = time.time() - start
     
     print(f"    Decapsulation time: {decap_time*1000:.2f} ms")
     print(f"    Secret match: {recovered_secret == shared_secret}")
     results['decap_time'] = decap_time
     
+    received_message = sealed_message
+    if HAS_AESGCM:
+        with TRACER.span('open', aead='aes-256-gcm', size=len(sealed_message)):
+            start = time.time()
+            received_message = open_message(recovered_secret, sealed_message)
+            results['open_time'] = time.time() - start
+        print(f"    Opened payload (AES-256-GCM): {results['open_time']*1000:.2f} ms")
+    
     # Step 5: Decompression
     print(f"\n[7] Decompression")
-    start = time.time()
-    decompressed_message = decompress_data(compressed_message, compression)
-    decompression_time = time.time() - start
+    with TRACER.span('decompress', codec=compression, size=len(received_message)):
+        start = time.time()
+        decompressed_message = decompress_bounded(received_message, compression)
+        decompression_time = time.time() - start
     
     print(f"    Decompressed size: {len(decompressed_message)} bytes")
     print(f"    Time: {decompression_time*1000:.2f} ms")
@@ -201,6 +518,8 @@ def pqc_encrypt_decrypt(message, algorithm='Kyber768', compression='zlib'):
     print(f"Data reduction: {((1 - len(compressed_message)/len(message)) * 100):.1f}%")
     print(f"Final transmission: {total_size} bytes (vs {len(message)} original)")
     
+    TRACER.add_span('message', message_start, now_us(), algorithm=algorithm, compression=compression,
+                    size=len(message))
     return results
 
 # ============================================
@@ -257,6 +576,14 @@ def compare_approaches():
 # ============================================
 
 if __name__ == "__main__":
+    if not HAS_OQS:
+        print("WARNING: liboqs C library not found!")
+        print("The Python package is installed but needs the system library.")
+        if HAS_MLKEM:
+            print("Running with the NumPy ML-KEM fallback...\n")
+        else:
+            print("Running in simulation mode...\n")
+    
     print("""
 ╔══════════════════════════════════════════════════════════════════════╗
 ║   PQC + COMPRESSION DEMONSTRATION FOR IoT                            ║
@@ -264,11 +591,14 @@ if __name__ == "__main__":
 ╚══════════════════════════════════════════════════════════════════════╝
 """)
     
+    TRACER.enable('--trace' in sys.argv)
+    
     # Check dependencies
     print("Checking dependencies...")
-    print(f"  liboqs-python: {'✓ Installed' if HAS_OQS else '✗ Not installed (using simulator)'}")
+    print(f"  liboqs-python: {'✓ Installed' if HAS_OQS else '✗ Not installed (using NumPy ML-KEM)' if HAS_MLKEM else '✗ Not installed (using simulator)'}")
     print(f"  lz4:           {'✓ Installed' if HAS_LZ4 else '✗ Not installed'}")
     print(f"  zstandard:     {'✓ Installed' if HAS_ZSTD else '✗ Not installed'}")
+    print(f"  cryptography:  {'✓ Installed' if HAS_AESGCM else '✗ Not installed'}")
     print()
     
     # Simple example
@@ -279,6 +609,12 @@ if __name__ == "__main__":
     print("\n\n")
     compare_approaches()
     
+    if '--trace' in sys.argv:
+        following = sys.argv[sys.argv.index('--trace') + 1:sys.argv.index('--trace') + 2]
+        trace_file = following[0] if following and not following[0].startswith('--') else TRACE_FILE
+        print(f"\n✓ {TRACER.export(trace_file)} trace events written to {trace_file} "
+              f"(open in chrome://tracing or ui.perfetto.dev)")
+    
     print("\n" + "="*70)
     print("Demonstration complete!")
     print("="*70)
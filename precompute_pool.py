@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+KEM Precompute Pool
+Keypairs and (ciphertext, shared secret) pairs for known public keys are
+generated by a background thread and kept between a low and a high
+watermark, so a rekey on the request path is a pop instead of a keygen and
+an encapsulation.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+from benchmark_pqc_compression import create_kem, kem_backend, latency_stats, print_header
+
+# ============================================
+# PRECOMPUTE POOL
+# ============================================
+
+class PrecomputePool:
+    """Background-refilled stock of keypairs and per-peer encapsulations
+
+    A refill starts when a stock drops below `low` and tops it up to `high`.
+    An empty stock is not an error: the caller computes inline (a miss) and
+    the worker is woken up.
+    """
+
+    def __init__(self, algorithm='Kyber768', low=8, high=32):
+        if create_kem(algorithm) is None:
+            raise RuntimeError("The precompute pool needs a KEM backend (liboqs or mlkem_numpy)")
+        self.algorithm = algorithm
+        self.low = low
+        self.high = high
+        self._keypairs = deque()
+        self._encapsulations = {}
+        # KEM objects are not shared between threads
+        self._inline_kem = create_kem(algorithm)
+        self._worker_kem = create_kem(algorithm)
+        self._wakeup = threading.Condition()
+        self._stopped = False
+        self._error = None
+        self.hits = 0
+        self.misses = 0
+
+        self._thread = threading.Thread(target=self._refill_loop, name='kem-precompute', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stocks(self):
+        # Snapshot: request threads register peers while the worker scans
+        return list(self._encapsulations.values())
+
+    def full(self):
+        """Every stock is at the high watermark"""
+        return len(self._keypairs) >= self.high and all(
+            len(stock) >= self.high for stock in self._stocks())
+
+    def _needs_refill(self):
+        return (len(self._keypairs) < self.low or
+                any(len(stock) < self.low for stock in self._stocks()))
+
+    def _check_worker(self):
+        if self._error is not None:
+            raise RuntimeError("KEM precompute worker died") from self._error
+
+    def _refill_loop(self):
+        try:
+            self._refill()
+        except BaseException as e:
+            # Kept for the request threads: a dead worker must not look like a cold pool
+            self._error = e
+
+    def _refill(self):
+        while True:
+            with self._wakeup:
+                while not self._stopped and not self._needs_refill():
+                    self._wakeup.wait()
+                if self._stopped:
+                    return
+
+            # One item per pass so a stock that runs dry is served quickly
+            while not self._stopped:
+                if len(self._keypairs) < self.high:
+                    kem = create_kem(self.algorithm)
+                    self._keypairs.append((kem.generate_keypair(), kem))
+                for public_key, stock in list(self._encapsulations.items()):
+                    if len(stock) < self.high:
+                        stock.append(self._worker_kem.encap_secret(public_key))
+                if self.full():
+                    break
+                # Hand the GIL back between items so request threads are not held up
+                time.sleep(0)
+
+    def _notify(self):
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def register_peer(self, public_key):
+        """Start precomputing encapsulations to a known public key"""
+        with self._wakeup:
+            if public_key not in self._encapsulations:
+                self._encapsulations[public_key] = deque()
+                self._wakeup.notify()
+
+    def keypair(self):
+        """(public key, KEM object holding the secret key)"""
+        self._check_worker()
+        try:
+            item = self._keypairs.popleft()
+            self._count(hit=True)
+        except IndexError:
+            self._count(hit=False)
+            kem = create_kem(self.algorithm)
+            item = (kem.generate_keypair(), kem)
+        if len(self._keypairs) < self.low:
+            self._notify()
+        return item
+
+    def encapsulation(self, public_key):
+        """(ciphertext, shared secret) for a public key (registered on first use)"""
+        self._check_worker()
+        stock = self._encapsulations.get(public_key)
+        try:
+            item = stock.popleft()
+            self._count(hit=True)
+        except (AttributeError, IndexError):
+            self._count(hit=False)
+            item = self._inline_kem.encap_secret(public_key)
+        if stock is None:
+            self.register_peer(public_key)
+        elif len(stock) < self.low:
+            self._notify()
+        return item
+
+    def _count(self, hit):
+        # Request threads update the counters concurrently: += is not atomic
+        with self._wakeup:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def hit_rate(self):
+        with self._wakeup:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0
+
+    def close(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        self._thread.join()
+        self._check_worker()
+
+# ============================================
+# BENCHMARK: HANDSHAKE LATENCY UNDER LOAD
+# ============================================
+
+def rekey(kem_source, gateway_kem, gateway_pk):
+    """Device rekey: fresh keypair + encapsulation to the gateway, decapsulated by the gateway"""
+    if isinstance(kem_source, PrecomputePool):
+        public_key, _ = kem_source.keypair()
+        ciphertext, shared_secret = kem_source.encapsulation(gateway_pk)
+    else:
+        public_key = create_kem(kem_source).generate_keypair()
+        ciphertext, shared_secret = create_kem(kem_source).encap_secret(gateway_pk)
+    return gateway_kem.decap_secret(ciphertext) == shared_secret
+
+def benchmark_pool(algorithm='Kyber768', rates=(50, 100, 200), handshakes=400, low=8, high=32, seed=1):
+    """p50/p99 rekey latency (queueing included) for Poisson arrivals, inline vs pooled"""
+    gateway_kem = create_kem(algorithm)
+    gateway_pk = gateway_kem.generate_keypair()
+    results = []
+
+    for rate in rates:
+        for mode in ('inline', 'pool'):
+            rng = random.Random(seed)
+            arrivals = []
+            t = 0.0
+            for _ in range(handshakes):
+                t += rng.expovariate(rate)
+                arrivals.append(t)
+
+            pool = None
+            if mode == 'pool':
+                pool = PrecomputePool(algorithm, low, high)
+                pool.register_peer(gateway_pk)
+                # Warm start: a gateway pool fills while the service starts up
+                while not pool.full():
+                    # A dead refill worker would never fill it
+                    pool._check_worker()
+                    time.sleep(0.01)
+
+            latencies = []
+            ok = True
+            start = time.perf_counter()
+            for arrival in arrivals:
+                delay = start + arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                ok = rekey(pool if pool else algorithm, gateway_kem, gateway_pk) and ok
+                # Open loop: latency counts from the scheduled arrival, so queueing shows up
+                latencies.append(time.perf_counter() - (start + arrival))
+            elapsed = time.perf_counter() - start
+
+            stats = latency_stats(latencies)
+            results.append({
+                'algorithm': algorithm,
+                'backend': kem_backend(),
+                'mode': mode,
+                'rate': rate,
+                'handshakes': handshakes,
+                'achieved_rate': handshakes / elapsed,
+                'latency_mean': stats['mean'],
+                'latency_p50': stats['p50'],
+                'latency_p99': stats['p99'],
+                'hit_rate': pool.hit_rate() if pool else 0,
+                'success': ok
+            })
+            if pool:
+                pool.close()
+    return results
+
+def print_pool_results(results):
+    """Print latency table"""
+    print(f"{'Rate/s':>7} {'Mode':<7} {'Achieved/s':>11} {'Mean (ms)':>10} {'p50 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'Pool hits':>10} {'OK':>3}")
+    print("-" * 75)
+    for r in results:
+        print(f"{r['rate']:>7} {r['mode']:<7} {r['achieved_rate']:>11.1f} {r['latency_mean']*1000:>10.2f} "
+              f"{r['latency_p50']*1000:>9.2f} {r['latency_p99']*1000:>9.2f} "
+              f"{r['hit_rate']*100:>9.1f}% {'✓' if r['success'] else '✗':>3}")
+    if results:
+        print(f"\n{results[0]['algorithm']} ({results[0]['backend']}); rekey = keypair + encapsulation "
+              f"+ gateway decapsulation; Poisson arrivals, latency includes queueing")
+
+if __name__ == "__main__":
+    handshakes = 150 if '--quick' in sys.argv else 400
+    print_header("KEM PRECOMPUTE POOL")
+    print_pool_results(benchmark_pool(handshakes=handshakes))
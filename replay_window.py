@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Sliding-Window Anti-Replay
+Per-device message counters checked against a bitmap window (RFC 6479
+style): every device owns a few 64-bit words in one flat array('Q') plus
+its highest accepted counter, so a million devices fit in tens of MB and
+each check is O(1) with no per-device Python objects.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+from benchmark_pqc_compression import print_header
+
+WORD_BITS = 64
+DEFAULT_WORDS = 2   # window of (words - 1) * 64 = 64 counters behind the newest
+
+# ============================================
+# REPLAY WINDOW TABLE
+# ============================================
+
+class ReplayWindow:
+    """Anti-replay state for `capacity` devices addressed by slot 0..capacity-1
+
+    The bitmap of a device is a ring of `words` 64-bit words indexed by
+    counter >> 6: moving the window forward only clears the words it skips,
+    never shifts the bitmap. Counters up to (words - 1) * 64 behind the
+    newest one are still accepted once (reordering on the radio link).
+    """
+
+    def __init__(self, capacity, words=DEFAULT_WORDS):
+        if words < 2:
+            raise ValueError("The ring needs at least 2 words")
+        self.capacity = capacity
+        self.words = words
+        self.window = (words - 1) * WORD_BITS
+        self._bitmap = array('Q', bytes(8 * capacity * words))
+        # Highest accepted counter + 1 (0: nothing received yet)
+        self._next = array('Q', bytes(8 * capacity))
+        self.accepted = 0
+        self.rejected = 0
+
+    def check(self, slot, counter):
+        """Accept (True) a fresh counter and record it, reject (False) a replay or a too-old one"""
+        words = self.words
+        base = slot * words
+        newest = self._next[slot] - 1
+
+        if counter > newest:
+            # Clear the words skipped by the window moving forward
+            block = counter >> 6
+            first = (newest >> 6) + 1 if newest >= 0 else block
+            for b in range(max(first, block - words + 1), block + 1):
+                self._bitmap[base + b % words] = 0
+            self._next[slot] = counter + 1
+        elif newest - counter >= self.window:
+            self.rejected += 1
+            return False
+
+        index = base + (counter >> 6) % words
+        bit = 1 << (counter & 63)
+        word = self._bitmap[index]
+        if word & bit:
+            self.rejected += 1
+            return False
+        self._bitmap[index] = word | bit
+        self.accepted += 1
+        return True
+
+    def reset(self, slot):
+        """Forget a device (new session key, counters restart)"""
+        self._next[slot] = 0
+        for i in range(slot * self.words, (slot + 1) * self.words):
+            self._bitmap[i] = 0
+
+    def memory_bytes(self):
+        return self._bitmap.itemsize * len(self._bitmap) + self._next.itemsize * len(self._next)
+
+class DictReplayWindow:
+    """Baseline: device id -> set of recent counters (same acceptance rule)"""
+
+    def __init__(self, window=(DEFAULT_WORDS - 1) * WORD_BITS):
+        self.window = window
+        self._seen = {}
+
+    def check(self, device, counter):
+        state = self._seen.get(device)
+        if state is None:
+            state = self._seen[device] = [counter, set()]
+        newest, seen = state
+        if counter > newest:
+            state[0] = newest = counter
+            seen.difference_update([c for c in seen if newest - c >= self.window])
+        elif newest - counter >= self.window:
+            return False
+        if counter in seen:
+            return False
+        seen.add(counter)
+        return True
+
+# ============================================
+# BENCHMARK: MEMORY PER DEVICE AND CHECKS/SEC
+# ============================================
+
+def traffic(devices, messages, seed=1, replay_rate=0.01, late_rate=0.02, loss_rate=0.05):
+    """Message stream of (slot, counter): lost counters, late deliveries and replays"""
+    rng = random.Random(seed)
+    counters = array('Q', bytes(8 * devices))
+    stream = []
+    for _ in range(messages):
+        slot = rng.randrange(devices)
+        draw = rng.random()
+        if stream and draw < replay_rate:
+            # Attacker re-sends a captured message
+            stream.append(stream[rng.randrange(len(stream))])
+        elif draw < replay_rate + late_rate:
+            # Delivered late: may be a lost counter, a duplicate or beyond the window
+            stream.append((slot, max(0, counters[slot] - rng.randrange(1, 100))))
+        else:
+            counters[slot] += 2 if rng.random() < loss_rate else 1
+            stream.append((slot, counters[slot]))
+    return stream
+
+def measure_memory(factory, devices, stream):
+    """Heap bytes held by a detector after processing the stream"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    detector = factory(devices)
+    for slot, counter in stream:
+        detector.check(slot, counter)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return detector, after - before
+
+def benchmark_replay(fleet_sizes=(10_000, 100_000, 1_000_000), messages=1_000_000, dict_limit=100_000):
+    """Memory per device and checks/sec, array-backed window vs dict of sets"""
+    detectors = {
+        'array': lambda n: ReplayWindow(n),
+        'dict': lambda n: DictReplayWindow(),
+    }
+    results = []
+
+    for devices in fleet_sizes:
+        # Enough traffic that every device has a live window
+        stream = traffic(devices, max(messages, devices * 2))
+        for name, factory in detectors.items():
+            if name == 'dict' and devices > dict_limit:
+                continue
+            detector, memory = measure_memory(factory, devices, stream)
+
+            # Timed on a fresh detector: tracemalloc slows down the pass above
+            detector = factory(devices)
+            check = detector.check
+            start = time.perf_counter()
+            verdicts = [check(slot, counter) for slot, counter in stream]
+            elapsed = time.perf_counter() - start
+
+            results.append({
+                'detector': name,
+                'devices': devices,
+                'messages': len(stream),
+                'accepted': sum(verdicts),
+                'rejected': len(verdicts) - sum(verdicts),
+                'memory_bytes': memory,
+                'bytes_per_device': memory / devices,
+                'checks_per_sec': len(stream) / elapsed,
+                'check_ns': elapsed / len(stream) * 1e9
+            })
+
+    # Both detectors must agree on every verdict count
+    by_size = {}
+    for r in results:
+        by_size.setdefault(r['devices'], set()).add(r['accepted'])
+    for r in results:
+        r['success'] = len(by_size[r['devices']]) == 1
+    return results
+
+def print_replay_results(results):
+    """Print anti-replay benchmark table"""
+    print(f"{'Detector':<9} {'Devices':>10} {'Messages':>10} {'Rejected':>9} {'Memory':>10} "
+          f"{'B/device':>9} {'Checks/s':>11} {'ns/check':>9} {'OK':>3}")
+    print("-" * 90)
+    for r in results:
+        print(f"{r['detector']:<9} {r['devices']:>10,} {r['messages']:>10,} {r['rejected']:>9,} "
+              f"{r['memory_bytes']/1024/1024:>7.1f} MB {r['bytes_per_device']:>9.1f} "
+              f"{r['checks_per_sec']:>11,.0f} {r['check_ns']:>9.0f} {'✓' if r['success'] else '✗':>3}")
+    print(f"\nWindow: {(DEFAULT_WORDS - 1) * WORD_BITS} counters; OK = same verdicts as the dict-of-sets baseline")
+
+if __name__ == "__main__":
+    fleet_sizes = (10_000, 100_000) if '--quick' in sys.argv else (10_000, 100_000, 1_000_000)
+    print_header("SLIDING-WINDOW ANTI-REPLAY")
+    print_replay_results(benchmark_replay(fleet_sizes))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Crash-Safe Result Log
+Append-only NDJSON log of finished benchmark cells. Each record is flushed
+as soon as the cell completes and fsync'ed in batches, so a sweep that is
+killed loses at most the cell in progress; --resume replays the log and
+skips every cell already recorded.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import json
+import os
+import time
+
+LOG_FILE = 'benchmark_cells.ndjson'
+
+class ResultLog:
+    """NDJSON cell log: one {"key": ..., "result": ...} object per line
+
+    Records are flushed to the OS on every write (safe against a killed
+    process) and fsync'ed every `fsync_every` records or `fsync_interval`
+    seconds (bounded loss on power failure without one fsync per cell).
+    """
+
+    def __init__(self, filename=LOG_FILE, resume=False, fsync_every=16, fsync_interval=2.0):
+        self.filename = filename
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.done = load_log(filename) if resume else {}
+        self.resumed = 0
+
+        self._file = open(filename, 'a' if resume else 'w', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, key, result):
+        """Append one finished cell"""
+        self._file.write(json.dumps({'key': key, 'result': result}, default=str) + '\n')
+        self._file.flush()
+        self.done[key] = result
+        self._unsynced += 1
+        if (self._unsynced >= self.fsync_every or
+                time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def cell(self, key, measure):
+        """Result of a cell: replayed from the log if recorded, else measured and recorded"""
+        if key in self.done:
+            self.resumed += 1
+            return self.done[key]
+        result = measure()
+        self.record(key, result)
+        return result
+
+    def sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+def load_log(filename=LOG_FILE):
+    """Recorded cells (key -> result)
+
+    A corrupt line is skipped (the records after it are kept); a torn last
+    line from a crash is cut off.
+    """
+    done = {}
+    try:
+        with open(filename, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return done
+
+    skipped = 0
+    for line in content.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            # Drop the partial record so new appends start on a clean line
+            with open(filename, 'r+b') as f:
+                f.truncate(len(content) - len(line))
+            break
+        try:
+            record = json.loads(line)
+            done[record['key']] = record['result']
+        except (ValueError, KeyError, TypeError):
+            if line.strip():
+                skipped += 1
+    if skipped:
+        print(f"⚠ {filename}: skipped {skipped} corrupt record(s)")
+    return done
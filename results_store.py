@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+SQLite Results Store
+Every benchmark run is appended to one embedded database instead of
+overwriting benchmark_results.json, so runs from many hosts and commits can
+be queried together without loading everything into memory.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: python results_store.py [--import benchmark_results.json] [--db FILE]
+"""
+
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+
+from energy_model import recommend_configuration
+
+DB_FILE = 'benchmark_results.db'
+
+# Columns stored natively per table; any other result field goes to `extra` (JSON)
+TABLE_COLUMNS = {
+    'compression': ['dataset', 'algorithm', 'original_size', 'compressed_size', 'compression_time',
+                    'decompression_time', 'compression_ratio', 'throughput_mbps', 'success'],
+    'pqc': ['algorithm', 'backend', 'pk_size', 'sk_size', 'ct_size', 'keygen_time', 'encap_time',
+            'decap_time', 'simulated', 'success'],
+    'combined': ['dataset', 'pqc_algorithm', 'compression', 'sig_algorithm', 'original_size',
+                 'compressed_size', 'pqc_overhead', 'sig_overhead', 'total_transmission',
+                 'total_time', 'bandwidth_savings', 'success'],
+    'entropy_coders': ['dataset', 'coder', 'original_size', 'compressed_size', 'bits_per_byte',
+                       'encode_mbps', 'decode_mbps', 'success'],
+    'signatures': ['algorithm', 'backend', 'pk_size', 'sk_size', 'sig_size', 'keygen_time', 'sign_time',
+                   'verify_time', 'simulated', 'success'],
+    'energy': ['configuration', 'device', 'radio', 'tx_bytes', 'energy_per_message', 'battery_life_days'],
+    'link': ['configuration', 'link_profile', 'loss_rate', 'tx_bytes', 'airtime', 'latency',
+             'delivery_rate', 'goodput_bps'],
+}
+
+# Result sections stored as plain lists, one table each
+LIST_SECTIONS = ('pqc', 'entropy_coders', 'signatures', 'energy', 'link')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    host TEXT,
+    machine TEXT,
+    python TEXT,
+    commit_hash TEXT,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS compression (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    dataset TEXT, algorithm TEXT,
+    original_size INTEGER, compressed_size INTEGER,
+    compression_time REAL, decompression_time REAL,
+    compression_ratio REAL, throughput_mbps REAL, success INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS pqc (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    algorithm TEXT, backend TEXT,
+    pk_size INTEGER, sk_size INTEGER, ct_size INTEGER,
+    keygen_time REAL, encap_time REAL, decap_time REAL,
+    simulated INTEGER, success INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS combined (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    dataset TEXT, pqc_algorithm TEXT, compression TEXT, sig_algorithm TEXT,
+    original_size INTEGER, compressed_size INTEGER,
+    pqc_overhead INTEGER, sig_overhead INTEGER, total_transmission INTEGER,
+    total_time REAL, bandwidth_savings REAL, success INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS entropy_coders (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    dataset TEXT, coder TEXT,
+    original_size INTEGER, compressed_size INTEGER,
+    bits_per_byte REAL, encode_mbps REAL, decode_mbps REAL, success INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS signatures (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    algorithm TEXT, backend TEXT,
+    pk_size INTEGER, sk_size INTEGER, sig_size INTEGER,
+    keygen_time REAL, sign_time REAL, verify_time REAL,
+    simulated INTEGER, success INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS energy (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    configuration TEXT, device TEXT, radio TEXT, tx_bytes INTEGER,
+    energy_per_message REAL, battery_life_days REAL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS link (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    configuration TEXT, link_profile TEXT, loss_rate REAL, tx_bytes INTEGER,
+    airtime REAL, latency REAL, delivery_rate REAL, goodput_bps REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_host ON runs(host);
+CREATE INDEX IF NOT EXISTS idx_runs_commit ON runs(commit_hash);
+CREATE INDEX IF NOT EXISTS idx_compression_dataset ON compression(dataset, algorithm);
+CREATE INDEX IF NOT EXISTS idx_compression_algorithm ON compression(algorithm);
+CREATE INDEX IF NOT EXISTS idx_compression_run ON compression(run_id);
+CREATE INDEX IF NOT EXISTS idx_pqc_algorithm ON pqc(algorithm);
+CREATE INDEX IF NOT EXISTS idx_pqc_run ON pqc(run_id);
+CREATE INDEX IF NOT EXISTS idx_combined_dataset ON combined(dataset, pqc_algorithm, compression);
+CREATE INDEX IF NOT EXISTS idx_combined_algorithm ON combined(pqc_algorithm, compression);
+CREATE INDEX IF NOT EXISTS idx_combined_run ON combined(run_id);
+CREATE INDEX IF NOT EXISTS idx_entropy_coders_run ON entropy_coders(run_id);
+CREATE INDEX IF NOT EXISTS idx_signatures_run ON signatures(run_id);
+CREATE INDEX IF NOT EXISTS idx_energy_run ON energy(run_id);
+CREATE INDEX IF NOT EXISTS idx_link_run ON link(run_id);
+"""
+
+# ============================================
+# CONNECTION AND RUNS
+# ============================================
+
+def connect(filename=DB_FILE):
+    """Open (and create if needed) the results database"""
+    conn = sqlite3.connect(filename)
+    conn.row_factory = sqlite3.Row
+    # WAL lets plotting read while a sweep is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def git_commit():
+    """Current commit of the working tree (None outside a git checkout)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def start_run(conn, label=None, commit=None, host=None):
+    """Register a run, returns its id"""
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (started_at, host, machine, python, commit_hash, label) VALUES (?, ?, ?, ?, ?, ?)",
+            (datetime.now().isoformat(timespec='seconds'), host or platform.node(), platform.machine(),
+             platform.python_version(), commit if commit is not None else git_commit(), label))
+    return cursor.lastrowid
+
+# ============================================
+# BULK INSERT
+# ============================================
+
+def _row(run_id, table, result):
+    columns = TABLE_COLUMNS[table]
+    extra = {k: v for k, v in result.items() if k not in columns}
+    return (run_id, *(result.get(c) for c in columns), json.dumps(extra, default=str) if extra else None)
+
+def insert_rows(conn, table, run_id, results):
+    """Bulk insert result dicts into one table (single transaction)"""
+    columns = ['run_id'] + TABLE_COLUMNS[table] + ['extra']
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    with conn:
+        conn.executemany(sql, (_row(run_id, table, r) for r in results))
+
+def store_results(all_results, filename=DB_FILE, label=None):
+    """Store a run_full_benchmark results dict as a new run, returns the run id
+
+    Combined rows keep the dataset recorded in each result (None for
+    results from before it was recorded).
+    """
+    conn = connect(filename)
+    try:
+        run_id = start_run(conn, label)
+        insert_rows(conn, 'compression', run_id,
+                    ({**r, 'dataset': dataset}
+                     for dataset, rows in all_results.get('compression', {}).items() for r in rows))
+        insert_rows(conn, 'combined', run_id,
+                    all_results.get('combined', []) + all_results.get('combined_authenticated', []))
+        for section in LIST_SECTIONS:
+            insert_rows(conn, section, run_id, all_results.get(section, []))
+        return run_id
+    finally:
+        conn.close()
+
+# ============================================
+# QUERY HELPERS
+# ============================================
+
+def _as_dict(row):
+    result = {k: row[k] for k in row.keys() if k not in ('extra', 'run_id')}
+    if row['extra']:
+        result.update(json.loads(row['extra']))
+    for flag in ('success', 'simulated'):
+        if result.get(flag) is not None:
+            result[flag] = bool(result[flag])
+    return {k: v for k, v in result.items() if v is not None}
+
+def latest_run(conn, host=None, commit=None):
+    """Id of the most recent run, optionally restricted to a host / commit"""
+    sql, params = "SELECT id FROM runs WHERE 1=1", []
+    if host:
+        sql += " AND host = ?"
+        params.append(host)
+    if commit:
+        sql += " AND commit_hash = ?"
+        params.append(commit)
+    row = conn.execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+    return row['id'] if row else None
+
+def query(conn, table, run_id=None, host=None, commit=None, **filters):
+    """Iterate over result dicts of one table, filtered by column values
+
+    Rows are streamed from the cursor, so large stores are never loaded whole.
+    Example: query(conn, 'compression', dataset='iot_medium', algorithm='zlib', host='pi4')
+    """
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+    sql = f"SELECT t.* FROM {table} t JOIN runs r ON r.id = t.run_id WHERE 1=1"
+    params = []
+    if run_id is not None:
+        sql += " AND t.run_id = ?"
+        params.append(run_id)
+    if host:
+        sql += " AND r.host = ?"
+        params.append(host)
+    if commit:
+        sql += " AND r.commit_hash = ?"
+        params.append(commit)
+    for column, value in filters.items():
+        if column not in TABLE_COLUMNS[table]:
+            raise ValueError(f"Unknown column for {table}: {column}")
+        sql += f" AND t.{column} = ?"
+        params.append(value)
+
+    for row in conn.execute(sql + " ORDER BY t.rowid", params):
+        yield _as_dict(row)
+
+def load_run(filename=DB_FILE, run_id=None, host=None, commit=None):
+    """One run in the nested layout of benchmark_results.json (for the plotting code)"""
+    conn = connect(filename)
+    try:
+        run_id = run_id or latest_run(conn, host, commit)
+        if run_id is None:
+            return {}
+
+        compression = {}
+        for r in query(conn, 'compression', run_id):
+            compression.setdefault(r.pop('dataset'), []).append(r)
+        combined = []
+        combined_authenticated = []
+        for r in query(conn, 'combined', run_id):
+            (combined_authenticated if 'sig_algorithm' in r else combined).append(r)
+
+        results = {'compression': compression, 'combined': combined}
+        if combined_authenticated:
+            results['combined_authenticated'] = combined_authenticated
+        for section in LIST_SECTIONS:
+            rows = list(query(conn, section, run_id))
+            # Runs stored before a section had its table simply lack it
+            if rows or section == 'pqc':
+                results[section] = rows
+        if results.get('energy'):
+            results['energy_recommendation'] = recommend_configuration(results['energy'])
+        return results
+    finally:
+        conn.close()
+
+def summarize(conn, table, group_by, metric):
+    """Mean / min / max of a metric grouped by columns, computed inside SQLite"""
+    columns = ', '.join(group_by)
+    return [dict(row) for row in conn.execute(
+        f"SELECT {columns}, COUNT(*) AS n, AVG({metric}) AS mean, MIN({metric}) AS min, "
+        f"MAX({metric}) AS max FROM {table} t JOIN runs r ON r.id = t.run_id "
+        f"GROUP BY {columns} ORDER BY {columns}")]
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    filename = args[args.index('--db') + 1] if '--db' in args else DB_FILE
+
+    if '--import' in args:
+        source = args[args.index('--import') + 1]
+        with open(source, 'r') as f:
+            run_id = store_results(json.load(f), filename, label=f"import:{source}")
+        print(f"✓ Imported {source} as run {run_id} into {filename}")
+
+    conn = connect(filename)
+    print(f"{'Run':>5} {'Started':<20} {'Host':<20} {'Commit':<10} {'Label'}")
+    print("-" * 80)
+    for row in conn.execute("SELECT * FROM runs ORDER BY id"):
+        print(f"{row['id']:>5} {row['started_at']:<20} {row['host'] or '-':<20} "
+              f"{row['commit_hash'] or '-':<10} {row['label'] or ''}")
+    conn.close()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Seekable Compressed Batch
+Compresses a batch of readings in small groups and appends a footer index,
+so a gateway can fetch one reading (by id) or a time range by decompressing
+only the blocks that hold it instead of the whole batch.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Container layout:
+    magic 'PSB1' | algorithm (1 B)
+    compressed blocks, back to back (readings concatenated inside a block)
+    footer (zlib): block table (offset, compressed size, first reading id)
+                   reading table (timestamp, end offset inside its block)
+    trailer: footer offset (4 B) | footer size (4 B) | block count (4 B) | reading count (4 B)
+"""
+
+import bisect
+import json
+import random
+import struct
+import sys
+import time
+import zlib
+
+from benchmark_pqc_compression import generate_iot_readings, print_header
+from pqc_compression_demo import HAS_LZ4, HAS_ZSTD, compress_data, decompress_data
+
+MAGIC = b'PSB1'
+HEADER = struct.Struct('>4sB')
+BLOCK_ENTRY = struct.Struct('>III')
+READING_ENTRY = struct.Struct('>II')
+TRAILER = struct.Struct('>IIII')
+DEFAULT_GROUP_SIZE = 32
+
+ALGORITHM_IDS = {'zlib': 1, 'lz4': 2, 'zstd': 3}
+ALGORITHM_NAMES = {v: k for k, v in ALGORITHM_IDS.items()}
+
+# ============================================
+# WRITER
+# ============================================
+
+def pack_batch(readings, algorithm='zlib', group_size=DEFAULT_GROUP_SIZE, timestamps=None):
+    """Compress readings in groups of `group_size`, returns the container bytes
+
+    timestamps default to the 'timestamp' field of each JSON reading.
+    """
+    if algorithm not in ALGORITHM_IDS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    if timestamps is None:
+        timestamps = [json.loads(r)['timestamp'] for r in readings]
+
+    out = bytearray(HEADER.pack(MAGIC, ALGORITHM_IDS[algorithm]))
+    block_table = bytearray()
+    reading_table = bytearray()
+
+    for first in range(0, len(readings), group_size):
+        group = readings[first:first + group_size]
+        end = 0
+        for reading, timestamp in zip(group, timestamps[first:first + group_size]):
+            end += len(reading)
+            reading_table += READING_ENTRY.pack(timestamp, end)
+        block = compress_data(b''.join(group), algorithm)
+        block_table += BLOCK_ENTRY.pack(len(out), len(block), first)
+        out += block
+
+    footer = zlib.compress(bytes(block_table + reading_table), 9)
+    block_count = len(block_table) // BLOCK_ENTRY.size
+    return bytes(out + footer + TRAILER.pack(len(out), len(footer), block_count, len(readings)))
+
+# ============================================
+# READER
+# ============================================
+
+class SeekableBatch:
+    """Random access to a pack_batch container; the footer is parsed once on open"""
+
+    def __init__(self, container):
+        self._data = memoryview(container)
+        magic, algorithm_id = HEADER.unpack_from(container)
+        if magic != MAGIC:
+            raise ValueError("Not a seekable batch container")
+        self.algorithm = ALGORITHM_NAMES[algorithm_id]
+
+        footer_offset, footer_size, block_count, reading_count = TRAILER.unpack_from(
+            container, len(container) - TRAILER.size)
+        footer = zlib.decompress(self._data[footer_offset:footer_offset + footer_size])
+        self.blocks = list(BLOCK_ENTRY.iter_unpack(footer[:block_count * BLOCK_ENTRY.size]))
+        entries = list(READING_ENTRY.iter_unpack(footer[block_count * BLOCK_ENTRY.size:]))
+        if len(entries) != reading_count:
+            raise ValueError(f"Index lists {len(entries)} readings, trailer says {reading_count}")
+
+        self.timestamps = [timestamp for timestamp, _ in entries]
+        self._ends = [end for _, end in entries]
+        self._first_ids = [first for _, _, first in self.blocks]
+        self._sorted = all(a <= b for a, b in zip(self.timestamps, self.timestamps[1:]))
+
+    def __len__(self):
+        return len(self._ends)
+
+    def _block(self, index):
+        offset, compressed_size, _ = self.blocks[index]
+        return decompress_data(self._data[offset:offset + compressed_size], self.algorithm)
+
+    def _slice(self, block, block_index, reading_id):
+        first = self._first_ids[block_index]
+        start = self._ends[reading_id - 1] if reading_id > first else 0
+        return bytes(block[start:self._ends[reading_id]])
+
+    def reading(self, reading_id):
+        """One reading by its position in the batch (decompresses one block)"""
+        if not 0 <= reading_id < len(self):
+            raise IndexError(f"Reading {reading_id} out of range")
+        block_index = bisect.bisect_right(self._first_ids, reading_id) - 1
+        return self._slice(self._block(block_index), block_index, reading_id)
+
+    def time_range(self, start, end):
+        """Readings with start <= timestamp <= end (decompresses only the blocks that hold them)"""
+        if self._sorted:
+            ids = range(bisect.bisect_left(self.timestamps, start),
+                        bisect.bisect_right(self.timestamps, end))
+        else:
+            ids = [i for i, t in enumerate(self.timestamps) if start <= t <= end]
+
+        readings = []
+        cached_index, cached_block = None, None
+        for reading_id in ids:
+            block_index = bisect.bisect_right(self._first_ids, reading_id) - 1
+            if block_index != cached_index:
+                cached_index, cached_block = block_index, self._block(block_index)
+            readings.append(self._slice(cached_block, block_index, reading_id))
+        return readings
+
+    def all_readings(self):
+        """Every reading, block by block"""
+        bounds = self._first_ids + [len(self)]
+        readings = []
+        for i in range(len(self.blocks)):
+            block = self._block(i)
+            readings.extend(self._slice(block, i, reading_id) for reading_id in range(bounds[i], bounds[i + 1]))
+        return readings
+
+# ============================================
+# BENCHMARK: POINT LOOKUP VS FULL DECOMPRESSION
+# ============================================
+
+def benchmark_seekable(count=10000, algorithms=None, group_sizes=(8, 32, 128), lookups=200, range_minutes=60):
+    """Lookup latency of the seekable container vs decompressing the whole batch"""
+    readings = generate_iot_readings(count)
+    algorithms = algorithms or ['zlib'] + (['lz4'] if HAS_LZ4 else []) + (['zstd'] if HAS_ZSTD else [])
+    rng = random.Random(42)
+    ids = [rng.randrange(count) for _ in range(lookups)]
+    results = []
+
+    for algorithm in algorithms:
+        # Baseline: the whole batch as one frame, newline-separated
+        whole = compress_data(b'\n'.join(readings), algorithm)
+        start = time.perf_counter()
+        for reading_id in ids[:20]:
+            found = decompress_data(whole, algorithm).split(b'\n')[reading_id]
+        full_time = (time.perf_counter() - start) / 20
+
+        for group_size in group_sizes:
+            container = pack_batch(readings, algorithm, group_size)
+            batch = SeekableBatch(container)
+
+            start = time.perf_counter()
+            found = [batch.reading(reading_id) for reading_id in ids]
+            lookup_time = (time.perf_counter() - start) / lookups
+
+            first = json.loads(readings[count // 2])['timestamp']
+            start = time.perf_counter()
+            window = batch.time_range(first, first + range_minutes * 60 - 1)
+            range_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            SeekableBatch(container)
+            open_time = time.perf_counter() - start
+
+            results.append({
+                'algorithm': algorithm,
+                'group_size': group_size,
+                'readings': count,
+                'original_size': sum(len(r) for r in readings),
+                'container_size': len(container),
+                'single_frame_size': len(whole),
+                'size_overhead': (len(container) / len(whole) - 1) * 100,
+                'open_time': open_time,
+                'lookup_time': lookup_time,
+                'range_time': range_time,
+                'range_readings': len(window),
+                'full_decompress_time': full_time,
+                'speedup': full_time / lookup_time,
+                'success': (found == [readings[i] for i in ids] and
+                            window == readings[count // 2:count // 2 + range_minutes] and
+                            batch.all_readings() == readings)
+            })
+    return results
+
+def print_seekable_results(results):
+    """Print lookup latency table"""
+    print(f"{'Codec':<6} {'Group':>6} {'Size':>10} {'Overhead':>9} {'Open ms':>8} {'Lookup µs':>10} "
+          f"{'Range ms':>9} {'Full ms':>8} {'Speedup':>8} {'OK':>3}")
+    print("-" * 86)
+    for r in results:
+        print(f"{r['algorithm']:<6} {r['group_size']:>6} {r['container_size']:>10,} {r['size_overhead']:>8.1f}% "
+              f"{r['open_time']*1000:>8.2f} {r['lookup_time']*1e6:>10.1f} {r['range_time']*1000:>9.2f} "
+              f"{r['full_decompress_time']*1000:>8.2f} {r['speedup']:>7.0f}x {'✓' if r['success'] else '✗':>3}")
+    if results:
+        r = results[0]
+        print(f"\n{r['readings']:,} readings; overhead vs one compressed frame of the batch; "
+              f"range = {r['range_readings']} readings; full = decompress whole batch + split")
+
+if __name__ == "__main__":
+    count = 2000 if '--quick' in sys.argv else 10000
+    print_header("SEEKABLE COMPRESSED BATCH")
+    print_seekable_results(benchmark_seekable(count))
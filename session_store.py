@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Compact Gateway Session Store
+Per-device session state (Kyber-derived key, message counters, codec) kept
+as fixed-size records in one bytearray instead of one dict per device, with
+CLOCK eviction and an optional mmap-backed spill file for evicted sessions.
+For IoT PQC Project - Abdessamad JAOUAD
+"""
+
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import namedtuple
+
+from benchmark_pqc_compression import latency_stats, print_header
+
+# device id | session key | tx counter | rx counter | established at | codec id
+RECORD = struct.Struct('<Q32sQQdB')
+TX_OFFSET = struct.calcsize('<Q32s')
+RX_OFFSET = TX_OFFSET + 8
+COUNTER = struct.Struct('<Q')
+
+CODEC_IDS = {'none': 0, 'zlib': 1, 'lz4': 2, 'zstd': 3}
+
+Session = namedtuple('Session', 'device_id key tx_counter rx_counter established codec')
+
+# ============================================
+# MMAP SPILL FILE
+# ============================================
+
+class SpillFile:
+    """Evicted records in an mmap-backed file that doubles when full"""
+
+    def __init__(self, path, initial_records=1024):
+        self.path = path
+        self._file = open(path, 'w+b')
+        self._file.truncate(initial_records * RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._slots = {}
+        self._free = []
+        self._used = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, device_id):
+        return device_id in self._slots
+
+    def write(self, device_id, record):
+        slot = self._slots.get(device_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = self._used
+                self._used += 1
+                if self._used * RECORD.size > len(self._map):
+                    size = len(self._map) * 2
+                    self._file.truncate(size)
+                    self._map.resize(size)
+            self._slots[device_id] = slot
+        offset = slot * RECORD.size
+        self._map[offset:offset + RECORD.size] = record
+
+    def take(self, device_id):
+        """Remove and return the record of a device (None if not spilled)"""
+        slot = self._slots.pop(device_id, None)
+        if slot is None:
+            return None
+        self._free.append(slot)
+        offset = slot * RECORD.size
+        return self._map[offset:offset + RECORD.size]
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+            self._file.close()
+
+# ============================================
+# SESSION STORE
+# ============================================
+
+class SessionStore:
+    """Fixed-capacity table of session records with CLOCK eviction
+
+    Records live in one bytearray (RECORD.size bytes each); a dict maps
+    device id -> slot. A lookup sets the slot's reference bit; eviction
+    sweeps the clock hand, clearing bits, and takes the first slot whose
+    bit is already clear (second-chance LRU approximation, O(1) amortized).
+    Evicted sessions go to the spill file if one is given, else are dropped.
+    """
+
+    def __init__(self, capacity=100_000, spill_path=None):
+        self.capacity = capacity
+        self._records = bytearray(capacity * RECORD.size)
+        self._referenced = bytearray(capacity)
+        self._owner = array('Q', bytes(8 * capacity))
+        self._slots = {}
+        self._hand = 0
+        self.spill = SpillFile(spill_path) if spill_path else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spill_reads = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, device_id):
+        return device_id in self._slots or (self.spill is not None and device_id in self.spill)
+
+    def _free_slot(self):
+        if len(self._slots) < self.capacity:
+            return len(self._slots)
+
+        referenced = self._referenced
+        while referenced[self._hand]:
+            referenced[self._hand] = 0
+            self._hand = (self._hand + 1) % self.capacity
+        slot = self._hand
+        self._hand = (self._hand + 1) % self.capacity
+
+        victim = self._owner[slot]
+        del self._slots[victim]
+        if self.spill is not None:
+            offset = slot * RECORD.size
+            self.spill.write(victim, self._records[offset:offset + RECORD.size])
+        self.evictions += 1
+        return slot
+
+    def _place(self, device_id, record):
+        slot = self._free_slot()
+        self._records[slot * RECORD.size:(slot + 1) * RECORD.size] = record
+        self._owner[slot] = device_id
+        self._referenced[slot] = 1
+        self._slots[device_id] = slot
+        return slot
+
+    def _slot(self, device_id):
+        slot = self._slots.get(device_id)
+        if slot is not None:
+            self._referenced[slot] = 1
+            self.hits += 1
+            return slot
+        record = self.spill.take(device_id) if self.spill is not None else None
+        if record is None:
+            self.misses += 1
+            return None
+        self.spill_reads += 1
+        return self._place(device_id, record)
+
+    def put(self, device_id, key, codec='zlib', tx_counter=0, rx_counter=0):
+        """Create or replace the session of a device"""
+        record = RECORD.pack(device_id, key, tx_counter, rx_counter, time.time(), CODEC_IDS[codec])
+        slot = self._slots.get(device_id)
+        if slot is None:
+            if self.spill is not None:
+                self.spill.take(device_id)
+            self._place(device_id, record)
+        else:
+            self._records[slot * RECORD.size:(slot + 1) * RECORD.size] = record
+            self._referenced[slot] = 1
+
+    def get(self, device_id):
+        """Session of a device, or None (reloaded from the spill file if evicted)"""
+        slot = self._slot(device_id)
+        if slot is None:
+            return None
+        return Session._make(RECORD.unpack_from(self._records, slot * RECORD.size))
+
+    def next_tx(self, device_id):
+        """Increment and return the transmit counter (nonce source) in place"""
+        slot = self._slot(device_id)
+        if slot is None:
+            raise KeyError(device_id)
+        offset = slot * RECORD.size + TX_OFFSET
+        counter, = COUNTER.unpack_from(self._records, offset)
+        COUNTER.pack_into(self._records, offset, counter + 1)
+        return counter + 1
+
+    def set_rx(self, device_id, counter):
+        """Record the highest accepted receive counter in place"""
+        slot = self._slot(device_id)
+        if slot is None:
+            raise KeyError(device_id)
+        COUNTER.pack_into(self._records, slot * RECORD.size + RX_OFFSET, counter)
+
+    def hit_rate(self):
+        total = self.hits + self.misses + self.spill_reads
+        return self.hits / total if total else 0
+
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+
+class DictSessionStore:
+    """Baseline: device id -> dict of session fields (the shape of the result dicts)"""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def put(self, device_id, key, codec='zlib', tx_counter=0, rx_counter=0):
+        self._sessions[device_id] = {'device_id': device_id, 'key': key, 'tx_counter': tx_counter,
+                                     'rx_counter': rx_counter, 'established': time.time(),
+                                     'codec': CODEC_IDS[codec]}
+
+    def get(self, device_id):
+        return self._sessions.get(device_id)
+
+# ============================================
+# BENCHMARK: BYTES PER SESSION AND LOOKUP LATENCY
+# ============================================
+
+def session_key(device_id):
+    """Deterministic stand-in for a Kyber-derived 32-byte session key"""
+    return device_id.to_bytes(8, 'big') * 4
+
+def fill(factory, sessions):
+    """Create a store and insert `sessions` sessions, returns it and its traced heap bytes"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = factory()
+    for device_id in range(sessions):
+        store.put(device_id, session_key(device_id))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, after - before
+
+def time_lookups(store, sessions, lookups=10_000, seed=1):
+    rng = random.Random(seed)
+    ids = [rng.randrange(sessions) for _ in range(lookups)]
+    samples = []
+    ok = True
+    for device_id in ids:
+        start = time.perf_counter()
+        session = store.get(device_id)
+        samples.append(time.perf_counter() - start)
+        key = session.key if isinstance(session, Session) else session['key']
+        ok = ok and key == session_key(device_id)
+    return latency_stats(samples), ok
+
+def benchmark_session_store(sizes=(10_000, 100_000, 1_000_000), dict_limit=100_000, spill_fraction=0.1):
+    """Bytes/session and lookup latency: record table vs dicts, and with a spill file"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for sessions in sizes:
+            variants = [('records', lambda: SessionStore(sessions))]
+            if sessions <= dict_limit:
+                variants.append(('dict', DictSessionStore))
+            # RAM for a fraction of the fleet, the rest spilled to disk
+            variants.append(('records+spill', lambda: SessionStore(
+                max(1, int(sessions * spill_fraction)), os.path.join(tmp, f"spill_{sessions}.bin"))))
+
+            for name, factory in variants:
+                store, heap = fill(factory, sessions)
+                lookup, ok = time_lookups(store, sessions)
+                spilled = len(store.spill) if getattr(store, 'spill', None) else 0
+                results.append({
+                    'store': name,
+                    'sessions': sessions,
+                    'in_memory': sessions - spilled,
+                    'spilled': spilled,
+                    'memory_bytes': heap,
+                    'bytes_per_session': heap / sessions,
+                    'hit_rate': store.hit_rate() if isinstance(store, SessionStore) else 1.0,
+                    'lookup_p50': lookup['p50'],
+                    'lookup_p99': lookup['p99'],
+                    'success': ok
+                })
+                if isinstance(store, SessionStore):
+                    store.close()
+    return results
+
+def print_session_store_results(results):
+    """Print session store benchmark table"""
+    print(f"{'Store':<14} {'Sessions':>10} {'In RAM':>10} {'Heap':>10} {'B/session':>10} "
+          f"{'Hit rate':>9} {'p50 (us)':>9} {'p99 (us)':>9} {'OK':>3}")
+    print("-" * 92)
+    for r in results:
+        print(f"{r['store']:<14} {r['sessions']:>10,} {r['in_memory']:>10,} "
+              f"{r['memory_bytes']/1024/1024:>7.1f} MB {r['bytes_per_session']:>10.1f} "
+              f"{r['hit_rate']*100:>8.1f}% {r['lookup_p50']*1e6:>9.2f} {r['lookup_p99']*1e6:>9.2f} "
+              f"{'✓' if r['success'] else '✗':>3}")
+    print(f"\nRecord: {RECORD.size} bytes; heap = tracemalloc bytes added by inserting the sessions "
+          f"(spill file pages not counted)")
+
+if __name__ == "__main__":
+    sizes = (10_000, 100_000) if '--quick' in sys.argv else (10_000, 100_000, 1_000_000)
+    print_header("GATEWAY SESSION STORE")
+    print_session_store_results(benchmark_session_store(sizes))
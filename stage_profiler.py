@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Benchmark Profiler
+Runs the pipeline stages (compress, decompress, keygen, encap, decap,
+sign, verify) once more under cProfile, or under a stack sampler, after
+each benchmark has timed them, so the recorded timings stay unprofiled.
+Every cell gets its own dump per stage, and the stages are merged into a
+top-N hotspot table at the end.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: python benchmark_pqc_compression.py --profile [sample] [--profile-dir DIR] [--top N]
+       python stage_profiler.py [DIR] [--top N]     (table from existing dumps)
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_DIR = 'profile_dumps'
+SAMPLE_INTERVAL = 0.001
+TOP_N = 25
+
+# ============================================
+# STACK SAMPLER
+# ============================================
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples the stack of one thread every `interval` seconds from a helper thread"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        target = thread_id or threading.get_ident()
+        self._stop.clear()
+
+        def sample():
+            while not self._stop.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                if self._stop.is_set():
+                    # The target is already in stop(), not in the stage
+                    break
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[tuple(reversed(stack))] += 1
+
+        self._thread = threading.Thread(target=sample, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+# ============================================
+# STAGE PROFILER
+# ============================================
+
+def _dump_name(cell, stage):
+    return re.sub(r'[^A-Za-z0-9_.+-]+', '_', cell) + f".{stage}"
+
+class StageProfiler:
+    """Disabled by default; stage() costs one attribute check when off
+
+    mode 'cprofile': deterministic, one .prof per cell and stage (pstats / snakeviz)
+    mode 'sample': folded stacks per cell and stage (flamegraph.pl / speedscope)
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.output_dir = PROFILE_DIR
+        self.interval = SAMPLE_INTERVAL
+        self._cell = None
+        self._open = {}
+        self._profiles = {}
+        self.stage_times = Counter()
+
+    def enable(self, mode='cprofile', output_dir=PROFILE_DIR, interval=SAMPLE_INTERVAL):
+        if mode not in ('cprofile', 'sample'):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.interval = interval
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run_cell(self, key, measure):
+        """Run one benchmark cell, attributing its stages to `key`"""
+        if not self.mode:
+            return measure()
+        self._flush()
+        self._cell = key
+        try:
+            return measure()
+        finally:
+            self._flush()
+            self._cell = None
+
+    def _flush(self):
+        """Write the dumps of the current cell (stages repeated in a cell accumulate)"""
+        cell = self._cell or 'unassigned'
+        for stage, data in self._open.items():
+            path = os.path.join(self.output_dir, _dump_name(cell, stage))
+            if self.mode == 'cprofile':
+                data.dump_stats(path + '.prof')
+            else:
+                with open(path + '.folded', 'w') as f:
+                    for stack, count in data.items():
+                        f.write(f"{';'.join(stack)} {count}\n")
+            self._profiles.setdefault(stage, []).append(data)
+        self._open = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the enclosed block as stage `name` of the current cell"""
+        if not self.mode:
+            yield
+            return
+
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            profiler = self._open.setdefault(name, cProfile.Profile())
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+        else:
+            sampler = StackSampler(self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self._open.setdefault(name, Counter()).update(sampler.stacks)
+        self.stage_times[name] += time.perf_counter() - start
+
+    def profile(self, name, function, *args):
+        """Run an already timed stage once more under the profiler, returns its result
+
+        Benchmarks call this after their timers stop, so profiler overhead
+        never reaches the recorded timings. A no-op when profiling is off.
+        """
+        if not self.mode:
+            return None
+        with self.stage(name):
+            return function(*args)
+
+    def hotspots(self, top=TOP_N):
+        """Top functions by self time over every cell, one row per (stage, function)"""
+        self._flush()
+        rows = []
+        for stage, profiles in self._profiles.items():
+            if self.mode == 'cprofile':
+                profiles = [p for p in profiles if p.stats]
+                rows += _stats_rows(stage, pstats.Stats(*profiles)) if profiles else []
+            else:
+                rows += _sample_rows(stage, profiles, self.interval)
+        for r in rows:
+            total = self.stage_times[r['stage']]
+            r['stage_share'] = r['self_time'] / total * 100 if total else 0
+        return sorted(rows, key=lambda r: r['self_time'], reverse=True)[:top]
+
+def _stats_rows(stage, stats):
+    return [{'stage': stage, 'function': f"{name} ({os.path.basename(filename)}:{line})",
+             'calls': calls, 'self_time': self_time, 'cumulative_time': cumulative}
+            for (filename, line, name), (_, calls, self_time, cumulative, _) in stats.stats.items()]
+
+def _sample_rows(stage, samples, interval):
+    self_samples = Counter()
+    total_samples = Counter()
+    for stacks in samples:
+        for stack, count in stacks.items():
+            self_samples[stack[-1]] += count
+            for label in set(stack):
+                total_samples[label] += count
+    return [{'stage': stage, 'function': label, 'calls': None, 'self_time': self_samples[label] * interval,
+             'cumulative_time': total_samples[label] * interval}
+            for label in total_samples if self_samples[label]]
+
+def load_dumps(output_dir=PROFILE_DIR):
+    """Stage -> list of pstats-compatible dump paths written by a previous --profile run"""
+    dumps = {}
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith('.prof'):
+            dumps.setdefault(name[:-5].rsplit('.', 1)[1], []).append(os.path.join(output_dir, name))
+    return dumps
+
+def print_hotspots(rows, stage_times=None):
+    """Print the aggregated hotspot table"""
+    print(f"{'Stage':<11} {'Function':<52} {'Calls':>9} {'Self ms':>9} {'Cum ms':>9} {'% stage':>8}")
+    print("-" * 103)
+    for r in rows:
+        calls = f"{r['calls']:,}" if r['calls'] is not None else '-'
+        share = f"{r['stage_share']:.1f}%" if 'stage_share' in r else '-'
+        print(f"{r['stage']:<11} {r['function'][:52]:<52} {calls:>9} {r['self_time']*1000:>9.2f} "
+              f"{r['cumulative_time']*1000:>9.2f} {share:>8}")
+    if stage_times:
+        print("\nProfiled time per stage: " +
+              ", ".join(f"{stage} {seconds*1000:.1f} ms" for stage, seconds in stage_times.most_common()))
+
+# Shared by the benchmark functions
+PROFILER = StageProfiler()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    top = int(args[args.index('--top') + 1]) if '--top' in args else TOP_N
+    output_dir = next((a for i, a in enumerate(args)
+                       if not a.startswith('--') and (i == 0 or args[i - 1] != '--top')), PROFILE_DIR)
+
+    rows = []
+    for stage, paths in load_dumps(output_dir).items():
+        rows += _stats_rows(stage, pstats.Stats(*paths))
+    print_hotspots(sorted(rows, key=lambda r: r['self_time'], reverse=True)[:top])
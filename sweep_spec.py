@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Declarative Benchmark Sweeps
+A sweep spec (JSON, TOML, or YAML when PyYAML is installed) lists the
+datasets and sizes, codecs and levels, KEMs, signatures, batch sizes,
+repetitions and worker counts to measure. It is expanded into benchmark
+cells keyed like the ResultLog cells of run_full_benchmark (so --resume
+works across both), deduplicated, and narrowed to a selected slice.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: python benchmark_pqc_compression.py --sweep SPEC [--select AXIS=V1,V2 ...]
+                                           [--shard I/N] [--list] [--resume]
+"""
+
+import json
+import os
+from collections import namedtuple
+from itertools import product
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+BENCHMARKS = ('compression', 'pqc', 'combined', 'signature', 'authenticated')
+
+# Levels the benchmark uses when none is given: such a level is dropped from
+# the cell so it keeps the key of the default run
+DEFAULT_LEVELS = {'zlib': 9, 'zstd': 3, 'lz4': 0}
+
+DEFAULT_SPEC = {
+    'name': 'sweep',
+    'benchmarks': list(BENCHMARKS),
+    'datasets': ['iot_medium'],
+    'sizes_kb': [],
+    'codecs': ['zlib'],
+    'kems': ['Kyber768'],
+    'signatures': ['Dilithium2'],
+    'batch_sizes': [1],
+    'repetitions': 1,
+    'workers': [1],
+}
+
+Cell = namedtuple('Cell', 'benchmark dataset codec level kem signature batch repetition workers')
+
+# ============================================
+# LOADING
+# ============================================
+
+def load_spec(filename):
+    """Read a sweep spec and fill in the defaults (unknown keys are an error)"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.json':
+        with open(filename, encoding='utf-8') as f:
+            spec = json.load(f)
+    elif extension == '.toml':
+        if tomllib is None:
+            raise RuntimeError("TOML specs need Python 3.11+ or tomli (pip install tomli)")
+        with open(filename, 'rb') as f:
+            spec = tomllib.load(f)
+    elif extension in ('.yaml', '.yml'):
+        if not HAS_YAML:
+            raise RuntimeError("YAML specs need PyYAML (pip install pyyaml)")
+        with open(filename, encoding='utf-8') as f:
+            spec = yaml.safe_load(f)
+    else:
+        raise ValueError(f"Unknown sweep spec format: {filename} (use .json, .toml or .yaml)")
+    return normalize_spec(spec or {}, default_name=os.path.splitext(os.path.basename(filename))[0])
+
+def normalize_spec(spec, default_name='sweep'):
+    unknown = set(spec) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ValueError(f"Unknown sweep spec keys: {', '.join(sorted(unknown))}")
+    merged = {**DEFAULT_SPEC, 'name': default_name, **spec}
+    for key, value in merged.items():
+        # A single value is a one-element axis
+        if isinstance(DEFAULT_SPEC[key], list) and not isinstance(value, list):
+            merged[key] = [value]
+    bad = set(merged['benchmarks']) - set(BENCHMARKS)
+    if bad:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(bad))} (choose from {', '.join(BENCHMARKS)})")
+    if merged['repetitions'] < 1 or min(merged['batch_sizes'] + merged['workers']) < 1:
+        raise ValueError("repetitions, batch_sizes and workers must be >= 1")
+    return merged
+
+def codec_levels(entries):
+    """(codec, level) pairs from "zlib", "zstd:19" or {"codec": "zstd", "levels": [1, 19]}"""
+    pairs = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            levels = entry.get('levels', [entry.get('level')])
+            pairs += [(entry['codec'], level) for level in levels]
+        elif ':' in str(entry):
+            codec, level = entry.split(':', 1)
+            pairs.append((codec, int(level)))
+        else:
+            pairs.append((entry, None))
+    for codec, level in pairs:
+        if level is not None and codec not in DEFAULT_LEVELS:
+            raise ValueError(f"Codec {codec} takes no level (only {', '.join(DEFAULT_LEVELS)} do)")
+    # The default level is the plain codec
+    return [(codec, None if level == DEFAULT_LEVELS.get(codec) else level) for codec, level in pairs]
+
+def dataset_names(spec):
+    return list(spec['datasets']) + [f"iot_{size}kb" for size in spec['sizes_kb']]
+
+# ============================================
+# EXPANSION AND SELECTION
+# ============================================
+
+def codec_token(codec, level):
+    return codec if level is None else f"{codec}:{level}"
+
+def cell_key(cell):
+    """ResultLog key; the default batch / repetition / workers add nothing to it"""
+    codec = codec_token(cell.codec, cell.level)
+    key = {
+        'compression': f"compression/{cell.dataset}/{codec}",
+        'pqc': f"pqc/{cell.kem}",
+        'combined': f"combined/{cell.dataset}/{cell.kem}/{codec}",
+        'signature': f"signature/{cell.signature}",
+        'authenticated': f"combined/{cell.dataset}/{cell.kem}/{codec}/{cell.signature}",
+    }[cell.benchmark]
+    if cell.batch != 1:
+        key += f"/batch={cell.batch}"
+    if cell.workers != 1:
+        key += f"/workers={cell.workers}"
+    if cell.repetition:
+        key += f"/rep={cell.repetition}"
+    return key
+
+def expand_cells(spec):
+    """Every cell of the spec, in spec order, once per key
+
+    Each benchmark only varies the axes it uses (a pqc cell does not depend
+    on the codec), so the other axes collapse into duplicates and are dropped.
+    Batches are built from distinct IoT readings, so on the synthetic
+    datasets (repetitive, random) the batch axis collapses to 1 as well.
+    """
+    codecs = codec_levels(spec['codecs'])
+    axes = {
+        'compression': ('dataset', 'codec'),
+        'pqc': ('kem',),
+        'combined': ('dataset', 'kem', 'codec', 'batch'),
+        'signature': ('signature',),
+        'authenticated': ('dataset', 'kem', 'codec', 'signature', 'batch'),
+    }
+    values = {
+        'dataset': dataset_names(spec),
+        'codec': codecs,
+        'kem': spec['kems'],
+        'signature': spec['signatures'],
+        'batch': spec['batch_sizes'],
+    }
+    unused = {'dataset': None, 'codec': (None, None), 'kem': None, 'signature': None, 'batch': 1}
+
+    cells = {}
+    for benchmark in spec['benchmarks']:
+        for combination in product(*(values[axis] for axis in axes[benchmark])):
+            chosen = {**unused, **dict(zip(axes[benchmark], combination))}
+            codec, level = chosen['codec']
+            if chosen['dataset'] and not chosen['dataset'].startswith('iot_'):
+                chosen['batch'] = 1
+            for workers, repetition in product(spec['workers'], range(spec['repetitions'])):
+                cell = Cell(benchmark, chosen['dataset'], codec, level, chosen['kem'], chosen['signature'],
+                            chosen['batch'], repetition, workers)
+                cells.setdefault(cell_key(cell), cell)
+    return list(cells.values())
+
+def parse_selection(arguments):
+    """{axis: {values}} from "--select" arguments like "kem=Kyber768,Kyber1024" """
+    selection = {}
+    for argument in arguments:
+        axis, _, values = argument.partition('=')
+        if axis not in Cell._fields:
+            raise ValueError(f"Unknown axis '{axis}' (choose from {', '.join(Cell._fields)})")
+        selection.setdefault(axis, set()).update(values.split(','))
+    return selection
+
+def select_cells(cells, selection=None, shard=None):
+    """Cells matching every selected axis, then shard (index, count) of them (1-based index)"""
+    if selection:
+        cells = [cell for cell in cells
+                 if all(str(getattr(cell, axis)) in wanted or
+                        (axis == 'codec' and codec_token(cell.codec, cell.level) in wanted)
+                        for axis, wanted in selection.items())]
+    if shard:
+        index, count = shard
+        if not 1 <= index <= count:
+            raise ValueError(f"Shard {index}/{count} out of range")
+        cells = cells[index - 1::count]
+    return cells
+
+def parse_shard(text):
+    """(index, count) from "I/N" """
+    index, _, count = text.partition('/')
+    if not (index.isdigit() and count.isdigit()):
+        raise ValueError(f"Shard must be I/N (e.g. 1/4), got '{text}'")
+    return int(index), int(count)
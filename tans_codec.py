@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Table-based Asymmetric Numeral Systems (tANS) entropy coder
+Order-0 entropy coder in the style of FSE (the entropy stage of Zstandard):
+a NumPy histogram is normalized to a power-of-two table, symbols are spread
+over the table and the encode/decode tables are precomputed once per
+frequency set. Unlike Huffman, tANS spends fractional bits per symbol, so it
+gets close to the entropy on skewed IoT byte distributions.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Requires: pip install numpy
+"""
+
+import math
+import struct
+import time
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from compression_demo import huffman_encode
+from stage_profiler import PROFILER
+
+TABLE_LOG = 11
+TABLE_SIZE = 1 << TABLE_LOG
+
+# Header: original length, number of distinct symbols, then (symbol, frequency) pairs
+HEADER = struct.Struct('>IH')
+SYMBOL_ENTRY = struct.Struct('>BH')
+
+# ============================================
+# HISTOGRAM AND NORMALIZATION
+# ============================================
+
+def byte_histogram(data):
+    """Byte counts (256 entries) using NumPy"""
+    return np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+
+def order0_entropy(data):
+    """Shannon entropy of the byte distribution, in bits per byte"""
+    counts = byte_histogram(data)
+    p = counts[counts > 0] / len(data)
+    return float(-(p * np.log2(p)).sum())
+
+def normalize_counts(counts, table_log=TABLE_LOG):
+    """Scale counts so they sum to 2**table_log, every present symbol keeps >= 1"""
+    size = 1 << table_log
+    counts = np.asarray(counts, dtype=np.int64)
+    present = counts > 0
+    if present.sum() > size:
+        raise ValueError(f"Too many distinct symbols for a table of {size}")
+
+    freqs = np.zeros(256, dtype=np.int64)
+    freqs[present] = np.maximum(1, np.round(counts[present] * size / counts.sum()).astype(np.int64))
+
+    # Give the rounding error to (or take it from) the most frequent symbols
+    error = size - int(freqs.sum())
+    order = np.argsort(-freqs, kind='stable')
+    i = 0
+    while error != 0:
+        s = order[i % present.sum()]
+        if error > 0:
+            freqs[s] += 1
+            error -= 1
+        elif freqs[s] > 1:
+            freqs[s] -= 1
+            error += 1
+        i += 1
+    return freqs
+
+# ============================================
+# PRECOMPUTED TABLES
+# ============================================
+
+@lru_cache(maxsize=64)
+def build_tables(freqs, table_log=TABLE_LOG):
+    """Encode and decode tables for a tuple of 256 normalized frequencies
+
+    Decode table, indexed by state - L: symbol, bits to read, next-state base.
+    Encode table is flattened over symbols: state = encode[delta[s] + (x >> nb)].
+    """
+    size = 1 << table_log
+    freqs = np.array(freqs, dtype=np.int64)
+
+    # Spread symbols over the table with an odd step (visits every slot once)
+    step = (size >> 1) + (size >> 3) + 3
+    positions = (np.arange(size) * step) % size
+    symbol_at = np.empty(size, dtype=np.int64)
+    symbol_at[positions] = np.repeat(np.arange(256), freqs)
+
+    # Rank of each slot among the slots of the same symbol (in state order)
+    starts = np.concatenate(([0], np.cumsum(freqs)[:-1]))
+    order = np.argsort(symbol_at, kind='stable')
+    rank = np.empty(size, dtype=np.int64)
+    rank[order] = np.arange(size) - starts[symbol_at[order]]
+
+    x = freqs[symbol_at] + rank                          # Sub-state in [f, 2f)
+    nb_bits = table_log - np.floor(np.log2(x)).astype(np.int64)
+    base = (x << nb_bits) - size
+
+    encode = np.empty(size, dtype=np.int64)
+    encode[starts[symbol_at] + rank] = np.arange(size) + size
+    delta = starts - freqs
+
+    # Encoder picks k or k - 1 output bits with k = table_log - floor(log2(f))
+    max_bits = np.zeros(256, dtype=np.int64)
+    present = freqs > 0
+    max_bits[present] = table_log - np.floor(np.log2(freqs[present])).astype(np.int64)
+
+    # Python lists index faster than NumPy arrays in the scalar coding loops
+    return {
+        'symbol': symbol_at.tolist(),
+        'nb_bits': nb_bits.tolist(),
+        'base': base.tolist(),
+        'encode': encode.tolist(),
+        'delta': delta.tolist(),
+        'freq': freqs.tolist(),
+        'max_bits': max_bits.tolist()
+    }
+
+# ============================================
+# ENCODER / DECODER
+# ============================================
+
+def tans_encode(data, table_log=TABLE_LOG):
+    """Compress bytes: header (frequencies) + final state + reversed bit chunks"""
+    if not data:
+        return HEADER.pack(0, 0)
+
+    freqs = normalize_counts(byte_histogram(data), table_log)
+    tables = build_tables(tuple(freqs.tolist()), table_log)
+    freq, max_bits = tables['freq'], tables['max_bits']
+    encode, delta = tables['encode'], tables['delta']
+
+    # Symbols are coded last-to-first so the decoder runs forwards
+    x = 1 << table_log
+    chunks = []
+    for s in reversed(data):
+        k = max_bits[s]
+        nb = k if (x >> k) >= freq[s] else k - 1
+        chunks.append((x & ((1 << nb) - 1), nb))
+        x = encode[delta[s] + (x >> nb)]
+    chunks.append((x - (1 << table_log), table_log))
+
+    # Pack chunks in decode order, MSB first
+    out = bytearray()
+    acc = pending = 0
+    for value, nb in reversed(chunks):
+        acc = (acc << nb) | value
+        pending += nb
+        if pending >= 32:
+            pending -= 32
+            out += (acc >> pending).to_bytes(4, 'big')
+            acc &= (1 << pending) - 1
+    if pending:
+        out += (acc << (-pending % 8)).to_bytes((pending + 7) // 8, 'big')
+
+    symbols = np.flatnonzero(freqs)
+    header = HEADER.pack(len(data), len(symbols))
+    header += b''.join(SYMBOL_ENTRY.pack(int(s), int(freqs[s])) for s in symbols)
+    return header + bytes(out)
+
+def tans_decode(encoded, table_log=TABLE_LOG):
+    """Decompress bytes produced by tans_encode"""
+    length, symbol_count = HEADER.unpack_from(encoded)
+    if length == 0:
+        return b''
+
+    freqs = [0] * 256
+    offset = HEADER.size
+    for _ in range(symbol_count):
+        s, f = SYMBOL_ENTRY.unpack_from(encoded, offset)
+        freqs[s] = f
+        offset += SYMBOL_ENTRY.size
+    tables = build_tables(tuple(freqs), table_log)
+    symbol, nb_bits, base = tables['symbol'], tables['nb_bits'], tables['base']
+
+    # Bit reader over the payload, refilled 32 bits at a time
+    stream = encoded[offset:] + bytes(4)
+    pos = 0
+    acc = pending = 0
+
+    def refill(acc, pending, pos):
+        acc = (acc << 32) | int.from_bytes(stream[pos:pos + 4], 'big')
+        return acc, pending + 32, pos + 4
+
+    acc, pending, pos = refill(acc, pending, pos)
+    pending -= table_log
+    state = acc >> pending
+    acc &= (1 << pending) - 1
+
+    out = bytearray(length)
+    for i in range(length):
+        out[i] = symbol[state]
+        nb = nb_bits[state]
+        if pending < nb:
+            acc, pending, pos = refill(acc, pending, pos)
+        pending -= nb
+        state = base[state] + (acc >> pending)
+        acc &= (1 << pending) - 1
+    return bytes(out)
+
+# ============================================
+# BENCHMARK: tANS VS HUFFMAN VS ZLIB
+# ============================================
+
+def _coder_result(dataset, coder, data, encoded_size, encode_time, decode_time, success):
+    return {
+        'dataset': dataset,
+        'coder': coder,
+        'original_size': len(data),
+        'compressed_size': encoded_size,
+        'bits_per_byte': encoded_size * 8 / len(data),
+        'encode_mbps': len(data) / 1024 / 1024 / encode_time if encode_time > 0 else 0,
+        'decode_mbps': len(data) / 1024 / 1024 / decode_time if decode_time else None,
+        'success': success
+    }
+
+def benchmark_entropy_coders(datasets):
+    """Bits per byte and MB/s of tANS, Huffman and zlib on each dataset
+
+    Huffman size counts the bitstream only (its code table is not serialized
+    by compression_demo) and it has no decoder, so only encode speed is given.
+    """
+    results = []
+    for name, data in datasets.items():
+        start = time.perf_counter()
+        encoded = tans_encode(data)
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = tans_decode(encoded)
+        decode_time = time.perf_counter() - start
+        results.append(_coder_result(name, 'tans', data, len(encoded), encode_time,
+                                     decode_time, decoded == data))
+        # With --profile the coders run again under the profiler, outside the timers
+        PROFILER.profile('compress', tans_encode, data)
+        PROFILER.profile('decompress', tans_decode, encoded)
+
+        start = time.perf_counter()
+        encoded, _ = huffman_encode(data)
+        encode_time = time.perf_counter() - start
+        results.append(_coder_result(name, 'huffman', data, len(encoded), encode_time, None, True))
+        PROFILER.profile('compress', huffman_encode, data)
+
+        start = time.perf_counter()
+        encoded = zlib.compress(data, level=9)
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = zlib.decompress(encoded)
+        decode_time = time.perf_counter() - start
+        results.append(_coder_result(name, 'zlib', data, len(encoded), encode_time,
+                                     decode_time, decoded == data))
+
+        results[-1]['entropy'] = results[-2]['entropy'] = results[-3]['entropy'] = order0_entropy(data)
+
+    return results
+
+def print_entropy_results(results):
+    """Print entropy coder comparison table"""
+    print(f"{'Dataset':<12} {'Coder':<8} {'Entropy':>8} {'Bits/byte':>10} {'Size':>9} "
+          f"{'Encode':>12} {'Decode':>12} {'OK':>3}")
+    print("-" * 82)
+    for r in results:
+        decode = f"{r['decode_mbps']:>7.2f} MB/s" if r['decode_mbps'] is not None else f"{'-':>12}"
+        print(f"{r['dataset']:<12} {r['coder']:<8} {r['entropy']:>8.3f} {r['bits_per_byte']:>10.3f} "
+              f"{r['compressed_size']:>9,} {r['encode_mbps']:>7.2f} MB/s {decode} "
+              f"{'✓' if r['success'] else '✗':>3}")
+
+if __name__ == "__main__":
+    from benchmark_pqc_compression import generate_test_datasets, print_header
+
+    print_header("ENTROPY CODERS: tANS VS HUFFMAN VS ZLIB")
+    print_entropy_results(benchmark_entropy_coders(generate_test_datasets()))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Traced Concurrent Gateway Run
+A burst of device messages handled by a pool of gateway threads (and
+optionally several worker processes), every message traced as nested
+spans: compress, encap, seal (device side), decap, open, decompress
+(gateway side), plus the time it waited in the pool queue. Writes a
+Chrome trace-event file and prints per-stage latency.
+For IoT PQC Project - Abdessamad JAOUAD
+
+Usage: python trace_gateway.py [--threads N] [--processes N] [--messages N]
+                               [--codec zlib|lz4|zstd] [--output FILE] [--quick]
+"""
+
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmark_pqc_compression import create_kem, generate_test_datasets, kem_backend, latency_stats, print_header
+from pipeline_trace import TRACE_FILE, TRACER, now_us, span_durations
+from pqc_compression_demo import (
+    HAS_AESGCM, PQCSimulator, compress_data, decompress_bounded, open_message, seal_message
+)
+
+STAGES = ('message', 'compress', 'encap', 'seal', 'decap', 'open', 'decompress', 'queued')
+
+# ============================================
+# GATEWAY
+# ============================================
+
+def gateway_keypair(algorithm):
+    """(public key, secret key) of the gateway; the secret is None when simulated"""
+    kem = create_kem(algorithm)
+    if kem is None:
+        return PQCSimulator(algorithm).keypair()[0], None
+    return kem.generate_keypair(), kem.export_secret_key()
+
+class GatewayThreadState(threading.local):
+    """KEM objects are not shared between threads: one device / gateway pair per thread"""
+
+    def __init__(self, algorithm, secret_key):
+        self.device = create_kem(algorithm) or PQCSimulator(algorithm)
+        self.gateway = create_kem(algorithm, secret_key) if secret_key is not None else self.device
+
+    def decap(self, ciphertext):
+        if isinstance(self.gateway, PQCSimulator):
+            return self.gateway.decap_secret(None, ciphertext)
+        return self.gateway.decap_secret(ciphertext)
+
+def handle_message(state, device_id, message, codec, public_key, algorithm, submitted):
+    """One traced message, from the device compressing it to the gateway decompressing it"""
+    TRACER.add_async('queued', submitted, now_us(), device_id)
+    with TRACER.span('message', device=device_id, codec=codec, kem=algorithm):
+        with TRACER.span('compress', codec=codec):
+            payload = compress_data(message, codec)
+        with TRACER.span('encap', kem=algorithm):
+            ciphertext, secret = state.device.encap_secret(public_key)
+        if HAS_AESGCM:
+            with TRACER.span('seal', aead='aes-256-gcm'):
+                payload = seal_message(secret, payload)
+        with TRACER.span('decap', kem=algorithm):
+            recovered = state.decap(ciphertext)
+        if HAS_AESGCM:
+            with TRACER.span('open', aead='aes-256-gcm'):
+                payload = open_message(recovered, payload)
+        with TRACER.span('decompress', codec=codec):
+            return decompress_bounded(payload, codec) == message
+
+def run_gateway(message, codec, algorithm, public_key, secret_key, threads, messages, first_device=0):
+    """Submit `messages` at once to a pool of `threads` gateway threads; True if all round-trip"""
+    state = GatewayThreadState(algorithm, secret_key)
+    with ThreadPoolExecutor(threads, thread_name_prefix='gateway') as pool:
+        futures = [pool.submit(handle_message, state, device_id, message, codec, public_key, algorithm, now_us())
+                   for device_id in range(first_device, first_device + messages)]
+        return all(future.result() for future in futures)
+
+def _process_run(job):
+    """Worker process: run a gateway and hand its events back to the parent"""
+    worker, args = job
+    TRACER.enable()
+    TRACER.name_process(f"gateway worker {worker}")
+    ok = run_gateway(*args)
+    return ok, TRACER.events()
+
+# ============================================
+# BENCHMARK: TRACED BURST
+# ============================================
+
+def trace_gateway(threads=4, processes=1, messages=64, codec='zlib', algorithm='Kyber768',
+                  dataset='iot_medium', output=TRACE_FILE):
+    """Run a traced burst and export it; returns per-stage latency rows"""
+    message = generate_test_datasets()[dataset]
+    public_key, secret_key = gateway_keypair(algorithm)
+    TRACER.clear()
+    TRACER.enable()
+
+    if processes > 1:
+        TRACER.name_process('gateway parent')
+        jobs = [(i, (message, codec, algorithm, public_key, secret_key, threads, messages, messages * i))
+                for i in range(processes)]
+        with ProcessPoolExecutor(processes) as pool:
+            outcomes = list(pool.map(_process_run, jobs))
+        ok = all(worker_ok for worker_ok, _ in outcomes)
+        worker_events = [e for _, events in outcomes for e in events]
+    else:
+        TRACER.name_process('gateway')
+        ok = run_gateway(message, codec, algorithm, public_key, secret_key, threads, messages)
+        worker_events = []
+    TRACER.enable(False)
+
+    written = TRACER.export(output, worker_events)
+    events = TRACER.events() + worker_events
+
+    rows = []
+    for stage in STAGES:
+        durations = span_durations(events, stage)
+        if not durations:
+            continue
+        stats = latency_stats([d / 1e6 for d in durations])
+        rows.append({
+            'stage': stage,
+            'count': len(durations),
+            'mean': stats['mean'],
+            'p50': stats['p50'],
+            'p99': stats['p99'],
+            'threads': threads,
+            'processes': processes,
+            'codec': codec,
+            'algorithm': algorithm,
+            'backend': kem_backend(),
+            'events': written,
+            'output': output,
+            'success': ok
+        })
+    return rows
+
+def print_trace_results(rows):
+    """Print per-stage latency table"""
+    print(f"{'Stage':<11} {'Spans':>6} {'Mean (ms)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'OK':>3}")
+    print("-" * 52)
+    for r in rows:
+        print(f"{r['stage']:<11} {r['count']:>6} {r['mean']*1000:>10.3f} {r['p50']*1000:>9.3f} "
+              f"{r['p99']*1000:>9.3f} {'✓' if r['success'] else '✗':>3}")
+    if rows:
+        r = rows[0]
+        print(f"\n{r['algorithm']} ({r['backend']}) + {r['codec']}; {r['processes']} process(es) x "
+              f"{r['threads']} gateway threads; queued = submit -> start of handling")
+        print(f"✓ {r['events']} trace events written to {r['output']} (open in chrome://tracing or ui.perfetto.dev)")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    def option(name, default):
+        return type(default)(args[args.index(name) + 1]) if name in args else default
+
+    print_header("TRACED GATEWAY BURST")
+    print_trace_results(trace_gateway(
+        threads=option('--threads', 4),
+        processes=option('--processes', 1),
+        messages=option('--messages', 16 if '--quick' in args else 64),
+        codec=option('--codec', 'zlib'),
+        output=option('--output', TRACE_FILE)))